@@ -0,0 +1,117 @@
+"""
+ragebAIt - Local Blob Stand-in
+A tiny server that speaks the subset of the Vercel Blob API StorageClient
+uses (single PUT and the multipart create/upload/complete flow), storing
+blobs under TEMP_DIR/blob-standin. Use it to exercise uploads in tests
+without network access:
+
+    uvicorn backend.blob_standin:app --port 8100
+    BLOB_BASE_URL=http://localhost:8100 VERCEL_BLOB_TOKEN=test uvicorn backend.main:app
+"""
+
+import hashlib
+import json
+import shutil
+import uuid
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from backend.config import settings
+
+
+BLOB_DIR = settings.TEMP_DIR / "blob-standin"
+PARTS_DIR = BLOB_DIR / ".mpu"
+
+app = FastAPI(title="ragebAIt blob stand-in")
+
+
+def _blob_path(pathname: str):
+    path = (BLOB_DIR / pathname).resolve()
+    if BLOB_DIR.resolve() not in path.parents or PARTS_DIR.resolve() in path.parents:
+        raise HTTPException(status_code=400, detail="Invalid pathname")
+    return path
+
+
+def _blob_result(request: Request, pathname: str, content_type: str) -> dict:
+    url = f"{str(request.base_url).rstrip('/')}/{pathname}"
+    return {
+        "url": url,
+        "downloadUrl": f"{url}?download=1",
+        "pathname": pathname,
+        "contentType": content_type,
+    }
+
+
+async def _write_body(request: Request, path) -> str:
+    """Stream the request body to path and return its MD5 (used as the etag)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.md5()
+    with open(path, "wb") as f:
+        async for chunk in request.stream():
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+@app.api_route("/mpu", methods=["POST", "PUT"])
+async def multipart(
+    request: Request,
+    pathname: str,
+    x_mpu_action: str = Header(...),
+    x_mpu_key: Optional[str] = Header(default=None),
+    x_mpu_upload_id: Optional[str] = Header(default=None),
+    x_mpu_part_number: Optional[int] = Header(default=None),
+    x_content_type: str = Header(default="application/octet-stream")
+):
+    """Multipart upload: create, upload a part, or complete."""
+    if x_mpu_action == "create":
+        upload_id = uuid.uuid4().hex
+        (PARTS_DIR / upload_id).mkdir(parents=True, exist_ok=True)
+        return {"key": pathname, "uploadId": upload_id}
+
+    if not x_mpu_upload_id or not x_mpu_upload_id.isalnum():
+        raise HTTPException(status_code=400, detail="Missing or invalid x-mpu-upload-id")
+    upload_dir = PARTS_DIR / x_mpu_upload_id
+    if not upload_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Unknown upload")
+
+    if x_mpu_action == "upload":
+        if not x_mpu_part_number:
+            raise HTTPException(status_code=400, detail="Missing x-mpu-part-number")
+        etag = await _write_body(request, upload_dir / f"{x_mpu_part_number:05d}")
+        return {"etag": etag, "partNumber": x_mpu_part_number}
+
+    if x_mpu_action == "complete":
+        parts = sorted(json.loads(await request.body()), key=lambda p: p["partNumber"])
+        target = _blob_path(pathname)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as out:
+            for part in parts:
+                with open(upload_dir / f"{part['partNumber']:05d}", "rb") as f:
+                    shutil.copyfileobj(f, out)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return _blob_result(request, pathname, x_content_type)
+
+    raise HTTPException(status_code=400, detail=f"Unknown x-mpu-action: {x_mpu_action}")
+
+
+@app.put("/{pathname:path}")
+async def put_blob(
+    request: Request,
+    pathname: str,
+    x_content_type: str = Header(default="application/octet-stream")
+):
+    """Single-request upload."""
+    await _write_body(request, _blob_path(pathname))
+    return _blob_result(request, pathname, x_content_type)
+
+
+@app.get("/{pathname:path}")
+async def get_blob(pathname: str):
+    """Serve a stored blob."""
+    path = _blob_path(pathname)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(path)
@@ -18,24 +18,127 @@ class Settings:
     # API Keys (strip whitespace to avoid header issues)
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "").strip()
     FAL_KEY: str = os.getenv("FAL_KEY", "").strip()  # fal.ai TTS API key
+    TTS_MODEL: str = os.getenv("TTS_MODEL", "fal-ai/minimax/speech-02-hd")
     GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "").strip()
     VERCEL_BLOB_TOKEN: str = os.getenv("VERCEL_BLOB_TOKEN", "").strip()
     
     # App Settings
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
-    MOCK_MODE: bool = os.getenv("MOCK_MODE", "false").lower() == "true"
     
     # File Settings
-    MAX_VIDEO_SIZE_MB: int = 50
-    MAX_VIDEO_DURATION_SECONDS: int = 120
+    MAX_VIDEO_SIZE_MB: int = int(os.getenv("MAX_VIDEO_SIZE_MB", "50"))
+    MAX_VIDEO_DURATION_SECONDS: int = int(os.getenv("MAX_VIDEO_DURATION_SECONDS", "600"))
     ALLOWED_VIDEO_EXTENSIONS: set = {".mp4", ".mov", ".avi", ".webm"}
+    FRAME_MAX_WIDTH: int = int(os.getenv("FRAME_MAX_WIDTH", "1280"))  # Downscale sampled frames
+    
+    # Local pre-filtering: videos longer than PREFILTER_MIN_DURATION_SECONDS are
+    # scored for motion/cuts/audio spikes and only a reel of the most active
+    # windows (at most PREFILTER_REEL_SECONDS long) is sent to Gemini
+    PREFILTER_ENABLED: bool = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+    PREFILTER_MIN_DURATION_SECONDS: int = int(os.getenv("PREFILTER_MIN_DURATION_SECONDS", "120"))
+    PREFILTER_REEL_SECONDS: int = int(os.getenv("PREFILTER_REEL_SECONDS", "120"))
+    PREFILTER_MAX_WINDOWS: int = int(os.getenv("PREFILTER_MAX_WINDOWS", "4"))
+    
+    # Analysis proxies: what Gemini is sent instead of the full-resolution upload
+    PROXY_ENABLED: bool = os.getenv("PROXY_ENABLED", "true").lower() == "true"
+    PROXY_HEIGHT: int = int(os.getenv("PROXY_HEIGHT", "480"))
+    PROXY_FPS: int = int(os.getenv("PROXY_FPS", "5"))
+    PROXY_VIDEO_KBPS: int = int(os.getenv("PROXY_VIDEO_KBPS", "500"))
     
     # Temp directory for processing
     TEMP_DIR: Path = Path("/tmp/ragebait")
-    
+
+    # Per-job scratch directories (cleaned when a job ends and by a periodic sweep)
+    SCRATCH_DIR: Path = TEMP_DIR / "jobs"
+    SCRATCH_MAX_MB: int = int(os.getenv("SCRATCH_MAX_MB", "4096"))
+    SCRATCH_MAX_AGE_SECONDS: int = int(os.getenv("SCRATCH_MAX_AGE_SECONDS", str(2 * 3600)))
+    SCRATCH_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("SCRATCH_SWEEP_INTERVAL_SECONDS", "300"))
+
+    # Job store ("sqlite" is shared across workers and restarts, "memory" is per-process)
+    JOB_STORE_BACKEND: str = os.getenv("JOB_STORE_BACKEND", "sqlite").lower()
+    JOB_STORE_PATH: Path = Path(os.getenv("JOB_STORE_PATH", str(TEMP_DIR / "jobs.sqlite3")))
+    JOB_STORE_MAX_ENTRIES: int = int(os.getenv("JOB_STORE_MAX_ENTRIES", "500"))
+    JOB_STORE_TTL_SECONDS: int = int(os.getenv("JOB_STORE_TTL_SECONDS", str(24 * 3600)))
+    FRAMES_DIR: Path = TEMP_DIR / "frames"
+
+    # Clip cutting (stream copy when cuts land on keyframes, smart cut otherwise)
+    SMART_CUT_ENABLED: bool = os.getenv("SMART_CUT_ENABLED", "true").lower() == "true"
+    VIDEO_ENCODER_PRESET: str = os.getenv("VIDEO_ENCODER_PRESET", "veryfast")
+    VIDEO_ENCODER_CRF: int = int(os.getenv("VIDEO_ENCODER_CRF", "20"))
+
+    # Concurrency
+    BLOCKING_IO_WORKERS: int = int(os.getenv("BLOCKING_IO_WORKERS", "16"))
+    GENERATE_MAX_CONCURRENCY: int = int(os.getenv("GENERATE_MAX_CONCURRENCY", "4"))
+    # Most scenes one /generate request may render (num_variants)
+    GENERATE_MAX_VARIANTS: int = int(os.getenv("GENERATE_MAX_VARIANTS", "3"))
+    # Commentary segments synthesized at once per job
+    TTS_MAX_CONCURRENCY: int = int(os.getenv("TTS_MAX_CONCURRENCY", "4"))
+    # Per attempt (synthesis call or audio download), then retried with backoff
+    TTS_TIMEOUT_SECONDS: float = float(os.getenv("TTS_TIMEOUT_SECONDS", "60"))
+    TTS_RETRIES: int = int(os.getenv("TTS_RETRIES", "2"))
+    TTS_RETRY_BACKOFF_SECONDS: float = float(os.getenv("TTS_RETRY_BACKOFF_SECONDS", "1.0"))
+    JOB_EVENTS_POLL_SECONDS: float = 1.0
+
+    # Render pool for CPU-bound video work (0 workers = threads, e.g. on serverless)
+    RENDER_WORKERS: int = int(os.getenv("RENDER_WORKERS", "0" if os.getenv("VERCEL") else str(os.cpu_count() or 1)))
+    RENDER_THREAD_SLOTS: int = os.cpu_count() or 1
+    RENDER_QUEUE_SIZE: int = int(os.getenv("RENDER_QUEUE_SIZE", "32"))
+    RENDER_QUEUE_WAIT_SECONDS: float = float(os.getenv("RENDER_QUEUE_WAIT_SECONDS", "120"))
+    RENDER_TIMEOUT_SECONDS: float = float(os.getenv("RENDER_TIMEOUT_SECONDS", "300"))
+
+    # Result cache (scene detections, commentary, TTS audio, clips and renders)
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_DIR: Path = Path(os.getenv("RESULT_CACHE_DIR", str(TEMP_DIR / "cache")))
+    RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "2048"))
+
+    # Synthesized speech per line of commentary (kept apart from the result
+    # cache so large renders never evict it)
+    TTS_CACHE_ENABLED: bool = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+    TTS_CACHE_DIR: Path = Path(os.getenv("TTS_CACHE_DIR", str(TEMP_DIR / "tts_cache")))
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "256"))
+
+    # Storage backend: "vercel" (Blob), "local" (served from /files, opt-in)
+    # or "auto" (Vercel when VERCEL_BLOB_TOKEN is set, no storage otherwise)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "auto").lower()
+    LOCAL_STORAGE_DIR: Path = Path(os.getenv("LOCAL_STORAGE_DIR", str(TEMP_DIR / "storage")))
+    LOCAL_STORAGE_MAX_MB: int = int(os.getenv("LOCAL_STORAGE_MAX_MB", "10240"))
+    PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
+
+    # Blob storage (BLOB_BASE_URL can point at a local stand-in server for tests)
+    BLOB_BASE_URL: str = os.getenv("BLOB_BASE_URL", "https://blob.vercel-storage.com")
+    BLOB_MAX_CONNECTIONS: int = int(os.getenv("BLOB_MAX_CONNECTIONS", "20"))
+    BLOB_TIMEOUT_SECONDS: float = float(os.getenv("BLOB_TIMEOUT_SECONDS", "120"))
+    BLOB_MULTIPART_THRESHOLD_MB: int = int(os.getenv("BLOB_MULTIPART_THRESHOLD_MB", "16"))
+    BLOB_MULTIPART_PART_SIZE_MB: int = int(os.getenv("BLOB_MULTIPART_PART_SIZE_MB", "8"))
+    BLOB_MULTIPART_CONCURRENCY: int = int(os.getenv("BLOB_MULTIPART_CONCURRENCY", "4"))
+    # Retries per Blob request (connection errors, 429/5xx), with exponential backoff
+    BLOB_RETRIES: int = int(os.getenv("BLOB_RETRIES", "2"))
+    BLOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("BLOB_RETRY_BACKOFF_SECONDS", "0.5"))
+
+    # Parody jobs (fal.ai queue; FAL_QUEUE_BASE_URL can point at a local stand-in queue for tests)
+    FAL_QUEUE_BASE_URL: str = os.getenv("FAL_QUEUE_BASE_URL", "https://queue.fal.run")
+    PARODY_MODEL: str = os.getenv("PARODY_MODEL", "fal-ai/minimax-video/image-to-video")
+    PARODY_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("PARODY_HTTP_TIMEOUT_SECONDS", "60"))
+    # Status polls hit fal.ai at most this often per job, however often clients poll us
+    PARODY_POLL_INTERVAL_SECONDS: float = float(os.getenv("PARODY_POLL_INTERVAL_SECONDS", "3"))
+    # Public base URL fal.ai can reach for completion webhooks ("" = polling only)
+    PARODY_WEBHOOK_BASE_URL: str = os.getenv("PARODY_WEBHOOK_BASE_URL", "").rstrip("/")
+    # Copy finished videos into our own storage (fal.ai result URLs expire)
+    PARODY_MIRROR_TO_STORAGE: bool = os.getenv("PARODY_MIRROR_TO_STORAGE", "true").lower() == "true"
+    # Where parody source images are uploaded once per content hash: "storage"
+    # (our storage backend, if publicly reachable - else "fal"), "fal" (fal.ai
+    # file store) or "inline" (data URIs)
+    ASSET_STORE: str = os.getenv("ASSET_STORE", "storage").lower()
+    # Re-upload an asset whose URL is older than this
+    ASSET_URL_TTL_SECONDS: int = int(os.getenv("ASSET_URL_TTL_SECONDS", str(7 * 24 * 3600)))
+
     # Gemini Model
     GEMINI_MODEL: str = "gemini-3-flash-preview"
-    
+
+    # Gemini file-handle cache (uploaded files expire server-side after 48h)
+    GEMINI_FILE_CACHE_TTL_SECONDS: int = int(os.getenv("GEMINI_FILE_CACHE_TTL_SECONDS", str(46 * 3600)))
+    GEMINI_FILE_CACHE_MAX_ENTRIES: int = int(os.getenv("GEMINI_FILE_CACHE_MAX_ENTRIES", "32"))
+
     def __init__(self):
         # Create temp directory if it doesn't exist
         self.TEMP_DIR.mkdir(parents=True, exist_ok=True)
@@ -47,8 +150,8 @@ class Settings:
         if not self.GEMINI_API_KEY:
             errors.append("GEMINI_API_KEY is required")
         
-        if not self.VERCEL_BLOB_TOKEN and not self.MOCK_MODE:
-            errors.append("VERCEL_BLOB_TOKEN is required (or enable MOCK_MODE)")
+        if not self.VERCEL_BLOB_TOKEN and self.STORAGE_BACKEND == "vercel":
+            errors.append("VERCEL_BLOB_TOKEN is required for STORAGE_BACKEND=vercel")
         
         return errors
 
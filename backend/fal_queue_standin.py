@@ -0,0 +1,124 @@
+"""
+ragebAIt - Local fal.ai Queue Stand-in
+A tiny server that speaks the subset of the fal.ai queue API ParodyService
+uses (submit, status, result and the completion webhook). Every request
+"generates" for FAL_STANDIN_SECONDS and produces a placeholder video served
+by this server; a prompt containing "fail" produces a failed generation.
+Use it to exercise parody jobs in tests without network access or credits:
+
+    uvicorn backend.fal_queue_standin:app --port 8200
+    FAL_QUEUE_BASE_URL=http://localhost:8200 FAL_KEY=test uvicorn backend.main:app
+
+Add PARODY_WEBHOOK_BASE_URL=http://localhost:8000 to the API to test webhooks.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+
+from backend.services.parody_service import COMPLETED, IN_PROGRESS, IN_QUEUE
+
+
+GENERATION_SECONDS = float(os.getenv("FAL_STANDIN_SECONDS", "3"))
+
+# request_id -> request (kept for the life of the process)
+_requests: dict[str, dict] = {}
+
+app = FastAPI(title="ragebAIt fal.ai queue stand-in")
+
+
+def _base_url(request: Request) -> str:
+    return str(request.base_url).rstrip("/")
+
+
+def _status(entry: dict) -> str:
+    elapsed = time.time() - entry["submitted_at"]
+    if elapsed >= GENERATION_SECONDS:
+        return COMPLETED
+    return IN_PROGRESS if elapsed >= GENERATION_SECONDS / 3 else IN_QUEUE
+
+
+def _result(entry: dict, base_url: str) -> Optional[dict]:
+    """Output of a finished request, or None if it failed."""
+    if "fail" in entry["arguments"].get("prompt", "").lower():
+        return None
+    return {"video": {"url": f"{base_url}/videos/{entry['request_id']}.mp4", "content_type": "video/mp4"}}
+
+
+async def _send_webhook(entry: dict, base_url: str):
+    await asyncio.sleep(GENERATION_SECONDS)
+    result = _result(entry, base_url)
+    body = {
+        "request_id": entry["request_id"],
+        "gateway_request_id": entry["request_id"],
+        "status": "OK" if result else "ERROR",
+        "payload": result,
+        "error": None if result else "Stand-in generation failed",
+    }
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            await client.post(entry["webhook"], json=body)
+    except httpx.HTTPError as e:
+        print(f"[fal stand-in] Webhook for {entry['request_id']} failed: {e}")
+
+
+@app.get("/videos/{request_id}.mp4")
+async def get_video(request_id: str):
+    """Placeholder output video."""
+    if request_id not in _requests:
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(content=f"stand-in video {request_id}".encode(), media_type="video/mp4")
+
+
+@app.get("/{model:path}/requests/{request_id}/status")
+async def get_status(model: str, request_id: str):
+    """Queue status of a request."""
+    entry = _requests.get(request_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+    status = _status(entry)
+    return {"status": status, "request_id": request_id, "queue_position": 0 if status == IN_QUEUE else None}
+
+
+@app.get("/{model:path}/requests/{request_id}")
+async def get_result(request: Request, model: str, request_id: str):
+    """Output of a completed request."""
+    entry = _requests.get(request_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if _status(entry) != COMPLETED:
+        raise HTTPException(status_code=400, detail="Request is still in progress")
+    result = _result(entry, _base_url(request))
+    if result is None:
+        raise HTTPException(status_code=422, detail="Stand-in generation failed")
+    return result
+
+
+@app.post("/{model:path}")
+async def submit(request: Request, model: str, fal_webhook: Optional[str] = None):
+    """Queue a request."""
+    request_id = uuid.uuid4().hex
+    entry = {
+        "request_id": request_id,
+        "model": model,
+        "arguments": await request.json(),
+        "webhook": fal_webhook,
+        "submitted_at": time.time(),
+    }
+    _requests[request_id] = entry
+
+    base_url = _base_url(request)
+    if fal_webhook:
+        asyncio.create_task(_send_webhook(entry, base_url))
+    return {
+        "request_id": request_id,
+        "status_url": f"{base_url}/{model}/requests/{request_id}/status",
+        "response_url": f"{base_url}/{model}/requests/{request_id}",
+        "cancel_url": f"{base_url}/{model}/requests/{request_id}/cancel",
+    }
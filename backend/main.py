@@ -8,8 +8,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.config import settings
-from backend.routers import generate_router, meme_router, parody_router
+from backend.routers import generate_router, meme_router, parody_router, files_router
 from backend.models.schemas import HealthResponse
+from backend.services.ingest import (
+    UploadSizeLimitMiddleware,
+    max_upload_bytes,
+    MULTIPART_OVERHEAD_BYTES
+)
 
 
 # Create FastAPI app
@@ -21,6 +26,14 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Reject oversized uploads before their bodies are read (added before CORS,
+# so CORS wraps it and its 413 reaches the browser with CORS headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=("/api/generate",),
+    max_body_bytes=max_upload_bytes() + MULTIPART_OVERHEAD_BYTES,
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +47,7 @@ app.add_middleware(
 app.include_router(generate_router)
 app.include_router(meme_router)
 app.include_router(parody_router)
+app.include_router(files_router)
 
 
 @app.get("/", tags=["root"])
@@ -103,6 +117,20 @@ async def startup_event():
     print(f"   fal.ai Parody: {'✅' if parody_service.is_available() else '❌'}")
     print(f"   Storage: {'✅' if storage_client.is_available() else '❌'}")
     
+    await storage_client.start()
+    await tts_client.start()
+    await parody_service.start()
+    
+    from backend.services.render_pool import render_pool
+    render_pool.start()
+    print(f"   Render workers: {render_pool.workers or 'threads'}")
+    
+    # Clear scratch left by previous runs, then keep sweeping in the background
+    from backend.services.scratch import scratch
+    from backend.services.job_runner import job_runner
+    scratch.sweep()
+    job_runner.spawn("scratch-sweeper", scratch.run_sweeper(settings.SCRATCH_SWEEP_INTERVAL_SECONDS))
+    
     print("=" * 50)
     print("🚀 Ready to generate sports miscommentary!")
     print("   Docs: http://localhost:8000/docs")
@@ -113,6 +141,17 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown."""
     print("👋 ragebAIt API shutting down...")
+    
+    from backend.services.job_runner import job_runner
+    from backend.services.storage_client import storage_client
+    from backend.services.tts_client import tts_client
+    from backend.services.parody_service import parody_service
+    from backend.services.render_pool import render_pool
+    await job_runner.shutdown()
+    await storage_client.close()
+    await tts_client.close()
+    await parody_service.close()
+    render_pool.shutdown()
 
 
 # Entry point for running directly
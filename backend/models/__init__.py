@@ -6,6 +6,8 @@ from .schemas import (
     CommentarySegment,
     GenerateResponse,
     LensType,
+    JobStatus,
+    JobAcceptedResponse,
     HealthResponse,
     ErrorResponse,
 )
@@ -14,6 +16,8 @@ __all__ = [
     "CommentarySegment",
     "GenerateResponse",
     "LensType",
+    "JobStatus",
+    "JobAcceptedResponse",
     "HealthResponse",
     "ErrorResponse",
 ]
@@ -26,6 +26,18 @@ class CommentarySegment(BaseModel):
     emotion: str = Field(default="neutral", description="Emotion/tone for TTS")
 
 
+class SceneVariant(BaseModel):
+    """One of several scenes rendered from the same video."""
+    rank: int = Field(..., description="0 for the best scene, then in ranking order")
+    video_url: str = Field(..., description="URL to the scene's video with commentary")
+    thumbnail_url: Optional[str] = Field(default=None, description="URL to the scene's thumbnail")
+    commentary_segments: list[CommentarySegment] = Field(..., description="Commentary for this scene")
+    duration: float = Field(..., description="Scene duration in seconds")
+    start_time: float = Field(..., description="Scene start in the source video (seconds)")
+    end_time: float = Field(..., description="Scene end in the source video (seconds)")
+    humor_score: int = Field(..., description="Humor score (1-10)")
+
+
 class GenerateResponse(BaseModel):
     """Response from video generation endpoint."""
     video_id: str = Field(..., description="Unique ID for the generated video")
@@ -34,6 +46,26 @@ class GenerateResponse(BaseModel):
     commentary_segments: list[CommentarySegment] = Field(..., description="Generated commentary segments")
     lens: LensType = Field(..., description="Lens used for generation")
     duration: float = Field(..., description="Video duration in seconds")
+    variants: list[SceneVariant] = Field(
+        default_factory=list,
+        description="Every rendered scene, best first (only when more than one was requested)"
+    )
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a generation job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response when a generation is accepted as a background job."""
+    video_id: str = Field(..., description="Job/video ID to poll")
+    status: JobStatus = Field(..., description="Current job status")
+    status_url: str = Field(..., description="URL to poll for progress and results")
+    events_url: str = Field(..., description="Server-Sent Events stream of progress updates")
 
 
 class HealthResponse(BaseModel):
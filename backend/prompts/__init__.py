@@ -2,6 +2,6 @@
 ragebAIt - Comedy Lens Prompts
 """
 
-from .lenses import LENSES, get_lens_config, get_lens_prompt, LensConfig
+from .lenses import LENSES, PROMPT_VERSION, get_lens_config, get_lens_prompt, LensConfig
 
-__all__ = ["LENSES", "get_lens_config", "get_lens_prompt", "LensConfig"]
+__all__ = ["LENSES", "PROMPT_VERSION", "get_lens_config", "get_lens_prompt", "LensConfig"]
@@ -17,6 +17,11 @@ class LensConfig:
     system_prompt: str
 
 
+# Bump whenever a prompt here or in gemini_client changes; it is part of
+# every cached scene detection / commentary key
+PROMPT_VERSION = "1"
+
+
 # Base system prompt included with all lenses
 BASE_SYSTEM_PROMPT = """
 You are generating comedic sports commentary for a video clip.
@@ -0,0 +1,143 @@
+"""
+ragebAIt - Local Files Router
+Serves objects from the local storage backend with HTTP Range requests,
+strong ETags and conditional GETs, so players can seek inside generated
+videos without downloading them in full.
+"""
+
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from backend.services.storage_client import LocalStorageBackend, content_type_for, storage_client
+
+
+router = APIRouter(tags=["files"])
+
+CHUNK_SIZE = 256 * 1024
+
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@router.api_route("/files/{name}", methods=["GET", "HEAD"])
+async def get_file(name: str, request: Request):
+    """
+    Serve a stored object.
+
+    Supports a single byte range (Range / If-Range), If-None-Match and
+    If-Modified-Since. Objects are content-addressed, so the name is a
+    strong ETag and responses are cacheable forever.
+    """
+    backend = storage_client.backend
+    if not isinstance(backend, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Local storage is not enabled")
+
+    path = backend.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    stat = path.stat()
+    size = stat.st_size
+    etag = f'"{Path(name).stem}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    # Malformed or multi-range headers are ignored (full 200 response)
+    if range_header and RANGE_HEADER.match(range_header.strip()) and _if_range_matches(request, etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    media_type = content_type_for(name)
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    return StreamingResponse(
+        _read_range(path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_matches(request: Request, etag: str) -> bool:
+    """A Range only applies if If-Range is absent or names the current ETag."""
+    if_range = request.headers.get("if-range")
+    return if_range is None or if_range.strip() == etag
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range.
+
+    Returns:
+        Inclusive (start, end), or None if the range is unsatisfiable
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        if last == "" or int(last) == 0:
+            return None
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _read_range(path: Path, start: int, end: int):
+    """Stream bytes [start, end] of a file."""
+    remaining = end - start + 1
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
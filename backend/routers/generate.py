@@ -3,46 +3,56 @@ ragebAIt - Video Generation Router
 Handles video upload, funny moment detection, clip extraction, and ragebait commentary generation.
 """
 
+import asyncio
+import functools
+import json
 import uuid
-import tempfile
-import aiofiles
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from backend.config import settings
 from backend.models.schemas import (
     GenerateResponse,
-    CommentarySegment,
+    JobAcceptedResponse,
+    JobStatus,
     LensType,
     ErrorResponse
 )
 from backend.services.video_processor import video_processor
-from backend.services.gemini_client import gemini_client
-from backend.services.tts_client import tts_client
-from backend.services.storage_client import storage_client
+from backend.services.job_store import job_store
+from backend.services.job_runner import job_runner
+from backend.services.executors import run_blocking
+from backend.services.ingest import save_upload, UploadRejected
+from backend.services.scratch import scratch, ScratchFull
+from backend.services.render_pool import render_pool, RenderPoolBusy
+from backend.services.generation_pipeline import generation_pipeline, PipelineError
 
 
 router = APIRouter(tags=["generation"])
 
 
-# In-memory store for video data (for meme generation later)
-# In production, use Redis or database
-video_store: dict[str, dict] = {}
-
-
 @router.post(
     "/api/generate",
     response_model=GenerateResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}}
+    responses={
+        202: {"model": JobAcceptedResponse},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse}
+    }
 )
 async def generate_commentary(
     video: UploadFile = File(..., description="Video file to process (1-2 minutes)"),
     lens: LensType = Form(..., description="Comedy lens to apply"),
     context: Optional[str] = Form(default=None, description="JSON context from Browser Use"),
     min_scene_duration: float = Form(default=8.0, description="Minimum scene duration (seconds)"),
-    max_scene_duration: float = Form(default=30.0, description="Maximum scene duration (seconds)")
+    max_scene_duration: float = Form(default=30.0, description="Maximum scene duration (seconds)"),
+    async_mode: bool = Form(default=False, description="Return a job ID immediately and run in the background"),
+    num_variants: int = Form(default=1, description="How many of the top scenes to render (each a separate clip)")
 ):
     """
     Generate AI ragebait comedy commentary for a sports video.
@@ -54,6 +64,14 @@ async def generate_commentary(
     4. Generates ragebait-style commentary for the scene
     5. Uses fal.ai TTS with angry/fast voice (TikTok style)
     6. Returns the final viral-ready clip with the complete scene
+    
+    With num_variants > 1 the top scenes are rendered concurrently from one
+    scene-detection pass; the best is the main result and all of them are
+    listed in `variants`.
+    
+    With async_mode=true the request returns 202 with a job ID as soon as the
+    upload is validated. Poll GET /api/video/{video_id} (or stream
+    GET /api/video/{video_id}/events) for per-stage progress and partial results.
     """
     # Validate file
     if not video.filename:
@@ -66,21 +84,33 @@ async def generate_commentary(
             detail=f"Invalid file type. Allowed: {settings.ALLOWED_VIDEO_EXTENSIONS}"
         )
     
+    if not 1 <= num_variants <= settings.GENERATE_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"num_variants must be between 1 and {settings.GENERATE_MAX_VARIANTS}"
+        )
+    
     # Generate unique ID for this generation
     video_id = uuid.uuid4().hex[:12]
+    # Once the pipeline owns the job it cleans up the scratch directory itself
+    handed_off = False
     
     try:
-        # Save uploaded video to temp file
-        temp_video_path = settings.TEMP_DIR / f"{video_id}_input{file_ext}"
+        # Refuse new work while scratch space is full
+        await run_blocking(scratch.ensure_capacity)
         
-        async with aiofiles.open(temp_video_path, 'wb') as f:
-            content = await video.read()
-            await f.write(content)
+        # Stream the upload into the job's scratch directory (size-capped, hashed on the fly)
+        temp_video_path = scratch.path(video_id, f"input{file_ext}")
+        upload = await save_upload(
+            video,
+            temp_video_path,
+            max_duration=settings.MAX_VIDEO_DURATION_SECONDS
+        )
         
-        print(f"[Generate] Saved video to {temp_video_path}")
+        print(f"[Generate] Saved video to {temp_video_path} ({upload.size / 1e6:.1f}MB, sha256 {upload.sha256[:12]})")
         
         # Get video info
-        video_info = video_processor.get_video_info(str(temp_video_path))
+        video_info = await render_pool.run(video_processor.get_video_info, str(temp_video_path))
         print(f"[Generate] Video info: {video_info}")
         
         # Check duration limit
@@ -93,168 +123,58 @@ async def generate_commentary(
         # Parse context if provided
         context_dict = None
         if context:
-            import json
             try:
                 context_dict = json.loads(context)
             except json.JSONDecodeError:
                 pass  # Ignore invalid context
         
-        # STEP 1: Find complete funny scenes in the video
-        print(f"[Generate] 🔍 Finding complete funny scenes in {video_info['duration']:.1f}s video...")
-        funny_moments = await gemini_client.find_funny_moments(
+        await generation_pipeline.create_job(video_id, lens, source_sha256=upload.sha256)
+        # The pipeline coroutine is only created once the job gets a slot
+        job = functools.partial(
+            generation_pipeline.run,
+            video_id,
             str(temp_video_path),
-            video_duration=video_info['duration'],
-            min_clip_duration=min_scene_duration,
-            max_clip_duration=max_scene_duration,
-            num_moments=3  # Find top 3, use the best one
-        )
-        
-        if not funny_moments:
-            raise HTTPException(
-                status_code=500,
-                detail="Could not find any interesting scenes in the video"
-            )
-        
-        # Use the best scene (highest humor score)
-        best_moment = funny_moments[0]
-        scene_duration = best_moment.end_time - best_moment.start_time
-        print(f"[Generate] 🎯 Best scene: [{best_moment.start_time:.1f}s-{best_moment.end_time:.1f}s] ({scene_duration:.1f}s) Score: {best_moment.humor_score}/10")
-        print(f"[Generate]    Description: {best_moment.description}")
-        print(f"[Generate]    Reason: {best_moment.reason}")
-        
-        # STEP 2: Extract the complete scene
-        clip_path = str(settings.TEMP_DIR / f"{video_id}_clip.mp4")
-        clip_path = video_processor.extract_clip(
-            str(temp_video_path),
-            start_time=best_moment.start_time,
-            end_time=best_moment.end_time,
-            output_path=clip_path
-        )
-        
-        clip_duration = best_moment.end_time - best_moment.start_time
-        print(f"[Generate] ✂️ Extracted {clip_duration:.1f}s clip")
-        
-        # STEP 3: Generate ragebait commentary for the clip
-        print(f"[Generate] 🎙️ Generating ragebait commentary with {lens.value} lens...")
-        segments = await gemini_client.generate_ragebait_commentary(
-            clip_path,
-            moment=best_moment,
-            lens=lens,
-            context=context_dict
-        )
-        
-        print(f"[Generate] Got {len(segments)} ragebait commentary segments")
-        
-        # Store initial video data (without meme yet)
-        commentary_text = " ".join([s.text for s in segments])
-        video_store[video_id] = {
-            "video_path": clip_path,
-            "original_video_path": str(temp_video_path),
-            "segments": segments,
-            "commentary_text": commentary_text,
-            "lens": lens,
-            "video_info": {
-                "duration": clip_duration,
-                "original_duration": video_info['duration'],
-                **video_info
-            }
-        }
-        
-        # Extract frames from clip for meme generation later
-        frames = video_processor.extract_frames(
-            clip_path,
-            fps=1.0,
-            max_frames=int(clip_duration) + 1
+            video_info,
+            lens,
+            context=context_dict,
+            min_scene_duration=min_scene_duration,
+            max_scene_duration=max_scene_duration,
+            source_sha256=upload.sha256,
+            num_variants=num_variants
         )
         
-        # STEP 4: Generate TTS audio with fal.ai (ragebait style)
-        output_video_url = ""
-        thumbnail_url = None
+        on_cancel_queued = functools.partial(generation_pipeline.cancel_queued, video_id)
         
-        if tts_client.is_available():
-            audio_path = await tts_client.synthesize_commentary(
-                segments,
-                lens,
-                output_path=str(settings.TEMP_DIR / f"{video_id}_audio.mp3")
+        handed_off = True
+        if async_mode:
+            job_runner.submit(video_id, job, on_cancel_queued)
+            print(f"[Generate] Queued job {video_id}")
+            accepted = JobAcceptedResponse(
+                video_id=video_id,
+                status=JobStatus.QUEUED,
+                status_url=f"/api/video/{video_id}",
+                events_url=f"/api/video/{video_id}/events"
             )
-            
-            # STEP 5: Merge audio with clip
-            output_video_path = video_processor.merge_audio_video(
-                clip_path,
-                audio_path,
-                output_path=str(settings.TEMP_DIR / f"{video_id}_output.mp4"),
-                keep_original_audio=True,
-                original_audio_volume=0.15  # Lower original audio for ragebait
-            )
-            
-            # Create thumbnail
-            thumb_path = video_processor.create_thumbnail(
-                output_video_path,
-                timestamp=clip_duration * 0.5  # Middle of clip
-            )
-            
-            # Upload to storage
-            if storage_client.is_available():
-                output_video_url = await storage_client.upload_from_path(output_video_path)
-                thumbnail_url = await storage_client.upload_from_path(thumb_path)
-                print(f"[Generate] ☁️ Uploaded to storage: {output_video_url}")
-            else:
-                output_video_url = f"file://{output_video_path}"
-        else:
-            # TTS not available - return clip without audio
-            if storage_client.is_available():
-                output_video_url = await storage_client.upload_from_path(clip_path)
-            else:
-                output_video_url = f"file://{clip_path}"
+            return JSONResponse(status_code=202, content=accepted.model_dump(mode="json"))
         
-        # Update storage URLs
-        video_store[video_id].update({
-            "output_url": output_video_url,
-            "thumbnail_url": thumbnail_url,
-            "frames": frames,
-            "funny_moment": {
-                "start_time": best_moment.start_time,
-                "end_time": best_moment.end_time,
-                "description": best_moment.description,
-                "humor_score": best_moment.humor_score,
-                "reason": best_moment.reason
-            }
-        })
-
-        # STEP 6: Auto-generate meme in background (simulated here for simplicity)
-        # In a real app, this should be a background task
-        try:
-            print(f"[Generate] 🍌 Auto-generating meme...")
-            meme_result = await meme_engine.generate_meme(
-                frame_base64=frames[len(frames) // 2]["image_base64"],
-                context=commentary_text
-            )
-            video_store[video_id].update({
-                "meme_url": await storage_client.upload_image(base64.b64decode(meme_result["image_base64"]), "meme.png") if storage_client.is_available() else f"data:image/png;base64,{meme_result['image_base64']}",
-                "caption": meme_result["caption"]
-            })
-            print(f"[Generate] ✅ Auto-meme ready")
-        except Exception as e:
-            print(f"[Generate] Warning: Auto-meme failed: {e}")
-        
-        print(f"[Generate] ✅ Ragebait clip ready! Video ID: {video_id}")
-        
-        return GenerateResponse(
-            video_id=video_id,
-            video_url=output_video_url,
-            thumbnail_url=thumbnail_url,
-            commentary_segments=segments,
-            lens=lens,
-            duration=clip_duration
-        )
+        return await job_runner.run(job, on_cancel_queued)
         
     except HTTPException:
         raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except (ScratchFull, RenderPoolBusy) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PipelineError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         print(f"[Generate] Error: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not handed_off:
+            scratch.release(video_id)
 
 
 @router.get("/api/lenses")
@@ -277,24 +197,82 @@ async def list_lenses():
 @router.get("/api/video/{video_id}")
 async def get_video_info(video_id: str):
     """Get info about a generated video."""
-    if video_id not in video_store:
+    data = await job_store.aget(video_id)
+    if data is None:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    data = video_store[video_id]
+    return _video_payload(video_id, data)
+
+
+@router.get("/api/video/{video_id}/events")
+async def stream_video_events(video_id: str):
+    """
+    Stream job progress as Server-Sent Events.
+    
+    Emits the same payload as GET /api/video/{video_id} whenever it changes,
+    and closes once the job has completed or failed.
+    """
+    if await job_store.aget(video_id) is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    async def events():
+        last_payload = None
+        while True:
+            data = await job_store.aget(video_id)
+            if data is None:
+                yield "event: error\ndata: {\"detail\": \"Video not found\"}\n\n"
+                return
+            
+            payload = json.dumps(_video_payload(video_id, data), default=str)
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+            
+            if data.get("status") in (JobStatus.COMPLETED.value, JobStatus.FAILED.value):
+                return
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_SECONDS)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _video_payload(video_id: str, data: dict) -> dict:
+    """Public view of a job record (status, progress and any results so far)."""
     return {
         "video_id": video_id,
+        "status": data.get("status", JobStatus.COMPLETED.value),
+        "stage": data.get("stage"),
+        "running_stages": data.get("running_stages", []),
+        "progress": data.get("progress", 1.0),
+        "timings": data.get("timings", {}),
+        "cache_hits": data.get("cache_hits", []),
+        "error": data.get("error"),
         "video_url": data.get("output_url", ""),
         "thumbnail_url": data.get("thumbnail_url"),
         "meme_url": data.get("meme_url"),
+        "meme_status": data.get("meme_status"),
         "caption": data.get("caption"),
         "lens": data.get("lens", ""),
         "duration": data.get("video_info", {}).get("duration", 0),
         "original_duration": data.get("video_info", {}).get("original_duration", 0),
         "segments": data.get("segments", []),
         "funny_moment": data.get("funny_moment", {}),
+        "variants": [
+            {
+                "rank": v["rank"],
+                "video_url": v.get("output_url", ""),
+                "thumbnail_url": v.get("thumbnail_url"),
+                "segments": v.get("segments", []),
+                "funny_moment": v["funny_moment"],
+            }
+            for v in data.get("variants", [])
+        ],
     }
 
 
-def get_video_data(video_id: str) -> Optional[dict]:
-    """Get stored video data (for meme router)."""
-    return video_store.get(video_id)
+async def get_video_data(video_id: str) -> Optional[dict]:
+    """Get stored video data (for meme and parody routers)."""
+    return await job_store.aget(video_id)
@@ -9,9 +9,11 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from backend.config import settings
 from backend.services.meme_engine import meme_engine
 from backend.services.storage_client import storage_client
+from backend.services.executors import run_blocking
+from backend.services.frame_store import load_frame
+from backend.services.scratch import scratch
 from backend.routers.generate import get_video_data
 
 
@@ -57,7 +59,7 @@ async def generate_meme(request: MemeGenerateRequest):
         )
     
     # Get video data
-    video_data = get_video_data(request.video_id)
+    video_data = await get_video_data(request.video_id)
     if not video_data:
         raise HTTPException(status_code=404, detail="Video not found")
     
@@ -85,13 +87,16 @@ async def generate_meme(request: MemeGenerateRequest):
     
     context = " | ".join(context_parts) if context_parts else ""
     
+    meme_id = uuid.uuid4().hex[:12]
+    scratch_id = f"meme-{meme_id}"
+    
     try:
         # Generate meme
-        meme_id = uuid.uuid4().hex[:12]
-        output_path = str(settings.TEMP_DIR / f"meme_{meme_id}.png")
+        output_path = str(scratch.path(scratch_id, "meme.png"))
         
+        frame_jpeg = await run_blocking(load_frame, frame)
         result = await meme_engine.generate_meme(
-            frame_base64=frame["image_base64"],
+            frame_jpeg=frame_jpeg,
             context=context,
             output_path=output_path
         )
@@ -99,8 +104,10 @@ async def generate_meme(request: MemeGenerateRequest):
         # Upload to storage if available
         if storage_client.is_available():
             meme_url = await storage_client.upload_from_path(output_path)
+            scratch.release(scratch_id)
         else:
             meme_url = f"file://{output_path}"
+            scratch.release(scratch_id, keep=True)
         
         return MemeGenerateResponse(
             meme_id=meme_id,
@@ -111,6 +118,7 @@ async def generate_meme(request: MemeGenerateRequest):
         )
         
     except Exception as e:
+        scratch.release(scratch_id)
         print(f"[Meme] Error generating meme: {e}")
         import traceback
         traceback.print_exc()
@@ -1,17 +1,23 @@
 """
 ragebAIt - Parody Generation Router
 Handles image-to-video generations using fal.ai.
+
+Generations are queued as parody jobs (services/parody_jobs.py): the
+generate endpoint returns 202 with a job to poll, and fal.ai can report
+completion through the webhook endpoint.
 """
 
-import uuid
 from typing import Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from backend.models.schemas import JobStatus
 from backend.services.parody_service import parody_service
-from backend.services.storage_client import storage_client
+from backend.services.parody_jobs import parody_jobs
+from backend.services.asset_registry import asset_registry
+from backend.services.frame_store import load_frame
+from backend.services.executors import run_blocking
 from backend.routers.generate import get_video_data
-from backend.config import settings
 
 router = APIRouter(tags=["parody"])
 
@@ -22,20 +28,27 @@ class ParodyGenerateRequest(BaseModel):
     motion_directive: str = Field(..., description="Motion instruction (e.g. 'slow zoom-in')")
     meme_url: Optional[str] = Field(default=None, description="Optional URL of a generated meme to use instead of a raw frame")
 
-class ParodyGenerateResponse(BaseModel):
-    """Response with generated parody video."""
+class ParodyJobResponse(BaseModel):
+    """A parody job and, once completed, its video."""
     parody_id: str = Field(..., description="Unique parody ID")
-    video_url: str = Field(..., description="URL to generated parody video")
+    status: JobStatus = Field(..., description="Current job status")
+    status_url: str = Field(..., description="URL to poll for the result")
     motion_directive: str = Field(..., description="The motion directive used")
+    video_url: Optional[str] = Field(default=None, description="URL to generated parody video (when completed)")
+    error: Optional[str] = Field(default=None, description="Failure reason (when failed)")
 
 @router.post(
     "/api/parody/generate",
-    response_model=ParodyGenerateResponse,
-    summary="Generate an image-to-video parody using fal.ai"
+    response_model=ParodyJobResponse,
+    status_code=202,
+    summary="Queue an image-to-video parody using fal.ai"
 )
 async def generate_parody(request: ParodyGenerateRequest):
     """
-    Generate an AI parody video using fal.ai image-to-video.
+    Queue an AI parody video using fal.ai image-to-video.
+    
+    Returns 202 with a parody job right away; poll GET /api/parody/{parody_id}
+    until its status is completed (video_url set) or failed.
     """
     if not parody_service.is_available():
         raise HTTPException(
@@ -43,12 +56,16 @@ async def generate_parody(request: ParodyGenerateRequest):
             detail="Parody service (fal.ai) not available. Check FAL_KEY."
         )
 
-    # 1. Determine the source image
+    # 1. Determine the source image (uploaded once per content hash and
+    # passed by URL, so repeat parodies of the same image don't resend it)
     source_image_url = request.meme_url
     
-    if not source_image_url:
+    if source_image_url:
+        # Memes stored without a storage backend are data URIs
+        source_image_url = await asset_registry.url_for_uri(source_image_url)
+    else:
         # Fallback to frame from video
-        video_data = get_video_data(request.video_id)
+        video_data = await get_video_data(request.video_id)
         if not video_data:
             raise HTTPException(status_code=404, detail="Video not found")
         
@@ -64,13 +81,12 @@ async def generate_parody(request: ParodyGenerateRequest):
         else:
             frame = frames[len(frames) // 2]
         
-        # We need a URL. If it's base64, we might need to upload it temporarily or use data URI.
-        # fal.ai supports data URIs.
-        source_image_url = f"data:image/jpeg;base64,{frame['image_base64']}"
+        frame_jpeg = await run_blocking(load_frame, frame)
+        source_image_url = await asset_registry.url_for(frame_jpeg, "image/jpeg")
 
     # 2. Prepare the prompt
     # We can use the commentary as context if we have it
-    video_data = get_video_data(request.video_id)
+    video_data = await get_video_data(request.video_id)
     commentary = ""
     if video_data:
         commentary = video_data.get("commentary_text", "")
@@ -78,22 +94,52 @@ async def generate_parody(request: ParodyGenerateRequest):
     prompt = f"A parody of a sports moment. {commentary[:500]}"
     
     try:
-        parody_id = uuid.uuid4().hex[:12]
-        
-        video_url = await parody_service.generate_image_to_video(
+        record = await parody_jobs.submit(
+            video_id=request.video_id,
             image_url=source_image_url,
             prompt=prompt,
             motion_directive=request.motion_directive
         )
-        
-        return ParodyGenerateResponse(
-            parody_id=parody_id,
-            video_url=video_url,
-            motion_directive=request.motion_directive
-        )
+        return _job_response(record)
         
     except Exception as e:
         print(f"[Parody] Error: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/api/parody/{parody_id}",
+    response_model=ParodyJobResponse,
+    summary="Get the status or result of a parody job"
+)
+async def get_parody(parody_id: str):
+    """Status of a parody job, with video_url once it has completed."""
+    record = await parody_jobs.refresh(parody_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Parody not found")
+    return _job_response(record)
+
+
+@router.post(
+    "/api/parody/{parody_id}/webhook",
+    include_in_schema=False
+)
+async def parody_webhook(parody_id: str, token: str = Query(...), payload: dict = Body(...)):
+    """Completion callback from fal.ai (see PARODY_WEBHOOK_BASE_URL)."""
+    record = await parody_jobs.handle_webhook(parody_id, token, payload)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Parody not found")
+    return {"status": record["status"]}
+
+
+def _job_response(record: dict) -> ParodyJobResponse:
+    return ParodyJobResponse(
+        parody_id=record["parody_id"],
+        status=JobStatus(record["status"]),
+        status_url=f"/api/parody/{record['parody_id']}",
+        motion_directive=record["motion_directive"],
+        video_url=record.get("video_url"),
+        error=record.get("error")
+    )
@@ -0,0 +1,246 @@
+"""
+ragebAIt - Activity Analysis
+Cheap local signals that show where things happen in a video, used to pick
+candidate windows before anything is sent to Gemini.
+
+Every signal is per second of source video and computed with NumPy from
+low-resolution grayscale frames and 8 kHz mono audio decoded by ffmpeg:
+- motion: mean absolute difference between consecutive frames
+- cuts: hard shot changes (large grayscale-histogram jumps)
+- loudness: audio RMS over the second
+- spikes: loudest quarter-second relative to the surrounding level
+  (crowd roars, whistles, commentators shouting)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+# Decode parameters for the analysis pass
+ANALYSIS_FPS = 4
+ANALYSIS_WIDTH = 64
+ANALYSIS_HEIGHT = 36
+AUDIO_RATE = 8000
+
+# Histogram L1 distance (0-2) between consecutive frames that counts as a cut
+CUT_THRESHOLD = 0.5
+HIST_BINS = 16
+
+# Loudness spikes are measured against the median of this many seconds around them
+SPIKE_CONTEXT_SECONDS = 11
+
+# How much each signal counts towards the activity score
+SIGNAL_WEIGHTS = {"motion": 1.0, "spikes": 1.5, "loudness": 0.5, "cuts": 0.5}
+
+
+@dataclass
+class ActivityProfile:
+    """Per-second activity signals of a video."""
+    motion: np.ndarray
+    cuts: np.ndarray
+    loudness: np.ndarray
+    spikes: np.ndarray
+
+    @property
+    def seconds(self) -> int:
+        return len(self.motion)
+
+    def score(self) -> np.ndarray:
+        """Weighted sum of robustly normalised signals, one value per second."""
+        return (
+            SIGNAL_WEIGHTS["motion"] * _robust_z(self.motion)
+            + SIGNAL_WEIGHTS["spikes"] * _robust_z(self.spikes)
+            + SIGNAL_WEIGHTS["loudness"] * _robust_z(self.loudness)
+            + SIGNAL_WEIGHTS["cuts"] * np.minimum(self.cuts, 2)
+        )
+
+
+def compute_profile(frames: np.ndarray, samples: Optional[np.ndarray], duration: float) -> ActivityProfile:
+    """
+    Build an activity profile from decoded frames and audio.
+
+    Args:
+        frames: uint8 array (n, height, width) sampled at ANALYSIS_FPS
+        samples: int16 mono audio at AUDIO_RATE, or None if there is no audio
+        duration: Video duration in seconds
+
+    Returns:
+        ActivityProfile with one entry per (started) second
+    """
+    seconds = max(1, int(np.ceil(duration)))
+    motion, cuts = _frame_signals(frames, seconds)
+    if samples is not None and len(samples):
+        loudness, spikes = _audio_signals(samples, seconds)
+    else:
+        loudness = np.zeros(seconds)
+        spikes = np.zeros(seconds)
+    return ActivityProfile(motion=motion, cuts=cuts, loudness=loudness, spikes=spikes)
+
+
+def propose_windows(
+    scores: np.ndarray,
+    window_seconds: int,
+    max_windows: int,
+    max_total_seconds: int
+) -> list[tuple[float, float]]:
+    """
+    Pick the most active non-overlapping windows.
+
+    Args:
+        scores: Per-second activity score
+        window_seconds: Length of each window
+        max_windows: Maximum number of windows
+        max_total_seconds: Cap on the combined length of all windows
+
+    Returns:
+        (start, end) windows in seconds, in time order, adjacent ones merged.
+        Videos within max_total_seconds come back as one window covering everything.
+    """
+    seconds = len(scores)
+    window_seconds = max(1, min(window_seconds, seconds))
+    max_windows = max(1, min(max_windows, max_total_seconds // window_seconds))
+    if seconds <= max_total_seconds:
+        return [(0.0, float(seconds))]
+
+    # Activity summed over every possible window start
+    totals = np.convolve(scores, np.ones(window_seconds), mode="valid")
+    starts = []
+    for _ in range(max_windows):
+        if np.all(np.isneginf(totals)):
+            break
+        start = int(np.argmax(totals))
+        starts.append(start)
+        # No later window may overlap this one
+        totals[max(0, start - window_seconds + 1):start + window_seconds] = -np.inf
+
+    windows: list[tuple[float, float]] = []
+    for start in sorted(starts):
+        end = start + window_seconds
+        if windows and windows[-1][1] >= start:
+            windows[-1] = (windows[-1][0], float(end))
+        else:
+            windows.append((float(start), float(end)))
+    return windows
+
+
+class TimeMap:
+    """Maps times in a reel of source excerpts back to the source and forth."""
+
+    def __init__(self, windows: list[tuple[float, float]]):
+        # (reel start, source start, length) for each excerpt, in reel order
+        self.segments: list[tuple[float, float, float]] = []
+        offset = 0.0
+        for start, end in windows:
+            self.segments.append((offset, start, end - start))
+            offset += end - start
+
+    @property
+    def duration(self) -> float:
+        return sum(length for _, _, length in self.segments)
+
+    def excerpts(self) -> list[tuple[float, float]]:
+        """(start, end) of each excerpt in reel time."""
+        return [(reel, reel + length) for reel, _, length in self.segments]
+
+    def range_to_source(self, start: float, end: float) -> tuple[float, float]:
+        """
+        Map a reel range to the source, kept inside the excerpt holding its start
+        (a range spanning two excerpts would straddle a jump in the source).
+        """
+        reel, source, length = self._segment_at(start)
+        start = min(max(start, reel), reel + length)
+        end = min(max(end, start), reel + length)
+        return source + (start - reel), source + (end - reel)
+
+    def range_to_reel(self, start: float, end: float) -> Optional[tuple[float, float]]:
+        """Map a source range into the reel, or None if no excerpt contains it."""
+        for reel, source, length in self.segments:
+            if source - 0.01 <= start and end <= source + length + 0.01:
+                return reel + max(0.0, start - source), reel + min(length, end - source)
+        return None
+
+    def _segment_at(self, t: float) -> tuple[float, float, float]:
+        for segment in self.segments:
+            if t < segment[0] + segment[2]:
+                return segment
+        return self.segments[-1]
+
+
+def _frame_signals(frames: np.ndarray, seconds: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-second motion and cut counts."""
+    if len(frames) < 2:
+        return np.zeros(seconds), np.zeros(seconds)
+
+    n = len(frames)
+    flat = frames.reshape(n, -1)
+
+    # Motion: mean absolute difference from the previous frame (0-1)
+    diffs = np.abs(np.diff(flat.astype(np.int16), axis=0)).mean(axis=1) / 255.0
+    motion = np.concatenate([[0.0], diffs])
+
+    cut = detect_cuts(frames).astype(float)
+    # A cut is itself a big frame difference; don't count it as motion too
+    motion[cut > 0] = 0.0
+
+    return _per_second(motion, ANALYSIS_FPS, seconds, np.mean), _per_second(cut, ANALYSIS_FPS, seconds, np.sum)
+
+
+def detect_cuts(frames: np.ndarray) -> np.ndarray:
+    """
+    Flag frames that start a new shot.
+
+    Args:
+        frames: uint8 grayscale frames (n, height, width)
+
+    Returns:
+        Boolean array (n,): True where the grayscale histogram jumps by more
+        than CUT_THRESHOLD (L1, 0-2) from the previous frame
+    """
+    n = len(frames)
+    if n < 2:
+        return np.zeros(n, dtype=bool)
+    flat = frames.reshape(n, -1)
+    # One bincount for all frames: offset each frame's bins into its own range
+    bins = (flat.astype(np.int64) * HIST_BINS) >> 8
+    bins += np.arange(n)[:, None] * HIST_BINS
+    hist = np.bincount(bins.ravel(), minlength=n * HIST_BINS).reshape(n, HIST_BINS) / flat.shape[1]
+    distances = np.concatenate([[0.0], np.abs(np.diff(hist, axis=0)).sum(axis=1)])
+    return distances > CUT_THRESHOLD
+
+
+def _audio_signals(samples: np.ndarray, seconds: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-second RMS loudness and spike strength."""
+    quarter = AUDIO_RATE // 4
+    audio = _fit(samples.astype(np.float32) / 32768.0, seconds * AUDIO_RATE)
+    quarter_rms = np.sqrt(np.mean(audio.reshape(seconds * 4, quarter) ** 2, axis=1)).reshape(seconds, 4)
+
+    loudness = np.sqrt(np.mean(quarter_rms ** 2, axis=1))
+    half = SPIKE_CONTEXT_SECONDS // 2
+    padded = np.pad(loudness, half, mode="edge")
+    context = np.median(np.lib.stride_tricks.sliding_window_view(padded, SPIKE_CONTEXT_SECONDS), axis=1)
+    spikes = np.maximum(quarter_rms.max(axis=1) / (context + 1e-4) - 1.0, 0.0)
+    return loudness, spikes
+
+
+def _per_second(values: np.ndarray, rate: int, seconds: int, reduce) -> np.ndarray:
+    return reduce(_fit(values, seconds * rate).reshape(seconds, rate), axis=1)
+
+
+def _fit(values: np.ndarray, length: int) -> np.ndarray:
+    """Truncate or zero-pad to exactly length entries."""
+    if len(values) >= length:
+        return values[:length]
+    return np.pad(values, (0, length - len(values)))
+
+
+def _robust_z(values: np.ndarray) -> np.ndarray:
+    """How far above typical each value is, in robust standard deviations (0-6)."""
+    median = np.median(values)
+    spread = 1.4826 * np.median(np.abs(values - median))
+    if spread <= 1e-9:
+        spread = values.std()
+    if spread <= 1e-9:
+        return np.zeros_like(values, dtype=float)
+    return np.clip((values - median) / spread, 0.0, 6.0)
@@ -0,0 +1,151 @@
+"""
+ragebAIt - Asset Registry
+Public URLs for images handed to other services (parody source frames and
+memes), so they are sent by reference instead of as inline data URIs.
+
+Each image is uploaded once per content hash, to our storage backend or
+the fal.ai file store (ASSET_STORE), and its URL is recorded in the result
+cache. Our storage is only used when fal.ai can fetch from it (see
+StorageClient.is_public); otherwise the fal.ai file store is used if we
+have a key, and inline data URIs if not. Every later parody of the same frame or meme - another motion
+directive, a retry, another worker - reuses the URL. Concurrent requests
+for the same image wait on one upload.
+"""
+
+import asyncio
+import base64
+import os
+import time
+from typing import Optional
+
+# Clean FAL_KEY environment variable BEFORE importing fal_client
+# (fal_client reads it directly from env)
+if os.getenv("FAL_KEY"):
+    os.environ["FAL_KEY"] = os.getenv("FAL_KEY", "").strip()
+
+import fal_client
+from backend.config import settings
+from backend.services import result_cache as cache_layers
+from backend.services.executors import run_blocking
+from backend.services.hashing import bytes_sha256
+from backend.services.result_cache import result_cache, make_key
+from backend.services.storage_client import storage_client
+
+
+# File extensions by image content type
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+class AssetRegistry:
+    """Uploads images once by content hash and hands out their URLs."""
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Last store choice logged (logged again only when it changes)
+        self._logged_store: Optional[str] = "unset"
+
+    async def url_for(self, data: bytes, content_type: str = "image/jpeg") -> str:
+        """
+        A URL for an image, uploading it only if it has no fresh URL yet.
+
+        Falls back to a data URI when ASSET_STORE is "inline", no store
+        reachable by fal.ai is configured or the upload fails.
+
+        Args:
+            data: Image bytes
+            content_type: MIME type of the image
+
+        Returns:
+            Public URL (or data URI) of the image
+        """
+        store = self._store()
+        if store is None:
+            return to_data_uri(data, content_type)
+
+        digest = bytes_sha256(data)
+        key = make_key(digest, store, self._store_identity(store))
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            entry = await run_blocking(result_cache.get_json, cache_layers.ASSETS, key)
+            if entry is not None and time.time() - entry["uploaded_at"] < settings.ASSET_URL_TTL_SECONDS:
+                print(f"[Assets] Reusing {entry['url']} for {digest[:12]}")
+                return entry["url"]
+
+            try:
+                url = await self._upload(store, data, content_type, digest)
+            except Exception as e:
+                print(f"[Assets] Warning: could not upload {digest[:12]} to {store}, sending it inline: {e}")
+                return to_data_uri(data, content_type)
+            print(f"[Assets] Uploaded {len(data) / 1e3:.0f}KB image {digest[:12]} to {store}: {url}")
+            await run_blocking(
+                result_cache.put_json, cache_layers.ASSETS, key, {"url": url, "uploaded_at": time.time()}
+            )
+        return url
+
+    async def url_for_uri(self, uri: str) -> str:
+        """Swap a data URI for an uploaded URL; any other URL is returned as is."""
+        decoded = from_data_uri(uri)
+        if decoded is None:
+            return uri
+        data, content_type = decoded
+        return await self.url_for(data, content_type)
+
+    def _store(self) -> Optional[str]:
+        """The store to upload to, or None to send images inline."""
+        store = settings.ASSET_STORE
+        reason = f"ASSET_STORE={store}"
+        if store == "storage" and not storage_client.is_public():
+            # e.g. a local store behind localhost: fal.ai can't fetch from it
+            store = "fal"
+            reason = "storage is not publicly reachable"
+        if store == "fal" and not settings.FAL_KEY:
+            store = None
+            reason = "FAL_KEY is not set"
+        if store not in ("storage", "fal"):
+            store = None
+
+        if store != self._logged_store:
+            print(f"[Assets] Using {store or 'inline data URIs'} for parody images ({reason})")
+            self._logged_store = store
+        return store
+
+    def _store_identity(self, store: str) -> str:
+        """What a URL from the store depends on besides the content."""
+        if store == "fal":
+            return "fal"
+        return f"{type(storage_client.backend).__name__}:{settings.BLOB_BASE_URL}:{settings.PUBLIC_BASE_URL}"
+
+    async def _upload(self, store: str, data: bytes, content_type: str, digest: str) -> str:
+        filename = f"asset_{digest[:16]}{EXTENSIONS.get(content_type, '')}"
+        if store == "fal":
+            return await fal_client.upload_async(data, content_type, filename)
+        return await storage_client.upload_file(data, filename, content_type)
+
+
+def to_data_uri(data: bytes, content_type: str) -> str:
+    """Inline an image as a base64 data URI."""
+    return f"data:{content_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+def from_data_uri(uri: str) -> Optional[tuple[bytes, str]]:
+    """(bytes, content type) of a base64 data URI, or None for anything else."""
+    if not uri.startswith("data:"):
+        return None
+    header, _, payload = uri.partition(",")
+    if not header.endswith(";base64"):
+        return None
+    content_type = header[len("data:"):-len(";base64")] or "application/octet-stream"
+    try:
+        return base64.b64decode(payload, validate=True), content_type
+    except ValueError:
+        return None
+
+
+# Singleton instance
+asset_registry = AssetRegistry()
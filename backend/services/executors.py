@@ -0,0 +1,34 @@
+"""
+ragebAIt - Blocking Call Executor
+Bounded thread pool for running blocking SDK and file calls off the event loop.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from backend.config import settings
+
+
+# Shared pool for blocking network/file calls (SDK uploads, polling, hashing).
+# Bounded so a burst of requests cannot spawn unlimited threads.
+io_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_IO_WORKERS,
+    thread_name_prefix="ragebait-io"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in the shared I/O pool and await its result.
+
+    Args:
+        func: Blocking function to call
+        *args, **kwargs: Arguments passed through to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
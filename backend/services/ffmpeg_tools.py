@@ -0,0 +1,195 @@
+"""
+ragebAIt - FFmpeg Helpers
+Thin wrappers around the ffmpeg binary for probing streams and keyframes
+and decoding into memory.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+
+@dataclass
+class MediaInfo:
+    """Container/stream facts parsed from `ffmpeg -i`."""
+    duration: float = 0.0
+    video_codec: Optional[str] = None
+    video_profile: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    audio_codec: Optional[str] = None
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[str] = None
+    keyframes: list[float] = field(default_factory=list)
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_RE = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+)(?: \(([^)]*)\))?(.*)")
+_AUDIO_RE = re.compile(r"Stream #\d+:\d+.*?: Audio: (\w+)(.*)")
+_PIX_FMT_RE = re.compile(r", (yuv\w+|nv12|gray\w*)")
+_SIZE_RE = re.compile(r", (\d{2,5})x(\d{2,5})")
+_FPS_RE = re.compile(r", (\d+(?:\.\d+)?) fps")
+_SAMPLE_RATE_RE = re.compile(r", (\d+) Hz, ([\w.()]+)")
+_PTS_TIME_RE = re.compile(r"pts_time:(-?\d+(?:\.\d+)?)")
+
+# Wall-clock deadline for ffmpeg calls made by the current thread (set by
+# render tasks; per thread because thread-mode tasks share one process)
+_local = threading.local()
+
+
+class FFmpegTimeout(RuntimeError):
+    """ffmpeg was killed because the task deadline passed."""
+
+
+def set_deadline(deadline: Optional[float]):
+    """
+    Kill ffmpeg calls this thread makes that would run past deadline (epoch
+    seconds); None disables.
+    """
+    _local.deadline = deadline
+
+
+def get_ffmpeg_binary() -> str:
+    """
+    Locate the ffmpeg binary.
+
+    Prefers FFMPEG_BINARY from the environment, then the binary MoviePy is
+    configured with (imageio-ffmpeg ships one), then ffmpeg on PATH.
+    """
+    binary = os.getenv("FFMPEG_BINARY", "").strip()
+    if binary:
+        return binary
+    try:
+        from moviepy.config import get_setting
+        return get_setting("FFMPEG_BINARY")
+    except Exception:
+        return "ffmpeg"
+
+
+def run_ffmpeg(args: list[str], loglevel: str = "error") -> subprocess.CompletedProcess:
+    """
+    Run ffmpeg with the given arguments.
+
+    Args:
+        args: Arguments after the binary (inputs, filters, outputs)
+        loglevel: ffmpeg log level
+
+    Returns:
+        The completed process (stderr captured as text)
+
+    Raises:
+        RuntimeError: If ffmpeg exits with a non-zero status
+        FFmpegTimeout: If the deadline set with set_deadline passes
+    """
+    cmd = [get_ffmpeg_binary(), "-hide_banner", "-nostdin", "-loglevel", loglevel, "-y", *args]
+    return _run(cmd, text=True)
+
+
+def read_ffmpeg_output(args: list[str]) -> bytes:
+    """
+    Run ffmpeg with its output going to stdout ("-") and return the raw bytes.
+
+    Used to decode straight into memory (e.g. -f rawvideo / -f s16le).
+
+    Raises:
+        RuntimeError: If ffmpeg exits with a non-zero status
+        FFmpegTimeout: If the deadline set with set_deadline passes
+    """
+    cmd = [get_ffmpeg_binary(), "-hide_banner", "-nostdin", "-loglevel", "error", *args]
+    return _run(cmd, text=False).stdout
+
+
+def _run(cmd: list[str], text: bool) -> subprocess.CompletedProcess:
+    timeout = None
+    deadline = getattr(_local, "deadline", None)
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise FFmpegTimeout("Deadline passed before ffmpeg started")
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=text, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise FFmpegTimeout(f"ffmpeg killed after {timeout:.0f}s (task deadline)")
+    if result.returncode != 0:
+        stderr = result.stderr if text else result.stderr.decode("utf-8", "replace")
+        raise RuntimeError(f"ffmpeg failed ({result.returncode}): {stderr[-1000:]}")
+    return result
+
+
+def probe_duration(path: str) -> float:
+    """Container duration of a media file (e.g. an audio file) in seconds, 0 if unknown."""
+    # No output is given, so ffmpeg exits non-zero after printing the input info
+    cmd = [get_ffmpeg_binary(), "-hide_banner", "-nostdin", "-i", path]
+    match = _DURATION_RE.search(subprocess.run(cmd, capture_output=True, text=True).stderr)
+    if not match:
+        return 0.0
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_media(video_path: str) -> MediaInfo:
+    """
+    Probe container duration and stream parameters, plus keyframe timestamps.
+
+    Results are cached per (path, size, mtime), so repeated cuts from the same
+    source only scan it once.
+    """
+    stat = os.stat(video_path)
+    return _probe_media_cached(video_path, stat.st_size, stat.st_mtime)
+
+
+@lru_cache(maxsize=64)
+def _probe_media_cached(video_path: str, size: int, mtime: float) -> MediaInfo:
+    # Only keyframes are decoded (-skip_frame nokey), so this is cheap even
+    # for long inputs. showinfo logs each frame's pts_time at info level.
+    cmd = [
+        get_ffmpeg_binary(), "-hide_banner", "-nostdin",
+        "-skip_frame", "nokey", "-i", video_path,
+        "-map", "0:v:0", "-an", "-vf", "showinfo", "-f", "null", "-"
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    stderr = result.stderr
+
+    info = MediaInfo()
+
+    duration_match = _DURATION_RE.search(stderr)
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        info.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    video_match = _VIDEO_RE.search(stderr)
+    if video_match:
+        info.video_codec = video_match.group(1)
+        info.video_profile = video_match.group(2)
+        details = video_match.group(3)
+        pix_fmt = _PIX_FMT_RE.search(details)
+        size_match = _SIZE_RE.search(details)
+        fps_match = _FPS_RE.search(details)
+        info.pix_fmt = pix_fmt.group(1) if pix_fmt else None
+        if size_match:
+            info.width, info.height = int(size_match.group(1)), int(size_match.group(2))
+        info.fps = float(fps_match.group(1)) if fps_match else 0.0
+
+    audio_match = _AUDIO_RE.search(stderr)
+    if audio_match:
+        info.audio_codec = audio_match.group(1)
+        rate_match = _SAMPLE_RATE_RE.search(audio_match.group(2))
+        if rate_match:
+            info.audio_sample_rate = int(rate_match.group(1))
+            info.audio_channels = rate_match.group(2)
+
+    info.keyframes = sorted(
+        float(t) for t in _PTS_TIME_RE.findall(stderr) if float(t) >= 0
+    )
+    return info
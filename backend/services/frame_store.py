@@ -0,0 +1,120 @@
+"""
+ragebAIt - Frame Store
+Compact storage for sampled video frames.
+
+Frames are raw JPEG bytes packed back to back in one buffer, with a small
+offset index (FrameSet). On disk each video gets a single file holding that
+buffer, and frames are read back through a memory map, so only the bytes of
+the requested frame are touched. Frames are base64-encoded only at the API
+edge (data URIs), never while they are held in memory.
+"""
+
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+from backend.config import settings
+
+
+class Frame:
+    """Position of one JPEG frame inside a FrameSet buffer."""
+
+    __slots__ = ("timestamp", "frame_index", "offset", "length")
+
+    def __init__(self, timestamp: float, frame_index: int, offset: int, length: int):
+        self.timestamp = timestamp
+        self.frame_index = frame_index
+        self.offset = offset
+        self.length = length
+
+
+class FrameSet:
+    """JPEG frames packed into one contiguous buffer with an offset index."""
+
+    __slots__ = ("_buffer", "_frames")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._frames: list[Frame] = []
+
+    def append(self, timestamp: float, frame_index: int, jpeg: bytes):
+        """Add a JPEG-encoded frame."""
+        self._frames.append(Frame(timestamp, frame_index, len(self._buffer), len(jpeg)))
+        self._buffer += jpeg
+
+    def jpeg(self, i: int) -> bytes:
+        """JPEG bytes of the i-th frame."""
+        frame = self._frames[i]
+        return bytes(self._buffer[frame.offset:frame.offset + frame.length])
+
+    @property
+    def data(self) -> memoryview:
+        """The packed JPEG buffer (read-only view)."""
+        return memoryview(self._buffer).toreadonly()
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the JPEG data."""
+        return len(self._buffer)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, i: int) -> Frame:
+        return self._frames[i]
+
+    def __iter__(self) -> Iterator[Frame]:
+        return iter(self._frames)
+
+
+def save_frames(video_id: str, frames: FrameSet) -> list[dict]:
+    """
+    Write a video's frames to disk and return their index for the job record.
+
+    Args:
+        video_id: Video the frames belong to
+        frames: Sampled frames
+
+    Returns:
+        Dicts with 'timestamp', 'frame_index', 'path', 'offset' and 'length'
+    """
+    if not len(frames):
+        return []
+
+    settings.FRAMES_DIR.mkdir(parents=True, exist_ok=True)
+    path = _frames_path(video_id)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(frames.data)
+    os.replace(tmp_path, path)
+
+    return [
+        {
+            "timestamp": frame.timestamp,
+            "frame_index": frame.frame_index,
+            "path": str(path),
+            "offset": frame.offset,
+            "length": frame.length,
+        }
+        for frame in frames
+    ]
+
+
+def load_frame(frame: dict) -> bytes:
+    """Read a stored frame back as JPEG bytes."""
+    if "offset" not in frame:
+        # Records written before frames were packed: one file per frame
+        return Path(frame["path"]).read_bytes()
+    with open(frame["path"], "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return m[frame["offset"]:frame["offset"] + frame["length"]]
+
+
+def remove_frames(video_id: str):
+    """Delete the on-disk frames of a video."""
+    _frames_path(video_id).unlink(missing_ok=True)
+    shutil.rmtree(settings.FRAMES_DIR / video_id, ignore_errors=True)
+
+
+def _frames_path(video_id: str) -> Path:
+    return settings.FRAMES_DIR / f"{video_id}.frames"
@@ -3,6 +3,7 @@ ragebAIt - Gemini API Client
 Handles video analysis, funny moment detection, and comedy commentary generation.
 """
 
+import asyncio
 import json
 import time
 import re
@@ -10,8 +11,14 @@ from typing import Optional
 from dataclasses import dataclass
 
 import google.generativeai as genai
+from google import genai as google_genai
+from google.genai import types as genai_types
 from backend.config import settings
 from backend.models.schemas import CommentarySegment, LensType
+from backend.services.executors import run_blocking
+from backend.services.frame_store import FrameSet
+from backend.services.proxy import analysis_copy
+from backend.services.hashing import file_sha256
 
 from backend.prompts.lenses import get_lens_prompt, get_lens_config
 
@@ -24,6 +31,99 @@ class FunnyMoment:
     description: str
     humor_score: int  # 1-10
     reason: str
+    boundary_quality: float = 0.0  # 0-1, how cleanly start/end land on shot edges
+
+
+@dataclass
+class _CachedFile:
+    """An uploaded Gemini file handle and when it was uploaded."""
+    file: object
+    uploaded_at: float
+
+
+class GeminiFileCache:
+    """
+    Uploads each video to Gemini once and reuses the file handle.
+    
+    What gets uploaded is a low-resolution analysis proxy with the same
+    timeline (see services/proxy.py), so timestamps from the model apply to
+    the original unchanged.
+    
+    Entries are keyed by the SHA-256 of the file content, so scene detection
+    and commentary generation on the same source share a single
+    upload + PROCESSING cycle. Concurrent requests for the same content wait
+    on one upload instead of racing.
+    """
+    
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, _CachedFile] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+    
+    async def get_or_upload(self, video_path: str):
+        """
+        Return an ACTIVE Gemini file for the video, uploading it if needed.
+        
+        Args:
+            video_path: Path to video file
+            
+        Returns:
+            Gemini File handle
+        """
+        digest = await run_blocking(file_sha256, video_path)
+        lock = self._locks.setdefault(digest, asyncio.Lock())
+        
+        async with lock:
+            entry = self._entries.get(digest)
+            if entry is not None and time.time() - entry.uploaded_at < self.ttl_seconds:
+                print(f"[Gemini] Reusing uploaded file {entry.file.name} for {video_path}")
+                return entry.file
+            
+            async with analysis_copy(video_path, digest) as upload_path:
+                print(f"[Gemini] Uploading video: {upload_path}")
+                video_file = await run_blocking(genai.upload_file, upload_path)
+            
+            # Wait for processing without blocking the event loop
+            while video_file.state.name == "PROCESSING":
+                print("[Gemini] Processing video...")
+                await asyncio.sleep(2)
+                video_file = await run_blocking(genai.get_file, video_file.name)
+            
+            if video_file.state.name == "FAILED":
+                raise Exception(f"Video processing failed: {video_file.state.name}")
+            
+            print(f"[Gemini] Video ready: {video_file.uri}")
+            
+            self._entries[digest] = _CachedFile(file=video_file, uploaded_at=time.time())
+        
+        await self._evict()
+        return video_file
+    
+    async def _evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries."""
+        now = time.time()
+        expired = [
+            digest for digest, entry in self._entries.items()
+            if now - entry.uploaded_at >= self.ttl_seconds
+        ]
+        for digest in expired:
+            await self._delete(digest)
+        
+        while len(self._entries) > self.max_entries:
+            oldest = min(self._entries, key=lambda d: self._entries[d].uploaded_at)
+            await self._delete(oldest)
+    
+    async def _delete(self, digest: str):
+        """Remove an entry and delete the remote file."""
+        entry = self._entries.pop(digest, None)
+        self._locks.pop(digest, None)
+        if entry is None:
+            return
+        try:
+            await run_blocking(genai.delete_file, entry.file.name)
+        except Exception:
+            pass  # Ignore cleanup errors (file may already have expired)
 
 
 class GeminiClient:
@@ -33,6 +133,11 @@ class GeminiClient:
         if settings.GEMINI_API_KEY:
             genai.configure(api_key=settings.GEMINI_API_KEY)
         
+        self.file_cache = GeminiFileCache(
+            ttl_seconds=settings.GEMINI_FILE_CACHE_TTL_SECONDS,
+            max_entries=settings.GEMINI_FILE_CACHE_MAX_ENTRIES
+        )
+        
         self.model = genai.GenerativeModel(
             model_name=settings.GEMINI_MODEL,
             generation_config={
@@ -42,6 +147,12 @@ class GeminiClient:
                 "max_output_tokens": 8192,
             }
         )
+        
+        # google-genai client for calls on a time window of an uploaded video
+        # (the google.generativeai SDK can't send video start/end offsets)
+        self.window_client = None
+        if settings.GEMINI_API_KEY:
+            self.window_client = google_genai.Client(api_key=settings.GEMINI_API_KEY)
     
     async def analyze_video(
         self,
@@ -62,37 +173,19 @@ class GeminiClient:
         Returns:
             List of CommentarySegment objects
         """
-        # Upload video to Gemini
-        print(f"[Gemini] Uploading video: {video_path}")
-        video_file = genai.upload_file(video_path)
-        
-        # Wait for processing
-        while video_file.state.name == "PROCESSING":
-            print("[Gemini] Processing video...")
-            time.sleep(2)
-            video_file = genai.get_file(video_file.name)
-        
-        if video_file.state.name == "FAILED":
-            raise Exception(f"Video processing failed: {video_file.state.name}")
-        
-        print(f"[Gemini] Video ready: {video_file.uri}")
+        # Upload video to Gemini (reuses an earlier upload of the same content)
+        video_file = await self.file_cache.get_or_upload(video_path)
         
         # Build prompt
         prompt = self._build_commentary_prompt(lens, context, video_duration)
         
         # Generate commentary
         print(f"[Gemini] Generating {lens.value} commentary...")
-        response = self.model.generate_content(
+        response = await self.model.generate_content_async(
             [video_file, prompt],
             request_options={"timeout": 120}
         )
         
-        # Clean up uploaded file
-        try:
-            genai.delete_file(video_file.name)
-        except Exception:
-            pass  # Ignore cleanup errors
-        
         # Parse response
         response_text = self._get_response_text(response)
         segments = self._parse_commentary_response(response_text)
@@ -106,7 +199,8 @@ class GeminiClient:
         video_duration: float = 0,
         min_clip_duration: float = 8.0,
         max_clip_duration: float = 30.0,
-        num_moments: int = 3
+        num_moments: int = 3,
+        excerpts: Optional[list[tuple[float, float]]] = None
     ) -> list[FunnyMoment]:
         """
         Analyze a longer video to find complete funny/interesting scenes.
@@ -116,24 +210,23 @@ class GeminiClient:
             min_clip_duration: Minimum clip length in seconds
             max_clip_duration: Maximum clip length in seconds
             num_moments: Number of moments to find
+            excerpts: If the video is a reel of excerpts, their (start, end)
+                times; each scene is asked to stay inside one excerpt
             
         Returns:
             List of FunnyMoment objects, sorted by humor_score (highest first)
         """
-        # Upload video to Gemini
-        print(f"[Gemini] Uploading video for scene detection: {video_path}")
-        video_file = genai.upload_file(video_path)
-        
-        # Wait for processing
-        while video_file.state.name == "PROCESSING":
-            print("[Gemini] Processing video...")
-            time.sleep(2)
-            video_file = genai.get_file(video_file.name)
-        
-        if video_file.state.name == "FAILED":
-            raise Exception(f"Video processing failed: {video_file.state.name}")
-        
-        print(f"[Gemini] Video ready: {video_file.uri}")
+        # Upload video to Gemini (kept cached for the commentary pass)
+        print(f"[Gemini] Preparing video for scene detection: {video_path}")
+        video_file = await self.file_cache.get_or_upload(video_path)
+        
+        excerpt_note = ""
+        if excerpts and len(excerpts) > 1:
+            ranges = ", ".join(f"[{start:.1f}s-{end:.1f}s]" for start, end in excerpts)
+            excerpt_note = f"""
+THIS VIDEO IS A COMPILATION OF {len(excerpts)} SEPARATE EXCERPTS: {ranges}.
+Each scene must start and end inside ONE excerpt - never span a jump between excerpts.
+"""
         
         # Build prompt for finding complete scenes
         prompt = f"""
@@ -143,7 +236,7 @@ Watch this video carefully and identify the TOP {num_moments} COMPLETE SCENES th
 
 VIDEO DURATION: {video_duration:.1f} seconds.
 DO NOT suggest timestamps outside [0, {video_duration:.1f}].
-
+{excerpt_note}
 CRITICAL: IDENTIFY COMPLETE SCENES - NOT ARBITRARY CUTS!
 - A scene starts when the action/play BEGINS
 - A scene ends when the action/play COMPLETES (goal scored, play finished, reaction complete, etc.)
@@ -180,17 +273,11 @@ IMPORTANT: Make sure end_time captures the COMPLETE scene - don't cut off early!
 """
         
         print(f"[Gemini] Finding funny moments...")
-        response = self.model.generate_content(
+        response = await self.model.generate_content_async(
             [video_file, prompt],
             request_options={"timeout": 120}
         )
         
-        # Clean up uploaded file
-        try:
-            genai.delete_file(video_file.name)
-        except Exception:
-            pass
-        
         # Parse response
         response_text = self._get_response_text(response)
         moments_data = self._parse_json_response(response_text, [])
@@ -244,31 +331,26 @@ IMPORTANT: Make sure end_time captures the COMPLETE scene - don't cut off early!
         context: Optional[dict] = None
     ) -> list[CommentarySegment]:
         """
-        Generate ragebait-style commentary for a specific funny moment clip.
+        Generate ragebait-style commentary for a specific funny moment.
         
         This generates SHORT, PUNCHY, FAST commentary designed for viral short-form content.
+        The already-uploaded source video is sent with start/end offsets, so
+        the model only sees the moment's window and no clip has to be
+        re-encoded or re-uploaded.
         
         Args:
-            video_path: Path to the EXTRACTED clip (not the full video)
-            moment: The funny moment info for context
+            video_path: Path to the SOURCE video (shares the scene-detection upload)
+            moment: The funny moment to commentate (its window in the source)
             lens: Comedy lens to apply
             context: Optional additional context
             
         Returns:
-            List of CommentarySegment objects
+            List of CommentarySegment objects, timed relative to the moment start
         """
-        # Upload video clip to Gemini
-        print(f"[Gemini] Uploading clip for ragebait commentary: {video_path}")
-        video_file = genai.upload_file(video_path)
-        
-        # Wait for processing
-        while video_file.state.name == "PROCESSING":
-            print("[Gemini] Processing clip...")
-            time.sleep(2)
-            video_file = genai.get_file(video_file.name)
+        if self.window_client is None:
+            raise RuntimeError("Gemini client not initialized - GEMINI_API_KEY not set")
         
-        if video_file.state.name == "FAILED":
-            raise Exception(f"Clip processing failed: {video_file.state.name}")
+        video_file = await self.file_cache.get_or_upload(video_path)
         
         # Get clip duration
         clip_duration = moment.end_time - moment.start_time
@@ -276,24 +358,62 @@ IMPORTANT: Make sure end_time captures the COMPLETE scene - don't cut off early!
         # Build ragebait-optimized prompt
         prompt = self._build_ragebait_prompt(lens, moment, clip_duration, context)
         
-        print(f"[Gemini] Generating ragebait {lens.value} commentary...")
-        response = self.model.generate_content(
-            [video_file, prompt],
-            request_options={"timeout": 120}
+        print(f"[Gemini] Generating ragebait {lens.value} commentary "
+              f"for [{moment.start_time:.1f}s-{moment.end_time:.1f}s]...")
+        response = await self.window_client.aio.models.generate_content(
+            model=settings.GEMINI_MODEL,
+            contents=[
+                genai_types.Content(
+                    role="user",
+                    parts=[
+                        self._window_part(video_file, moment),
+                        genai_types.Part.from_text(text=prompt)
+                    ]
+                )
+            ],
+            config=genai_types.GenerateContentConfig(
+                temperature=0.9,
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=8192,
+                http_options=genai_types.HttpOptions(timeout=120_000)
+            )
         )
         
-        # Clean up
-        try:
-            genai.delete_file(video_file.name)
-        except Exception:
-            pass
-        
         response_text = self._get_response_text(response)
         segments = self._parse_commentary_response(response_text)
+        segments = self._clamp_segments_to_clip(segments, clip_duration)
         
         print(f"[Gemini] Generated {len(segments)} ragebait commentary segments")
         return segments
     
+    def _window_part(self, video_file, moment: FunnyMoment) -> genai_types.Part:
+        """The uploaded video, cut to the moment's window by Gemini."""
+        return genai_types.Part(
+            file_data=genai_types.FileData(file_uri=video_file.uri, mime_type=video_file.mime_type),
+            video_metadata=genai_types.VideoMetadata(
+                start_offset=f"{moment.start_time:.2f}s",
+                end_offset=f"{moment.end_time:.2f}s"
+            )
+        )
+    
+    def _clamp_segments_to_clip(
+        self,
+        segments: list[CommentarySegment],
+        clip_duration: float
+    ) -> list[CommentarySegment]:
+        """
+        Clamp segment times to [0, clip_duration].
+        
+        The model only sees the clip, and the prompt asks for times from its
+        start, so times are taken as clip-relative and never shifted.
+        """
+        for segment in segments:
+            segment.start_time = min(max(0.0, segment.start_time), clip_duration)
+            segment.end_time = min(max(segment.start_time, segment.end_time), clip_duration)
+        
+        return segments
+    
     def _build_ragebait_prompt(
         self,
         lens: LensType,
@@ -308,7 +428,9 @@ IMPORTANT: Make sure end_time captures the COMPLETE scene - don't cut off early!
         ragebait_instructions = f"""
 RAGEBAIT MODE ACTIVATED! 🔥
 
-This is a {clip_duration:.0f}-second clip extracted from a longer video.
+THIS VIDEO IS THE CLIP: {clip_duration:.1f} seconds cut from a longer video.
+All timestamps you return are seconds FROM THE START OF THIS CLIP,
+between 0.0 and {clip_duration:.1f}.
 
 WHAT HAPPENS IN THIS CLIP:
 {moment.description}
@@ -358,7 +480,7 @@ OUTPUT FORMAT - Return ONLY valid JSON array:
     
     async def analyze_frames(
         self,
-        frames: list[dict],
+        frames: FrameSet,
         lens: LensType,
         context: Optional[dict] = None,
         video_duration: float = 30.0
@@ -367,7 +489,7 @@ OUTPUT FORMAT - Return ONLY valid JSON array:
         Analyze video frames and generate commentary (fallback if video upload fails).
         
         Args:
-            frames: List of dicts with 'timestamp' and 'image_base64'
+            frames: Sampled JPEG frames
             lens: Comedy lens to apply
             context: Optional context
             video_duration: Total video duration
@@ -382,15 +504,14 @@ OUTPUT FORMAT - Return ONLY valid JSON array:
         content_parts = [prompt, "\n\nVideo frames in sequence:\n"]
         
         for i, frame in enumerate(frames):
-            content_parts.append(f"\n[Frame at {frame['timestamp']}s]:")
-            # Create image part from base64
+            content_parts.append(f"\n[Frame at {frame.timestamp}s]:")
             content_parts.append({
                 "mime_type": "image/jpeg",
-                "data": frame["image_base64"]
+                "data": frames.jpeg(i)
             })
         
         print(f"[Gemini] Analyzing {len(frames)} frames with {lens.value} lens...")
-        response = self.model.generate_content(
+        response = await self.model.generate_content_async(
             content_parts,
             request_options={"timeout": 120}
         )
@@ -400,14 +521,14 @@ OUTPUT FORMAT - Return ONLY valid JSON array:
     
     async def select_best_frame_for_meme(
         self,
-        frames: list[dict],
+        frames: FrameSet,
         commentary_text: str
     ) -> dict:
         """
         Select the best frame for meme creation.
         
         Args:
-            frames: List of dicts with 'timestamp' and 'image_base64'
+            frames: Sampled JPEG frames
             commentary_text: The generated commentary for context
             
         Returns:
@@ -437,13 +558,13 @@ Return ONLY valid JSON:
         content_parts = [prompt, "\n\nFrames:\n"]
         
         for i, frame in enumerate(frames):
-            content_parts.append(f"\n[Frame {i} at {frame['timestamp']}s]:")
+            content_parts.append(f"\n[Frame {i} at {frame.timestamp}s]:")
             content_parts.append({
                 "mime_type": "image/jpeg",
-                "data": frame["image_base64"]
+                "data": frames.jpeg(i)
             })
         
-        response = self.model.generate_content(content_parts)
+        response = await self.model.generate_content_async(content_parts)
         
         response_text = self._get_response_text(response)
         return self._parse_json_response(response_text, {
@@ -504,7 +625,7 @@ Return ONLY valid JSON array:
 ]
 """
         
-        response = self.model.generate_content([
+        response = await self.model.generate_content_async([
             {"mime_type": "image/jpeg", "data": frame_base64},
             prompt
         ])
@@ -0,0 +1,655 @@
+"""
+ragebAIt - Generation Pipeline
+Runs the scene-based ragebait workflow for one uploaded video and records
+per-stage progress, timings and partial results in the job store.
+
+The workflow is a stage graph: once commentary exists, frame sampling,
+thumbnailing and TTS run concurrently; the scene is then cut and mixed with
+the commentary in a single render pass, and the video and thumbnail uploads
+run in parallel. When several scenes are requested, scene detection runs
+once and each scene gets its own branch of the graph, all running
+concurrently against the same source and Gemini upload.
+"""
+
+import asyncio
+import base64
+import time
+from dataclasses import asdict, replace
+from typing import Optional
+
+from backend.config import settings
+from backend.models.schemas import CommentarySegment, GenerateResponse, JobStatus, LensType, SceneVariant
+from backend.prompts.lenses import PROMPT_VERSION
+from backend.services.video_processor import video_processor
+from backend.services.gemini_client import gemini_client, FunnyMoment
+from backend.services.tts_client import tts_client
+from backend.services.storage_client import storage_client
+from backend.services.meme_engine import meme_engine
+from backend.services.job_store import job_store
+from backend.services.frame_store import save_frames
+from backend.services.job_runner import job_runner
+from backend.services.executors import run_blocking
+from backend.services.render_pool import render_pool
+from backend.services.stage_graph import StageGraph
+from backend.services.activity import TimeMap
+from backend.services.shots import drop_overlapping, snap_and_rank
+from backend.services.hashing import file_sha256
+from backend.services import result_cache as cache_layers
+from backend.services.result_cache import result_cache, make_key
+from backend.services.scratch import scratch
+
+
+# Volume of the source audio under the commentary (low for ragebait); part
+# of the render cache key, so a change here re-renders instead of reusing
+ORIGINAL_AUDIO_VOLUME = 0.15
+
+
+class _StageTracker:
+    """Mirrors stage start/finish events and timings into the job record."""
+
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self.total = 1
+        self.running: list[str] = []
+        self.completed = 0
+        self.timings: dict[str, float] = {}
+        # Writes go through the blocking-call pool; one at a time, each
+        # with the latest state, so an older snapshot never lands last
+        self._lock = asyncio.Lock()
+
+    async def start(self, stage: str):
+        print(f"[Pipeline] {self.video_id}: {stage}")
+        self.running.append(stage)
+        async with self._lock:
+            await job_store.aupdate(self.video_id, {
+                "stage": self.running[-1],
+                "running_stages": list(self.running),
+            })
+
+    async def finish(self, stage: str, elapsed: float):
+        self.running.remove(stage)
+        self.completed += 1
+        self.timings[stage] = elapsed
+        async with self._lock:
+            await job_store.aupdate(self.video_id, {
+                "stage": self.running[-1] if self.running else stage,
+                "running_stages": list(self.running),
+                "progress": round(self.completed / self.total, 2),
+                "timings": dict(self.timings),
+            })
+
+
+def _moment_record(moment: FunnyMoment) -> dict:
+    """Job-store view of a scene."""
+    return {
+        "start_time": moment.start_time,
+        "end_time": moment.end_time,
+        "description": moment.description,
+        "humor_score": moment.humor_score,
+        "reason": moment.reason,
+        "boundary_quality": moment.boundary_quality
+    }
+
+
+class PipelineError(Exception):
+    """A generation failure that maps to an HTTP status code."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class GenerationPipeline:
+    """Runs one generation job end to end."""
+
+    async def create_job(self, video_id: str, lens: LensType, source_sha256: Optional[str] = None) -> dict:
+        """Record a queued job so it can be polled before it starts."""
+        record = {
+            "status": JobStatus.QUEUED.value,
+            "stage": None,
+            "progress": 0.0,
+            "lens": lens.value,
+            "source_sha256": source_sha256,
+            "created_at": time.time(),
+        }
+        await job_store.aset(video_id, record)
+        return record
+
+    def cancel_queued(self, video_id: str):
+        """
+        Mark a job cancelled before it started (client gone, shutdown) as
+        failed and remove its scratch directory, which run() would have done.
+        Synchronous because it runs while the caller is being cancelled.
+        """
+        print(f"[Generate] Job {video_id} cancelled before it started")
+        job_store.update(video_id, {
+            "status": JobStatus.FAILED.value,
+            "error": "Job cancelled before it started",
+            "finished_at": time.time(),
+        })
+        scratch.release(video_id)
+
+    async def run(
+        self,
+        video_id: str,
+        input_path: str,
+        video_info: dict,
+        lens: LensType,
+        context: Optional[dict] = None,
+        min_scene_duration: float = 8.0,
+        max_scene_duration: float = 30.0,
+        source_sha256: Optional[str] = None,
+        num_variants: int = 1
+    ) -> GenerateResponse:
+        """
+        Run the pipeline, marking the job failed if any stage raises.
+
+        The job's scratch directory (input included) is removed when the
+        run ends, whatever the outcome.
+
+        Args:
+            video_id: Job/video ID (the job store key)
+            input_path: Path to the uploaded source video
+            video_info: Metadata from video_processor.get_video_info
+            lens: Comedy lens to apply
+            context: Optional context from Browser Use
+            min_scene_duration: Minimum scene duration (seconds)
+            max_scene_duration: Maximum scene duration (seconds)
+            source_sha256: SHA-256 of the source video (computed if omitted);
+                keys the result cache
+            num_variants: How many of the top scenes to render (the best
+                one is the main result, all of them are in .variants)
+
+        Returns:
+            The final GenerateResponse
+        """
+        await job_store.aupdate(video_id, {
+            "status": JobStatus.RUNNING.value,
+            "started_at": time.time(),
+        })
+        try:
+            response = await self._run(
+                video_id, input_path, video_info, lens, context,
+                min_scene_duration, max_scene_duration, source_sha256, num_variants
+            )
+        except asyncio.CancelledError:
+            # Not awaited: the task is being cancelled
+            job_store.update(video_id, {
+                "status": JobStatus.FAILED.value,
+                "error": "Job cancelled",
+                "finished_at": time.time(),
+            })
+            raise
+        except Exception as e:
+            await job_store.aupdate(video_id, {
+                "status": JobStatus.FAILED.value,
+                "error": e.detail if isinstance(e, PipelineError) else str(e),
+                "finished_at": time.time(),
+            })
+            raise
+        finally:
+            # Without storage the output is only reachable via file://, so
+            # leave it for the periodic sweep
+            scratch.release(video_id, keep=not storage_client.is_available())
+
+        await job_store.aupdate(video_id, {
+            "status": JobStatus.COMPLETED.value,
+            "stage": None,
+            "running_stages": [],
+            "progress": 1.0,
+            "finished_at": time.time(),
+        })
+        return response
+
+    async def _run(
+        self,
+        video_id: str,
+        input_path: str,
+        video_info: dict,
+        lens: LensType,
+        context: Optional[dict],
+        min_scene_duration: float,
+        max_scene_duration: float,
+        source_sha256: Optional[str],
+        num_variants: int
+    ) -> GenerateResponse:
+        # Shared state filled in by the stages below, plus per-scene state
+        # and the per-scene job fields
+        state: dict = {}
+        variants: list[dict] = []
+        variant_records: list[dict] = []
+        with_tts = tts_client.is_available()
+        with_storage = storage_client.is_available()
+        if source_sha256 is None:
+            source_sha256 = await run_blocking(file_sha256, input_path)
+        cache_hits: list[str] = []
+        # Serializes writes of the list fields (cache_hits, variants) so the
+        # last write always carries the latest list
+        list_fields_lock = asyncio.Lock()
+
+        async def cache_hit(layer: str):
+            print(f"[Generate] ♻️ Reusing cached {layer}")
+            cache_hits.append(layer)
+            async with list_fields_lock:
+                await job_store.aupdate(video_id, {"cache_hits": list(cache_hits)})
+
+        prefilter = (
+            settings.PREFILTER_ENABLED
+            and video_info['duration'] > settings.PREFILTER_MIN_DURATION_SECONDS
+        )
+        # Prefilter parameters, part of every key whose result depends on them
+        prefilter_params = (
+            (settings.PREFILTER_REEL_SECONDS, settings.PREFILTER_MAX_WINDOWS, max_scene_duration)
+            if prefilter else None
+        )
+
+        async def analysis_video() -> tuple[str, Optional[TimeMap]]:
+            # What Gemini watches: the source, or for long inputs a reel of
+            # the most active windows (built once, on first use - concurrent
+            # scene branches wait on the same build)
+            if "analysis_video" not in state:
+                state["analysis_video"] = asyncio.ensure_future(build_analysis_video())
+            return await state["analysis_video"]
+
+        async def build_analysis_video() -> tuple[str, Optional[TimeMap]]:
+            if not prefilter:
+                return input_path, None
+
+            key = make_key(source_sha256, prefilter_params)
+            windows = await run_blocking(result_cache.get_json, cache_layers.CANDIDATES, key)
+            if windows is not None:
+                await cache_hit(cache_layers.CANDIDATES)
+            else:
+                window_seconds = int(max(
+                    max_scene_duration * 1.25,
+                    settings.PREFILTER_REEL_SECONDS / settings.PREFILTER_MAX_WINDOWS
+                ))
+                windows = await render_pool.run(
+                    video_processor.find_candidate_windows,
+                    input_path,
+                    window_seconds=window_seconds,
+                    max_windows=settings.PREFILTER_MAX_WINDOWS,
+                    max_total_seconds=settings.PREFILTER_REEL_SECONDS
+                )
+                await run_blocking(result_cache.put_json, cache_layers.CANDIDATES, key, windows)
+            windows = [(min(start, video_info['duration']), min(end, video_info['duration'])) for start, end in windows]
+            await job_store.aupdate(video_id, {"candidate_windows": windows})
+
+            reel_path = await render_pool.run(
+                video_processor.build_reel,
+                input_path,
+                windows,
+                str(scratch.path(video_id, "reel.mp4"))
+            )
+            time_map = TimeMap(windows)
+            print(f"[Generate] 🎞️ Pre-filtered {video_info['duration']:.0f}s video to a "
+                  f"{time_map.duration:.0f}s reel of {len(windows)} windows: {windows}")
+            return reel_path, time_map
+
+        async def scene_detection(results: dict):
+            # STEP 1: Find complete funny scenes in the video
+            num_moments = max(3, num_variants)
+            key = make_key(
+                source_sha256, min_scene_duration, max_scene_duration, num_moments,
+                settings.GEMINI_MODEL, PROMPT_VERSION, prefilter_params, "snapped"
+            )
+            cached = await run_blocking(result_cache.get_json, cache_layers.SCENES, key)
+            if cached is not None:
+                await cache_hit(cache_layers.SCENES)
+                funny_moments = [FunnyMoment(**m) for m in cached]
+            else:
+                video_path, time_map = await analysis_video()
+                print(f"[Generate] 🔍 Finding complete funny scenes in {video_info['duration']:.1f}s video...")
+                funny_moments = await gemini_client.find_funny_moments(
+                    video_path,
+                    video_duration=time_map.duration if time_map else video_info['duration'],
+                    min_clip_duration=min_scene_duration,
+                    max_clip_duration=max_scene_duration,
+                    num_moments=num_moments,
+                    excerpts=time_map.excerpts() if time_map else None
+                )
+                if time_map:
+                    # Reel times back to source times
+                    for m in funny_moments:
+                        m.start_time, m.end_time = time_map.range_to_source(m.start_time, m.end_time)
+                if funny_moments:
+                    # Snap to shot cuts/keyframes and re-rank on boundary quality too
+                    shot_index = await render_pool.run(video_processor.build_shot_index, input_path)
+                    funny_moments = snap_and_rank(
+                        funny_moments, shot_index, min_scene_duration, max_scene_duration
+                    )
+                    await run_blocking(result_cache.put_json, cache_layers.SCENES, key, [asdict(m) for m in funny_moments])
+
+            if not funny_moments:
+                raise PipelineError(500, "Could not find any interesting scenes in the video")
+            # Scenes that mostly overlap would come out as near-identical clips
+            funny_moments = drop_overlapping(funny_moments)
+
+            # Render the best scenes (humor score plus boundary quality)
+            for i, moment in enumerate(funny_moments[:num_variants]):
+                scene_duration = moment.end_time - moment.start_time
+                label = "Best scene" if i == 0 else f"Scene #{i + 1}"
+                print(f"[Generate] 🎯 {label}: [{moment.start_time:.1f}s-{moment.end_time:.1f}s] ({scene_duration:.1f}s) Score: {moment.humor_score}/10")
+                print(f"[Generate]    Description: {moment.description}")
+                print(f"[Generate]    Reason: {moment.reason}")
+                print(f"[Generate]    Boundary quality: {moment.boundary_quality:.2f}")
+                variants.append({"moment": moment, "clip_duration": scene_duration})
+                variant_records.append({"rank": i, "funny_moment": _moment_record(moment)})
+
+            await job_store.aupdate(video_id, {"funny_moment": variant_records[0]["funny_moment"]})
+            if num_variants > 1:
+                await job_store.aupdate(video_id, {"variants": [dict(r) for r in variant_records]})
+
+        def add_variant_stages(graph: StageGraph, i: int):
+            # Stages for the i-th scene. Scene 0 keeps the plain stage and
+            # file names and fills the top-level job fields.
+            v = variants[i]
+            suffix = f"_{i}" if i else ""
+
+            def name(stage: str) -> str:
+                return stage + suffix
+
+            async def record(fields: dict, top_level: bool = True):
+                # Best scene: top-level fields; every scene: its variant entry
+                if i == 0 and top_level:
+                    await job_store.aupdate(video_id, fields)
+                if num_variants > 1:
+                    variant_records[i].update(fields)
+                    async with list_fields_lock:
+                        await job_store.aupdate(video_id, {"variants": [dict(r) for r in variant_records]})
+
+            def cut_key() -> str:
+                # Everything that determines how the scene is cut from the source
+                moment = v["moment"]
+                return make_key(
+                    source_sha256, moment.start_time, moment.end_time, settings.SMART_CUT_ENABLED,
+                    settings.VIDEO_ENCODER_PRESET, settings.VIDEO_ENCODER_CRF
+                )
+
+            async def commentary(results: dict):
+                # STEP 2: Generate ragebait commentary for the scene
+                # (watches the scene window of the upload from STEP 1 - no re-upload)
+                moment = v["moment"]
+                key = make_key(
+                    source_sha256, moment.start_time, moment.end_time, lens.value, context,
+                    settings.GEMINI_MODEL, PROMPT_VERSION, "clipped"
+                )
+                cached = await run_blocking(result_cache.get_json, cache_layers.COMMENTARY, key)
+                if cached is not None:
+                    await cache_hit(cache_layers.COMMENTARY)
+                    segments = [CommentarySegment(**s) for s in cached]
+                else:
+                    print(f"[Generate] 🎙️ Generating ragebait commentary with {lens.value} lens...")
+                    video_path, time_map = await analysis_video()
+                    window = moment
+                    if time_map:
+                        # Watch the scene inside the reel (segments come back
+                        # relative to the clip start either way)
+                        reel_range = time_map.range_to_reel(moment.start_time, moment.end_time)
+                        if reel_range is None:
+                            video_path = input_path
+                        else:
+                            window = replace(moment, start_time=reel_range[0], end_time=reel_range[1])
+                    segments = await gemini_client.generate_ragebait_commentary(
+                        video_path,
+                        moment=window,
+                        lens=lens,
+                        context=context
+                    )
+                    await run_blocking(result_cache.put_json, cache_layers.COMMENTARY, key, [s.model_dump() for s in segments])
+                print(f"[Generate] Got {len(segments)} ragebait commentary segments")
+
+                # Partial result: commentary is pollable before any audio exists
+                v["segments"] = segments
+                v["commentary_text"] = " ".join([s.text for s in segments])
+                await record({
+                    "segments": [s.model_dump() for s in segments],
+                    "commentary_text": v["commentary_text"],
+                })
+                if i == 0:
+                    await job_store.aupdate(video_id, {
+                        "lens": lens.value,
+                        "video_info": {
+                            "duration": v["clip_duration"],
+                            "original_duration": video_info['duration'],
+                            **video_info
+                        }
+                    })
+
+            async def clip(results: dict) -> str:
+                # STEP 3: Extract the complete scene
+                # (only used without TTS; with TTS the render stage cuts and mixes in one pass)
+                moment = v["moment"]
+                clip_path = str(scratch.path(video_id, f"clip{suffix}.mp4"))
+                key = make_key(cut_key(), "clip")
+                if await run_blocking(result_cache.get_file, cache_layers.CLIPS, key, clip_path, ".mp4"):
+                    await cache_hit(cache_layers.CLIPS)
+                else:
+                    clip_path = await render_pool.run(
+                        video_processor.extract_clip,
+                        input_path,
+                        start_time=moment.start_time,
+                        end_time=moment.end_time,
+                        output_path=clip_path
+                    )
+                    await run_blocking(result_cache.put_file, cache_layers.CLIPS, key, clip_path, ".mp4")
+                print(f"[Generate] ✂️ Extracted {v['clip_duration']:.1f}s clip")
+                if i == 0:
+                    await job_store.aupdate(video_id, {"video_path": clip_path})
+                return clip_path
+
+            async def frames(results: dict):
+                # Extract frames for meme generation later
+                # (sampled from the original input over the scene window)
+                moment = v["moment"]
+                sampled = await render_pool.run(
+                    video_processor.extract_frames,
+                    input_path,
+                    fps=1.0,
+                    max_frames=int(v["clip_duration"]) + 1,
+                    start_time=moment.start_time,
+                    end_time=moment.end_time,
+                    max_width=settings.FRAME_MAX_WIDTH
+                )
+                saved = await run_blocking(save_frames, video_id, sampled)
+                await job_store.aupdate(video_id, {"frames": saved})
+
+                # Auto-generate the meme off the critical path: it runs alongside
+                # TTS/render/upload and lands in the job store when done
+                if sampled and meme_engine.is_available():
+                    await job_store.aupdate(video_id, {"meme_status": "pending"})
+                    job_runner.spawn(
+                        f"meme-{video_id}",
+                        self._generate_meme(
+                            video_id, sampled.jpeg(len(sampled) // 2), v["commentary_text"]
+                        )
+                    )
+
+            async def tts(results: dict) -> str:
+                # STEP 4: Generate TTS audio with fal.ai (ragebait style), one
+                # request per segment, then place each line at its segment start
+                segments = v["segments"]
+                audio_path = str(scratch.path(video_id, f"commentary{suffix}.mp3"))
+                # Keyed on what each line's audio depends on (text, voice, TTS model)
+                # plus where it is placed
+                key = make_key(
+                    tts_client.line_keys(segments, lens),
+                    [s.start_time for s in segments],
+                    v["clip_duration"],
+                    "placed"
+                )
+                v["tts_key"] = key
+                if await run_blocking(result_cache.get_file, cache_layers.TTS, key, audio_path, ".mp3"):
+                    await cache_hit(cache_layers.TTS)
+                    return audio_path
+                segment_paths = await tts_client.synthesize_segments(
+                    segments,
+                    lens,
+                    output_paths=[
+                        str(scratch.path(video_id, f"commentary{suffix}_{j}.mp3")) for j in range(len(segments))
+                    ]
+                )
+                # Segments with no text have no audio and are left off the track
+                spoken = [(path, s.start_time) for path, s in zip(segment_paths, segments) if path]
+                audio_path = await render_pool.run(
+                    video_processor.place_commentary,
+                    [path for path, _ in spoken],
+                    [start for _, start in spoken],
+                    v["clip_duration"],
+                    audio_path
+                )
+                await run_blocking(result_cache.put_file, cache_layers.TTS, key, audio_path, ".mp3")
+                return audio_path
+
+            async def render(results: dict) -> str:
+                # STEP 5: Cut the scene and mix in the commentary in a single pass
+                moment = v["moment"]
+                output_path = str(scratch.path(video_id, f"output{suffix}.mp4"))
+                key = make_key(cut_key(), v["tts_key"], ORIGINAL_AUDIO_VOLUME, "ducked")
+                if await run_blocking(result_cache.get_file, cache_layers.RENDERS, key, output_path, ".mp4"):
+                    await cache_hit(cache_layers.RENDERS)
+                    return output_path
+                output_path = await render_pool.run(
+                    video_processor.render,
+                    input_path,
+                    start_time=moment.start_time,
+                    end_time=moment.end_time,
+                    audio_path=results[name("tts")],
+                    output_path=output_path,
+                    keep_original_audio=True,
+                    original_audio_volume=ORIGINAL_AUDIO_VOLUME,
+                    duck=True
+                )
+                print(f"[Generate] ✂️ Rendered {v['clip_duration']:.1f}s clip with commentary")
+                await run_blocking(result_cache.put_file, cache_layers.RENDERS, key, output_path, ".mp4")
+                return output_path
+
+            async def thumbnail(results: dict) -> Optional[str]:
+                # Taken from the source at the middle of the scene, which is the
+                # same picture as the middle of the output but doesn't wait on it.
+                # Optional: the video is still delivered without one
+                moment = v["moment"]
+                try:
+                    return await render_pool.run(
+                        video_processor.create_thumbnail,
+                        input_path,
+                        timestamp=moment.start_time + v["clip_duration"] * 0.5,
+                        output_path=str(scratch.path(video_id, f"thumb{suffix}.jpg"))
+                    )
+                except Exception as e:
+                    print(f"[Generate] Warning: no thumbnail for {video_id}{suffix}: {e}")
+                    return None
+
+            async def upload_video(results: dict) -> str:
+                # TTS not available - upload the clip without audio
+                output_video_path = results[name("render")] if with_tts else results[name("clip")]
+                if not with_storage:
+                    output_video_url = f"file://{output_video_path}"
+                else:
+                    output_video_url = await storage_client.upload_from_path(output_video_path)
+                    print(f"[Generate] ☁️ Uploaded to storage: {output_video_url}")
+                await record({"output_url": output_video_url}, top_level=False)
+                return output_video_url
+
+            async def upload_thumbnail(results: dict) -> Optional[str]:
+                thumbnail_url = None
+                if with_storage and results[name("thumbnail")]:
+                    thumbnail_url = await storage_client.upload_from_path(results[name("thumbnail")])
+                await record({"thumbnail_url": thumbnail_url}, top_level=False)
+                return thumbnail_url
+
+            graph.add(name("commentary"), commentary)
+            if i == 0:
+                graph.add("frames", frames, deps=("commentary",))
+            graph.add(name("thumbnail"), thumbnail, deps=(name("commentary"),))
+            if with_tts:
+                graph.add(name("tts"), tts, deps=(name("commentary"),))
+                graph.add(name("render"), render, deps=(name("tts"),))
+                graph.add(name("upload_video"), upload_video, deps=(name("render"),))
+            else:
+                graph.add(name("clip"), clip, deps=(name("commentary"),))
+                graph.add(name("upload_video"), upload_video, deps=(name("clip"),))
+            graph.add(name("upload_thumbnail"), upload_thumbnail, deps=(name("thumbnail"),))
+
+        # Scene detection runs first; it decides how many scenes get stages
+        tracker = _StageTracker(video_id)
+        stages_per_scene = 6 if with_tts else 5
+        tracker.total = 2 + stages_per_scene * num_variants
+        detection = StageGraph(on_start=tracker.start, on_finish=tracker.finish)
+        detection.add("scene_detection", scene_detection)
+        await detection.run()
+
+        # Every scene renders concurrently, sharing the source, its Gemini
+        # upload and the render pool
+        graph = StageGraph(on_start=tracker.start, on_finish=tracker.finish)
+        for i in range(len(variants)):
+            add_variant_stages(graph, i)
+        tracker.total = 1 + len(graph.stage_names)
+
+        results = await graph.run()
+        timings = {**detection.timings, **graph.timings}
+        print(f"[Generate] ⏱️ Stage timings: {timings}")
+
+        responses = [
+            GenerateResponse(
+                video_id=video_id,
+                video_url=results[f"upload_video_{i}" if i else "upload_video"],
+                thumbnail_url=results[f"upload_thumbnail_{i}" if i else "upload_thumbnail"],
+                commentary_segments=v["segments"],
+                lens=lens,
+                duration=v["clip_duration"]
+            )
+            for i, v in enumerate(variants)
+        ]
+
+        await job_store.aupdate(video_id, {
+            "output_url": responses[0].video_url,
+            "thumbnail_url": responses[0].thumbnail_url,
+        })
+
+        print(f"[Generate] ✅ Ragebait clip ready! Video ID: {video_id}"
+              + (f" ({len(responses)} scenes)" if num_variants > 1 else ""))
+
+        response = responses[0]
+        if num_variants > 1:
+            response.variants = [
+                SceneVariant(
+                    rank=i,
+                    video_url=r.video_url,
+                    thumbnail_url=r.thumbnail_url,
+                    commentary_segments=r.commentary_segments,
+                    duration=r.duration,
+                    start_time=v["moment"].start_time,
+                    end_time=v["moment"].end_time,
+                    humor_score=v["moment"].humor_score
+                )
+                for i, (r, v) in enumerate(zip(responses, variants))
+            ]
+        return response
+
+    async def _generate_meme(self, video_id: str, frame_jpeg: bytes, commentary_text: str):
+        """Generate the auto-meme for a job and store its URL and caption."""
+        try:
+            print(f"[Generate] 🍌 Auto-generating meme...")
+            meme_result = await meme_engine.generate_meme(
+                frame_jpeg=frame_jpeg,
+                context=commentary_text
+            )
+            if storage_client.is_available():
+                meme_url = await storage_client.upload_image(meme_result["image_png"], "meme.png")
+            else:
+                meme_url = f"data:image/png;base64,{base64.b64encode(meme_result['image_png']).decode('utf-8')}"
+            await job_store.aupdate(video_id, {
+                "meme_url": meme_url,
+                "caption": meme_result["caption"],
+                "meme_status": "completed",
+            })
+            print(f"[Generate] ✅ Auto-meme ready for {video_id}")
+        except Exception as e:
+            print(f"[Generate] Warning: Auto-meme failed: {e}")
+            await job_store.aupdate(video_id, {"meme_status": "failed"})
+
+
+# Singleton instance
+generation_pipeline = GenerationPipeline()
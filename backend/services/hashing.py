@@ -0,0 +1,33 @@
+"""
+ragebAIt - Content Hashing
+Streaming SHA-256 helpers used to key caches on file content.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """
+    Compute the SHA-256 hex digest of a file without loading it into memory.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_sha256(data: bytes) -> str:
+    """Compute the SHA-256 hex digest of an in-memory buffer."""
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,301 @@
+"""
+ragebAIt - Upload Ingestion
+Streams uploaded videos to disk in fixed-size chunks.
+
+Nothing holds a whole upload in memory: the size cap is enforced while the
+bytes arrive, the SHA-256 is computed on the fly (so caches can key on
+content), and the container type (plus the duration, for fast-start MP4s)
+is read from the first chunk so a bad file is rejected before the rest of
+it is written.
+"""
+
+import hashlib
+import json
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from backend.config import settings
+
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Slack on top of the file size for multipart boundaries and the other form fields
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+# Containers each allowed extension may hold
+EXTENSION_CONTAINERS = {
+    ".mp4": {"isobmff"},
+    ".mov": {"isobmff"},
+    ".avi": {"avi"},
+    ".webm": {"matroska"},
+}
+
+# Top-level box types that can open an ISO-BMFF / QuickTime file
+ISOBMFF_BOXES = {b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip", b"pnot"}
+
+
+class UploadRejected(Exception):
+    """An upload that cannot be accepted; maps to an HTTP status code."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class IngestedUpload:
+    """An upload that has been written to disk."""
+    path: Path
+    size: int
+    sha256: str
+    container: str
+    header_duration: Optional[float] = None
+
+
+def max_upload_bytes() -> int:
+    """Largest accepted video file, in bytes."""
+    return settings.MAX_VIDEO_SIZE_MB * 1024 * 1024
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Identify the container format from the first bytes of a file.
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        "isobmff" (MP4/MOV), "avi", "matroska" (WebM/MKV), or None if unknown
+    """
+    if len(header) >= 8 and header[4:8] in ISOBMFF_BOXES:
+        return "isobmff"
+    if len(header) >= 12 and header[:4] == b"RIFF" and header[8:12] == b"AVI ":
+        return "avi"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "matroska"
+    return None
+
+
+def probe_header_duration(header: bytes) -> Optional[float]:
+    """
+    Read the duration of an MP4/MOV from its header, if the moov box is there.
+
+    Only "fast start" files (moov before mdat) carry it up front; for
+    anything else this returns None and the full probe runs after ingest.
+
+    Args:
+        header: The first bytes of the file
+
+    Returns:
+        Duration in seconds, or None if it is not in the header
+    """
+    moov = _find_box(header, 0, len(header), b"moov")
+    if moov is None:
+        return None
+    mvhd = _find_box(header, moov[0], moov[1], b"mvhd")
+    if mvhd is None:
+        return None
+
+    start, end = mvhd
+    if end - start < 4:
+        return None
+    version = header[start]
+    try:
+        if version == 1:
+            timescale, duration = struct.unpack_from(">IQ", header, start + 20)
+        else:
+            timescale, duration = struct.unpack_from(">II", header, start + 12)
+    except struct.error:
+        return None
+    if not timescale:
+        return None
+    return duration / timescale
+
+
+def _find_box(data: bytes, start: int, end: int, box_type: bytes) -> Optional[tuple[int, int]]:
+    """Find a box among the siblings in data[start:end]; return its payload span."""
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                return None
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return None
+        if kind == box_type:
+            if offset + size > end:
+                return None  # Box continues past what we have
+            return offset + header_size, offset + size
+        offset += size
+    return None
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest: Path,
+    max_bytes: Optional[int] = None,
+    max_duration: Optional[float] = None
+) -> IngestedUpload:
+    """
+    Stream an uploaded video to dest, validating it as it arrives.
+
+    Args:
+        upload: The uploaded file
+        dest: Destination path (its suffix selects the expected container)
+        max_bytes: Size cap (defaults to MAX_VIDEO_SIZE_MB)
+        max_duration: Optional duration cap, checked early when the header has it
+
+    Returns:
+        IngestedUpload with the size, SHA-256 and container of the file
+
+    Raises:
+        UploadRejected: 413 if the file is too large, 400 if its content
+            does not match its extension or it is too long. The partial
+            file is removed.
+    """
+    if max_bytes is None:
+        max_bytes = max_upload_bytes()
+
+    expected = EXTENSION_CONTAINERS.get(dest.suffix.lower(), set())
+    digest = hashlib.sha256()
+    size = 0
+    container = None
+    duration = None
+
+    try:
+        async with aiofiles.open(dest, "wb") as f:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                if container is None:
+                    # First chunk: check the container and, when the header
+                    # has it, the duration before accepting the rest
+                    container = sniff_container(chunk)
+                    if container not in expected:
+                        raise UploadRejected(
+                            400, f"File content does not match its extension ({dest.suffix})"
+                        )
+                    duration = probe_header_duration(chunk) if container == "isobmff" else None
+                    if max_duration is not None and duration is not None and duration > max_duration:
+                        raise UploadRejected(
+                            400, f"Video too long. Max duration: {max_duration}s"
+                        )
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(
+                        413, f"Video too large. Max size: {settings.MAX_VIDEO_SIZE_MB}MB"
+                    )
+
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    if size == 0:
+        dest.unlink(missing_ok=True)
+        raise UploadRejected(400, "Uploaded file is empty")
+
+    return IngestedUpload(
+        path=dest,
+        size=size,
+        sha256=digest.hexdigest(),
+        container=container,
+        header_duration=duration
+    )
+
+
+class _BodyTooLarge(HTTPException):
+    """
+    Raised from receive() once a streamed body passes the limit.
+
+    An HTTPException so FastAPI's form parsing re-raises it as a 413
+    instead of wrapping it in a generic 400.
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail=f"Video too large. Max size: {settings.MAX_VIDEO_SIZE_MB}MB"
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that caps request bodies on upload routes.
+
+    Requests whose Content-Length is over the limit get a 413 before any of
+    the body is read; bodies without a Content-Length (chunked) are counted
+    as they stream and cut off once they pass it.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...], max_body_bytes: int):
+        self.app = app
+        self.paths = paths
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() \
+                and int(content_length) > self.max_body_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(send)
+
+    async def _reject(self, send):
+        body = json.dumps({
+            "detail": f"Video too large. Max size: {settings.MAX_VIDEO_SIZE_MB}MB"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
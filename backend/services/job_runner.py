@@ -0,0 +1,128 @@
+"""
+ragebAIt - Job Runner
+Runs generation jobs on a bounded pool of background tasks.
+
+Concurrency is capped independently of how many HTTP connections are open:
+synchronous requests and background jobs share the same slots.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from backend.config import settings
+
+
+T = TypeVar("T")
+
+
+class JobRunner:
+    """Bounded executor for generation coroutines."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(
+        self,
+        job: Callable[[], Awaitable[T]],
+        on_cancel_queued: Optional[Callable[[], None]] = None
+    ) -> T:
+        """
+        Run a job inline once a slot is free.
+
+        Args:
+            job: Creates the coroutine to run; only called once the job has a
+                slot, so a job cancelled while queued never starts
+            on_cancel_queued: Called if the wait for a slot is cancelled, to
+                record the job's status and clean up after it
+
+        Returns:
+            The job's result
+        """
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            if on_cancel_queued is not None:
+                on_cancel_queued()
+            raise
+        try:
+            return await job()
+        finally:
+            self._semaphore.release()
+
+    def submit(
+        self,
+        job_id: str,
+        job: Callable[[], Awaitable],
+        on_cancel_queued: Optional[Callable[[], None]] = None
+    ) -> asyncio.Task:
+        """
+        Schedule a job in the background and return immediately.
+
+        Args:
+            job_id: ID used to name the task (for logs)
+            job: Creates the coroutine to run once a slot is free; it is
+                responsible for recording its own status
+            on_cancel_queued: Called if the job is cancelled before it starts
+
+        Returns:
+            The background task
+        """
+        task = asyncio.create_task(
+            self._run_background(job_id, job, on_cancel_queued), name=f"job-{job_id}"
+        )
+        # Keep a reference so the task is not garbage-collected mid-run
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def spawn(self, name: str, work: Awaitable) -> asyncio.Task:
+        """
+        Schedule a detached side task (e.g. meme generation for a job).
+
+        Side tasks do not take a generation slot, so a job never waits on
+        its own side work to get a slot back.
+        """
+        task = asyncio.create_task(self._run_side_task(name, work), name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_side_task(self, name: str, work: Awaitable):
+        try:
+            await work
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Jobs] {name} failed: {e}")
+
+    async def _run_background(
+        self,
+        job_id: str,
+        job: Callable[[], Awaitable],
+        on_cancel_queued: Optional[Callable[[], None]]
+    ):
+        try:
+            await self.run(job, on_cancel_queued)
+        except asyncio.CancelledError:
+            print(f"[Jobs] {job_id} cancelled")
+            raise
+        except Exception as e:
+            # Status is already recorded by the job; just don't lose the log
+            print(f"[Jobs] {job_id} failed: {e}")
+
+    @property
+    def active_jobs(self) -> int:
+        """Number of background jobs and side tasks queued or running."""
+        return len(self._tasks)
+
+    async def shutdown(self):
+        """Cancel outstanding background jobs and wait for them to finish."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# Singleton instance
+job_runner = JobRunner(max_concurrency=settings.GENERATE_MAX_CONCURRENCY)
@@ -0,0 +1,247 @@
+"""
+ragebAIt - Job Store
+Bounded, pluggable storage for per-video job records.
+
+Records are JSON documents keyed by video ID. Two backends are provided:
+- MemoryJobStore: in-process LRU with TTL and entry-count eviction
+- SQLiteJobStore: file-backed, shared by every worker on the host and
+  survives restarts
+
+Large blobs (frames) never go into a record; they are written to disk by
+the frame store and the record only keeps their index.
+
+Async code uses the coroutine methods (aget, aset, aupdate, adelete), which
+run the backend call in the blocking-call pool: a SQLite write can wait
+seconds on another worker's lock and must not stall the event loop.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from backend.config import settings
+from backend.services.executors import run_blocking
+from backend.services.frame_store import remove_frames
+
+
+class JobStore(ABC):
+    """Interface for job record storage."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Return the record for key, or None if missing/expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: dict):
+        """Create or replace the record for key."""
+
+    @abstractmethod
+    def update(self, key: str, fields: dict) -> dict:
+        """Merge fields into the record for key (creating it if needed) and return it."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the record for key and its on-disk blobs."""
+
+    async def aget(self, key: str) -> Optional[dict]:
+        """get() off the event loop."""
+        return await run_blocking(self.get, key)
+
+    async def aset(self, key: str, value: dict):
+        """set() off the event loop."""
+        await run_blocking(self.set, key, value)
+
+    async def aupdate(self, key: str, fields: dict) -> dict:
+        """update() off the event loop."""
+        return await run_blocking(self.update, key, fields)
+
+    async def adelete(self, key: str):
+        """delete() off the event loop."""
+        await run_blocking(self.delete, key)
+
+    def _on_evict(self, key: str):
+        """Remove blobs belonging to an evicted record."""
+        remove_frames(key)
+
+
+class MemoryJobStore(JobStore):
+    """In-process LRU store. Fast, but private to one worker and lost on restart."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._on_evict(key)
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(payload)
+
+    def set(self, key: str, value: dict):
+        # Serialize so both backends accept exactly the same values
+        payload = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def update(self, key: str, fields: dict) -> dict:
+        with self._lock:
+            entry = self._entries.get(key)
+            record = json.loads(entry[1]) if entry else {}
+            record.update(fields)
+            self._entries[key] = (time.time() + self.ttl_seconds, json.dumps(record))
+            self._entries.move_to_end(key)
+            self._evict()
+        return record
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        self._on_evict(key)
+
+    def _evict(self):
+        """Drop expired entries, then least-recently-used ones beyond max_entries."""
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+            self._on_evict(key)
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._on_evict(key)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed store shared by all workers on a host (WAL mode).
+
+    Reads never write: recency for eviction is the last set/update, so
+    polling a job doesn't take the write lock.
+    """
+
+    def __init__(self, path: Path, max_entries: int, ttl_seconds: int):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_accessed_at ON jobs (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across threads
+        # and processes; isolation_level=None lets us manage transactions.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM jobs WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (key, value, accessed_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now + self.ttl_seconds)
+            )
+            self._evict(conn)
+
+    def update(self, key: str, fields: dict) -> dict:
+        now = time.time()
+        with self._connect() as conn:
+            # IMMEDIATE takes the write lock up front so concurrent updates
+            # from other workers cannot interleave the read-modify-write.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT value FROM jobs WHERE key = ?", (key,)).fetchone()
+                record = json.loads(row[0]) if row else {}
+                record.update(fields)
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (key, value, accessed_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(record), now, now + self.ttl_seconds)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._evict(conn)
+        return record
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE key = ?", (key,))
+        self._on_evict(key)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired rows, then least-recently-used ones beyond max_entries."""
+        expired = conn.execute(
+            "SELECT key FROM jobs WHERE expires_at <= ?", (time.time(),)
+        ).fetchall()
+        overflow = conn.execute(
+            "SELECT key FROM jobs ORDER BY accessed_at DESC LIMIT -1 OFFSET ?",
+            (self.max_entries,)
+        ).fetchall()
+        keys = {row[0] for row in expired + overflow}
+        if not keys:
+            return
+        conn.executemany("DELETE FROM jobs WHERE key = ?", [(k,) for k in keys])
+        for key in keys:
+            self._on_evict(key)
+
+
+def create_job_store() -> JobStore:
+    """Create the job store selected by JOB_STORE_BACKEND."""
+    if settings.JOB_STORE_BACKEND == "memory":
+        return MemoryJobStore(
+            max_entries=settings.JOB_STORE_MAX_ENTRIES,
+            ttl_seconds=settings.JOB_STORE_TTL_SECONDS
+        )
+    if settings.JOB_STORE_BACKEND == "sqlite":
+        return SQLiteJobStore(
+            path=settings.JOB_STORE_PATH,
+            max_entries=settings.JOB_STORE_MAX_ENTRIES,
+            ttl_seconds=settings.JOB_STORE_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown JOB_STORE_BACKEND: {settings.JOB_STORE_BACKEND}")
+
+
+# Singleton instance
+job_store = create_job_store()
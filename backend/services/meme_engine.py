@@ -9,6 +9,7 @@ import io
 import base64
 import json
 import re
+from pathlib import Path
 from typing import Optional
 from PIL import Image
 
@@ -16,6 +17,7 @@ from google import genai
 from google.genai import types
 
 from backend.config import settings
+from backend.services.executors import run_blocking
 
 
 class NanoBananaMemeEngine:
@@ -46,7 +48,7 @@ class NanoBananaMemeEngine:
     
     async def generate_meme(
         self,
-        frame_base64: str,
+        frame_jpeg: bytes,
         context: str = "",
         output_path: Optional[str] = None
     ) -> dict:
@@ -54,13 +56,13 @@ class NanoBananaMemeEngine:
         Generate a gen-z sports meme from a video frame.
         
         Args:
-            frame_base64: Base64 encoded image frame
+            frame_jpeg: JPEG-encoded video frame
             context: Optional context about the video/moment
             output_path: Optional path to save the generated meme
             
         Returns:
             Dictionary with:
-            - image_base64: Base64 encoded generated meme
+            - image_png: PNG bytes of the generated meme
             - caption: Social media caption with hashtags
             - image_prompt: The prompt used to generate the image
             - style: The meme style used
@@ -68,8 +70,7 @@ class NanoBananaMemeEngine:
         if not self.client:
             raise RuntimeError("Nano Banana client not initialized - GEMINI_API_KEY not set")
         
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(frame_base64)
+        image_bytes = frame_jpeg
         mime_type = "image/jpeg"
         
         # Step 1: Analyze the image and get meme content from Gemini
@@ -101,7 +102,7 @@ Make it funny, relatable to sports fans, and capture that chaotic gen-z meme ene
 Use sports references, player/team jokes, and current meme formats.
 Only respond with the JSON, nothing else."""
 
-        analysis_response = self.client.models.generate_content(
+        analysis_response = await self.client.aio.models.generate_content(
             model="gemini-3-flash-preview",
             contents=[
                 types.Content(
@@ -149,7 +150,7 @@ Only respond with the JSON, nothing else."""
         
         print(f"[Meme] Generating meme with Nano Banana (style: {style})...")
         
-        image_response = self.client.models.generate_content(
+        image_response = await self.client.aio.models.generate_content(
             model="gemini-3-pro-image-preview",  # Nano Banana Pro - Gemini 3 Pro Image
             contents=[
                 types.Content(
@@ -222,24 +223,28 @@ Only respond with the JSON, nothing else."""
         if generated_image is None:
             raise ValueError("No image was generated by Nano Banana")
         
-        # Convert to base64
-        output_buffer = io.BytesIO()
-        generated_image.save(output_buffer, format='PNG')
-        generated_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-        
-        # Save if output path provided
+        # PNG encode is CPU-bound, keep it off the event loop
+        generated_png = await run_blocking(self._encode_png, generated_image, output_path)
         if output_path:
-            generated_image.save(output_path)
             print(f"[Meme] Saved to {output_path}")
         
         print(f"[Meme] ✅ Meme generated successfully!")
         
         return {
-            "image_base64": generated_base64,
+            "image_png": generated_png,
             "caption": meme_content['caption'],
             "image_prompt": meme_content['image_prompt'],
             "style": style
         }
+    
+    def _encode_png(self, image: Image.Image, output_path: Optional[str] = None) -> bytes:
+        """Encode an image as PNG, optionally saving it to disk."""
+        output_buffer = io.BytesIO()
+        image.save(output_buffer, format='PNG')
+        png = output_buffer.getvalue()
+        if output_path:
+            Path(output_path).write_bytes(png)
+        return png
 
 
 # Singleton instance
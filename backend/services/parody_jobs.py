@@ -0,0 +1,183 @@
+"""
+ragebAIt - Parody Jobs
+Tracks image-to-video parody generations queued on fal.ai.
+
+Submitting only queues the generation and records a job (in the job store,
+under "parody:<id>"), so no HTTP worker waits on it. Progress comes in two
+ways, whichever is first:
+- polling: reading a job refreshes its fal.ai status, at most every
+  PARODY_POLL_INTERVAL_SECONDS however often clients poll
+- webhook: with PARODY_WEBHOOK_BASE_URL set, fal.ai POSTs the result to
+  /api/parody/{id}/webhook (authenticated by a per-job token)
+
+Finished videos are copied into our own storage when
+PARODY_MIRROR_TO_STORAGE is on (fal.ai result URLs expire); the job stays
+running until the copy is done, and falls back to the fal.ai URL if it fails.
+"""
+
+import secrets
+import time
+import uuid
+from typing import Optional
+
+from backend.config import settings
+from backend.models.schemas import JobStatus
+from backend.services.job_runner import job_runner
+from backend.services.job_store import job_store
+from backend.services.parody_service import parody_service, video_url_from, COMPLETED, IN_PROGRESS
+from backend.services.scratch import scratch
+from backend.services.storage_client import storage_client
+
+
+# A mirror copy that has not finished after this long is started again
+MIRROR_STALE_SECONDS = 600
+
+
+def _key(parody_id: str) -> str:
+    return f"parody:{parody_id}"
+
+
+class ParodyJobs:
+    """Queued parody generations and their results."""
+
+    async def submit(self, video_id: str, image_url: str, prompt: str, motion_directive: str) -> dict:
+        """
+        Queue a generation and record its job.
+
+        Returns:
+            The job record (with 'parody_id')
+        """
+        parody_id = uuid.uuid4().hex[:12]
+        token = secrets.token_urlsafe(16)
+        webhook_url = None
+        if settings.PARODY_WEBHOOK_BASE_URL:
+            webhook_url = f"{settings.PARODY_WEBHOOK_BASE_URL}/api/parody/{parody_id}/webhook?token={token}"
+
+        queued = await parody_service.submit(
+            image_url=image_url,
+            prompt=prompt,
+            motion_directive=motion_directive,
+            webhook_url=webhook_url
+        )
+        record = {
+            "parody_id": parody_id,
+            "video_id": video_id,
+            "status": JobStatus.QUEUED.value,
+            "motion_directive": motion_directive,
+            "model": settings.PARODY_MODEL,
+            "request_id": queued["request_id"],
+            "status_url": queued["status_url"],
+            "response_url": queued["response_url"],
+            "webhook_token": token,
+            "created_at": time.time(),
+            "checked_at": time.time(),
+        }
+        await job_store.aset(_key(parody_id), record)
+        return record
+
+    async def get(self, parody_id: str) -> Optional[dict]:
+        """The job record as stored, without contacting fal.ai."""
+        return await job_store.aget(_key(parody_id))
+
+    async def refresh(self, parody_id: str) -> Optional[dict]:
+        """
+        The job record, after checking fal.ai if the job is still queued or
+        generating and was last checked over PARODY_POLL_INTERVAL_SECONDS ago.
+        """
+        record = await self.get(parody_id)
+        if record is None or record["status"] not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value):
+            return record
+        if record.get("fal_video_url") or time.time() - record["checked_at"] < settings.PARODY_POLL_INTERVAL_SECONDS:
+            # Generated and being copied, or checked moments ago
+            return await self._ensure_mirror(parody_id, record)
+
+        record = await job_store.aupdate(_key(parody_id), {"checked_at": time.time()})
+        try:
+            status = await parody_service.get_status(record["status_url"])
+        except Exception as e:
+            # Transient: keep the job as is and try again on the next poll
+            print(f"[Parody] Status check for {parody_id} failed: {e}")
+            return record
+
+        if status == COMPLETED:
+            try:
+                video_url = await parody_service.get_result(record["response_url"])
+            except RuntimeError as e:
+                return await self._fail(parody_id, str(e))
+            return await self._complete(parody_id, video_url)
+        if status == IN_PROGRESS and record["status"] == JobStatus.QUEUED.value:
+            return await job_store.aupdate(_key(parody_id), {"status": JobStatus.RUNNING.value})
+        return record
+
+    async def handle_webhook(self, parody_id: str, token: str, payload: dict) -> Optional[dict]:
+        """
+        Apply a fal.ai completion webhook.
+
+        Returns:
+            The updated record, or None if the job or token is unknown
+        """
+        record = await self.get(parody_id)
+        if record is None or not secrets.compare_digest(token, record.get("webhook_token", "")):
+            return None
+        if record["status"] not in (JobStatus.QUEUED.value, JobStatus.RUNNING.value) or record.get("fal_video_url"):
+            return record
+
+        if payload.get("status") != "OK":
+            return await self._fail(parody_id, str(payload.get("error") or payload.get("payload") or "Generation failed"))
+        try:
+            video_url = video_url_from(payload.get("payload") or {})
+        except RuntimeError:
+            # Result too large for the webhook body: the next poll fetches it
+            return await job_store.aupdate(_key(parody_id), {"checked_at": 0.0})
+        return await self._complete(parody_id, video_url)
+
+    async def _complete(self, parody_id: str, video_url: str) -> dict:
+        print(f"[Parody] {parody_id} generated: {video_url}")
+        if not (settings.PARODY_MIRROR_TO_STORAGE and storage_client.is_available()):
+            return await self._finish(parody_id, {"video_url": video_url, "fal_video_url": video_url})
+        record = await job_store.aupdate(_key(parody_id), {
+            "status": JobStatus.RUNNING.value,
+            "fal_video_url": video_url,
+        })
+        return await self._ensure_mirror(parody_id, record)
+
+    async def _ensure_mirror(self, parody_id: str, record: dict) -> dict:
+        """Start copying a generated video into storage unless a copy is under way."""
+        if not record.get("fal_video_url") or time.time() - record.get("mirror_started_at", 0) < MIRROR_STALE_SECONDS:
+            return record
+        record = await job_store.aupdate(_key(parody_id), {"mirror_started_at": time.time()})
+        job_runner.spawn(f"parody-mirror-{parody_id}", self._mirror(parody_id, record["fal_video_url"]))
+        return record
+
+    async def _mirror(self, parody_id: str, video_url: str):
+        scratch_id = scratch.new_job_id("parody")
+        try:
+            path = str(scratch.path(scratch_id, "parody.mp4"))
+            await parody_service.download(video_url, path)
+            stored_url = await storage_client.upload_from_path(path)
+            print(f"[Parody] {parody_id} copied to storage: {stored_url}")
+            await self._finish(parody_id, {"video_url": stored_url})
+        except Exception as e:
+            print(f"[Parody] Could not copy {parody_id} to storage, keeping the fal.ai URL: {e}")
+            await self._finish(parody_id, {"video_url": video_url, "mirror_error": str(e)})
+        finally:
+            scratch.release(scratch_id)
+
+    async def _finish(self, parody_id: str, fields: dict) -> dict:
+        return await job_store.aupdate(_key(parody_id), {
+            **fields,
+            "status": JobStatus.COMPLETED.value,
+            "finished_at": time.time(),
+        })
+
+    async def _fail(self, parody_id: str, error: str) -> dict:
+        print(f"[Parody] {parody_id} failed: {error}")
+        return await job_store.aupdate(_key(parody_id), {
+            "status": JobStatus.FAILED.value,
+            "error": error,
+            "finished_at": time.time(),
+        })
+
+
+# Singleton instance
+parody_jobs = ParodyJobs()
@@ -1,26 +1,45 @@
 """
 ragebAIt - Parody Generation Service
 Handles image-to-video generation using fal.ai.
+
+Image-to-video runs take minutes, so requests go through fal's queue API
+rather than a call that holds a connection open: submit returns a request
+ID plus status/result URLs, and the caller polls (or gets a webhook) until
+it finishes. services/parody_jobs.py tracks these as jobs.
+
+The queue is spoken to directly over one pooled httpx client (opened on
+startup, closed on shutdown). FAL_QUEUE_BASE_URL can point at the local
+stand-in queue (backend/fal_queue_standin.py) for tests.
 """
 
+import asyncio
 import os
-import requests
+from pathlib import Path
 from typing import Optional
+
+import aiofiles
+import httpx
+
 from backend.config import settings
 
-# fal_client reads FAL_KEY from environment
-if os.getenv("FAL_KEY"):
-    os.environ["FAL_KEY"] = os.getenv("FAL_KEY", "").strip()
 
-import fal_client
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# fal queue statuses
+IN_QUEUE = "IN_QUEUE"
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
 
 class ParodyService:
     """Service for generating parody videos using fal.ai Image-to-Video models."""
-    
+
     def __init__(self):
         self.fal_key = os.getenv("FAL_KEY", "").strip()
         self._available = bool(self.fal_key)
-        
+        self.base_url = settings.FAL_QUEUE_BASE_URL.rstrip("/")
+        self._client: Optional[httpx.AsyncClient] = None
+
         if self._available:
             print("[Parody] fal.ai parody service initialized")
         else:
@@ -30,24 +49,50 @@ class ParodyService:
         """Check if parody service is available."""
         return self._available
 
-    async def generate_image_to_video(
+    async def start(self):
+        """Open the pooled HTTP client."""
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client (opened lazily for scripts that skip startup)."""
+        if self._client is None:
+            self._client = self._new_client()
+        return self._client
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.PARODY_HTTP_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0)
+        )
+
+    async def submit(
         self,
         image_url: str,
         prompt: str,
         motion_directive: Optional[str] = None,
-        model: str = "fal-ai/minimax-video/image-to-video"
-    ) -> str:
+        model: str = settings.PARODY_MODEL,
+        webhook_url: Optional[str] = None
+    ) -> dict:
         """
-        Generate a video from an image using fal.ai.
-        
+        Queue an image-to-video generation on fal.ai.
+
         Args:
             image_url: URL to the source image (or data URI)
             prompt: Base prompt for generation
             motion_directive: Optional motion instruction (e.g. "slow zoom-in")
             model: fal.ai model ID
-            
+            webhook_url: Optional URL fal.ai POSTs the result to when done
+
         Returns:
-            URL to the generated video
+            Dict with 'request_id', 'status_url' and 'response_url'
         """
         if not self._available:
             raise RuntimeError("Parody service not available - FAL_KEY not set")
@@ -56,30 +101,100 @@ class ParodyService:
         if motion_directive:
             full_prompt = f"{prompt}, {motion_directive}"
 
-        print(f"[Parody] Generating video from image using {model}")
+        print(f"[Parody] Queueing video from image using {model}")
         print(f"[Parody] Prompt: {full_prompt}")
 
+        response = await self.client.post(
+            f"{self.base_url}/{model}",
+            params={"fal_webhook": webhook_url} if webhook_url else None,
+            headers=self._auth_headers(),
+            json={
+                "prompt": full_prompt,
+                "image_url": image_url
+            }
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"fal.ai queue submit failed: {response.status_code} - {response.text}")
+
+        queued = response.json()
+        print(f"[Parody] Queued request {queued['request_id']}")
+        return {
+            "request_id": queued["request_id"],
+            "status_url": queued["status_url"],
+            "response_url": queued["response_url"],
+        }
+
+    async def get_status(self, status_url: str) -> str:
+        """Queue status of a request: IN_QUEUE, IN_PROGRESS or COMPLETED."""
+        response = await self.client.get(status_url, headers=self._auth_headers())
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"fal.ai status check failed: {response.status_code} - {response.text}")
+        return response.json()["status"]
+
+    async def get_result(self, response_url: str) -> str:
+        """
+        Video URL of a completed request.
+
+        Raises:
+            RuntimeError: if the generation failed
+        """
+        response = await self.client.get(response_url, headers=self._auth_headers())
+        if response.status_code != 200:
+            raise RuntimeError(f"fal.ai parody generation failed: {response.status_code} - {response.text}")
+        return video_url_from(response.json())
+
+    async def download(self, url: str, output_path: str):
+        """Stream a generated video to disk; a failed download leaves nothing behind."""
+        tmp_path = f"{output_path}.part"
         try:
-            # Using subscribe to handle wait
-            handler = await fal_client.subscribe_async(
-                model,
-                arguments={
-                    "prompt": full_prompt,
-                    "image_url": image_url
-                },
-            )
-            
-            result = handler
-            if result and "video" in result:
-                video_url = result["video"]["url"]
-                print(f"[Parody] Generated video URL: {video_url}")
-                return video_url
-            else:
-                raise RuntimeError(f"fal.ai parody generation failed: {result}")
-
-        except Exception as e:
-            print(f"[Parody] Error generating parody: {e}")
+            # Generated files are on a public CDN: no auth header
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
             raise
 
+    def _auth_headers(self) -> dict:
+        return {"Authorization": f"Key {self.fal_key}"}
+
+    async def generate_image_to_video(
+        self,
+        image_url: str,
+        prompt: str,
+        motion_directive: Optional[str] = None,
+        model: str = settings.PARODY_MODEL
+    ) -> str:
+        """
+        Generate a video from an image and wait for it (for scripts; the API
+        uses parody jobs instead).
+
+        Args:
+            image_url: URL to the source image (or data URI)
+            prompt: Base prompt for generation
+            motion_directive: Optional motion instruction (e.g. "slow zoom-in")
+            model: fal.ai model ID
+
+        Returns:
+            URL to the generated video
+        """
+        queued = await self.submit(image_url, prompt, motion_directive, model)
+        while await self.get_status(queued["status_url"]) != COMPLETED:
+            await asyncio.sleep(settings.PARODY_POLL_INTERVAL_SECONDS)
+        video_url = await self.get_result(queued["response_url"])
+        print(f"[Parody] Generated video URL: {video_url}")
+        return video_url
+
+
+def video_url_from(result: dict) -> str:
+    """The video URL in an image-to-video result payload."""
+    if not result or "video" not in result:
+        raise RuntimeError(f"fal.ai parody generation failed: {result}")
+    return result["video"]["url"]
+
+
 # Singleton instance
 parody_service = ParodyService()
@@ -0,0 +1,61 @@
+"""
+ragebAIt - Analysis Proxies
+Small copies of source videos for model uploads.
+
+Gemini only needs enough pixels to follow the play, while upload time and
+its PROCESSING step scale with file size. Before a video is uploaded for
+analysis it is swapped for a proxy (see VideoProcessor.make_proxy): 480p,
+5 fps, capped bitrate, same timeline. Proxies are cached per content hash,
+so a source is only ever encoded once.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from backend.config import settings
+from backend.services import result_cache as cache_layers
+from backend.services.executors import run_blocking
+from backend.services.render_pool import render_pool, RenderPoolBusy
+from backend.services.result_cache import result_cache, make_key
+from backend.services.scratch import scratch
+from backend.services.video_processor import video_processor
+
+
+@asynccontextmanager
+async def analysis_copy(video_path: str, sha256: str) -> AsyncIterator[str]:
+    """
+    Yield the file to upload for analysis of a video.
+
+    That is a cached or freshly encoded proxy, or the video itself when
+    proxies are disabled, the video is already proxy-sized, or encoding
+    fails. A new proxy lives in its own scratch directory until the
+    context exits.
+
+    Args:
+        video_path: Source video
+        sha256: Content hash of the source (the proxy cache key)
+    """
+    path = video_path
+    scratch_id = None
+    if settings.PROXY_ENABLED and not await run_blocking(video_processor.is_proxy_sized, video_path):
+        scratch_id = scratch.new_job_id("proxy")
+        proxy_path = str(scratch.path(scratch_id, "proxy.mp4"))
+        key = make_key(sha256, settings.PROXY_HEIGHT, settings.PROXY_FPS, settings.PROXY_VIDEO_KBPS)
+        try:
+            if await run_blocking(result_cache.get_file, cache_layers.PROXIES, key, proxy_path, ".mp4"):
+                print(f"[Proxy] Reusing cached proxy for {video_path}")
+            else:
+                await render_pool.run(video_processor.make_proxy, video_path, proxy_path)
+                print(f"[Proxy] {os.path.getsize(video_path) / 1e6:.1f}MB -> "
+                      f"{os.path.getsize(proxy_path) / 1e6:.1f}MB for {video_path}")
+                await run_blocking(result_cache.put_file, cache_layers.PROXIES, key, proxy_path, ".mp4")
+            path = proxy_path
+        except (RuntimeError, RenderPoolBusy) as e:
+            print(f"[Proxy] Warning: could not make a proxy, uploading the original: {e}")
+
+    try:
+        yield path
+    finally:
+        if scratch_id is not None:
+            scratch.release(scratch_id)
@@ -0,0 +1,174 @@
+"""
+ragebAIt - Render Pool
+Process pool for CPU-bound video work (ffmpeg/MoviePy encodes, OpenCV
+decoding, JPEG encoding), so it runs on every core and never holds the
+event loop or the GIL of the API process.
+
+- Backpressure: at most RENDER_WORKERS tasks run at once and at most
+  RENDER_QUEUE_SIZE wait for a slot. Callers beyond that, or that wait
+  longer than RENDER_QUEUE_WAIT_SECONDS, get RenderPoolBusy.
+- Timeouts: each task gets a deadline. ffmpeg calls inside the worker are
+  killed when it passes (see ffmpeg_tools.set_deadline), and the caller
+  gets RenderTimeout. The task's slot is only freed when the task really
+  stops, since MoviePy/OpenCV work can't be interrupted.
+- Cancellation: a cancelled caller cancels its task if it has not started
+  yet; a running task stops at its deadline.
+
+With RENDER_WORKERS=0 (e.g. on serverless hosts) tasks run in the shared
+I/O thread pool instead, with the same timeouts and backpressure.
+"""
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from backend.config import settings
+from backend.services import ffmpeg_tools
+from backend.services.executors import io_executor
+
+
+class RenderPoolBusy(Exception):
+    """No render slot became free in time."""
+
+
+class RenderTimeout(RuntimeError):
+    """A render task ran past its deadline."""
+
+
+def _run_with_deadline(func: Callable[..., Any], deadline: float, args: tuple, kwargs: dict) -> Any:
+    """Worker-side entry point: run func with the ffmpeg deadline set."""
+    ffmpeg_tools.set_deadline(deadline)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        ffmpeg_tools.set_deadline(None)
+
+
+class RenderPool:
+    """Bounded process pool with a wait queue, timeouts and cancellation."""
+
+    def __init__(self, workers: int, queue_size: int, queue_wait_seconds: float, timeout_seconds: float):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_wait_seconds = queue_wait_seconds
+        self.timeout_seconds = timeout_seconds
+        # In thread mode, as many concurrent tasks as there are cores
+        self._capacity = workers if workers > 0 else settings.RENDER_THREAD_SLOTS
+        self._slots = asyncio.Semaphore(self._capacity)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queued = 0
+        self._running = 0
+
+    def start(self):
+        """Start the worker processes."""
+        if self.workers > 0 and self._executor is None:
+            # spawn, not fork: the API process has threads and an event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self):
+        """Stop the workers, dropping tasks that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a picklable callable in the pool and await its result.
+
+        Args:
+            func: Module-level function or method of a module-level object
+            *args, **kwargs: Arguments passed through to func
+            timeout: Seconds the task may take once started
+                (default RENDER_TIMEOUT_SECONDS)
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            RenderPoolBusy: if the wait queue is full or no slot frees up
+                within RENDER_QUEUE_WAIT_SECONDS
+            RenderTimeout: if the task runs past its timeout
+        """
+        timeout = timeout or self.timeout_seconds
+
+        if self._queued + self._running >= self._capacity + self.queue_size:
+            raise RenderPoolBusy("Render queue is full, try again later")
+        self._queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_wait_seconds)
+        except asyncio.TimeoutError:
+            raise RenderPoolBusy("Render workers are busy, try again later")
+        finally:
+            self._queued -= 1
+
+        self._running += 1
+        try:
+            # A slot means a free worker, so the task starts right away
+            deadline = time.time() + timeout
+            task = self._submit(_run_with_deadline, func, deadline, args, kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # The slot stays taken until the task itself stops, not when the
+        # caller gives up: a timed-out task keeps its worker busy until then
+        loop = asyncio.get_running_loop()
+        task.add_done_callback(lambda _: self._release_threadsafe(loop))
+
+        try:
+            # Cancelling the wrapper cancels the task if it has not started
+            return await asyncio.wait_for(asyncio.wrap_future(task), timeout + 5)
+        except asyncio.TimeoutError:
+            raise RenderTimeout(f"{getattr(func, '__name__', func)} timed out after {timeout:.0f}s")
+        except BrokenProcessPool:
+            self._restart()
+            raise RuntimeError("A render worker crashed; restarted the pool")
+
+    def _submit(self, *call) -> concurrent.futures.Future:
+        """Hand a call to the worker processes, or to the I/O thread pool."""
+        if self.workers <= 0:
+            return io_executor.submit(*call)
+        self.start()
+        try:
+            return self._executor.submit(*call)
+        except BrokenProcessPool:
+            self._restart()
+            raise RuntimeError("Render pool was broken; restarted it")
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop):
+        # Done callbacks run on a worker or pool management thread
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # Event loop already closed (shutdown): nothing left to wake
+            pass
+
+    def _release(self):
+        self._running -= 1
+        self._slots.release()
+
+    def _restart(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    @property
+    def stats(self) -> dict:
+        """Current load: tasks waiting for a slot and tasks holding one."""
+        return {"workers": self.workers, "waiting": self._queued, "active": self._running}
+
+
+# Singleton instance
+render_pool = RenderPool(
+    workers=settings.RENDER_WORKERS,
+    queue_size=settings.RENDER_QUEUE_SIZE,
+    queue_wait_seconds=settings.RENDER_QUEUE_WAIT_SECONDS,
+    timeout_seconds=settings.RENDER_TIMEOUT_SECONDS
+)
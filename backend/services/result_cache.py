@@ -0,0 +1,185 @@
+"""
+ragebAIt - Result Cache
+Content-addressed, size-bounded disk cache for pipeline results.
+
+Entries live under RESULT_CACHE_DIR/<namespace>/<key[:2]>/<key><suffix>.
+Keys are SHA-256 digests of the inputs that determine a result (video hash,
+lens, scene parameters, prompt version, ...), so each pipeline layer can be
+reused on its own: a new lens on a known video still skips scene detection.
+
+Eviction is least-recently-used by file mtime (refreshed on every hit) and
+keeps the whole cache under RESULT_CACHE_MAX_MB. Writes go through a temp
+file and os.replace, so concurrent workers never see partial entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from backend.config import settings
+
+
+# Cache layers
+CANDIDATES = "candidates"
+PROXIES = "proxies"
+SCENES = "scenes"
+COMMENTARY = "commentary"
+TTS = "tts"
+CLIPS = "clips"
+RENDERS = "renders"
+ASSETS = "assets"
+
+
+def make_key(*parts: Any) -> str:
+    """Build a cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Size-bounded LRU cache of JSON values and files on local disk."""
+
+    def __init__(self, root: Path, max_bytes: int, enabled: bool = True):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._lock = threading.Lock()
+        # Running estimate of the cache size; None until the first full scan
+        self._total_bytes: Optional[int] = None
+        if enabled:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a cached JSON value, or None on a miss."""
+        path = self._lookup(namespace, key, ".json")
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, namespace: str, key: str, value: Any):
+        """Store a JSON-serializable value."""
+        if not self.enabled:
+            return
+        data = json.dumps(value).encode("utf-8")
+        self._write(self._path(namespace, key, ".json"), lambda f: f.write(data))
+
+    def get_file(self, namespace: str, key: str, dest: Union[str, Path], suffix: str = "") -> Optional[str]:
+        """
+        Materialize a cached file at dest.
+
+        Args:
+            namespace: Cache layer
+            key: Cache key
+            dest: Where the caller wants the file (hard-linked when possible)
+            suffix: File suffix the entry was stored with
+
+        Returns:
+            dest as a string on a hit, None on a miss
+        """
+        path = self._lookup(namespace, key, suffix)
+        if path is None:
+            return None
+        try:
+            _link_or_copy(path, Path(dest))
+        except OSError:
+            return None
+        return str(dest)
+
+    def put_file(self, namespace: str, key: str, src: Union[str, Path], suffix: str = ""):
+        """Store a copy of the file at src."""
+        if not self.enabled:
+            return
+        path = self._path(namespace, key, suffix)
+        with open(src, "rb") as source:
+            self._write(path, lambda f: shutil.copyfileobj(source, f, 1024 * 1024))
+
+    def stats(self) -> dict:
+        """Hit/miss counters per layer."""
+        return {
+            namespace: {"hits": self.hits[namespace], "misses": self.misses[namespace]}
+            for namespace in sorted(set(self.hits) | set(self.misses))
+        }
+
+    def _path(self, namespace: str, key: str, suffix: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}{suffix}"
+
+    def _lookup(self, namespace: str, key: str, suffix: str) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        path = self._path(namespace, key, suffix)
+        try:
+            # Refresh mtime so LRU eviction sees the hit
+            os.utime(path)
+        except OSError:
+            self.misses[namespace] += 1
+            return None
+        self.hits[namespace] += 1
+        return path
+
+    def _write(self, path: Path, write):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += path.stat().st_size
+            if self._total_bytes is None or self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.rglob("*"):
+            # Skip temp files: another writer may be about to rename them
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+
+def _link_or_copy(src: Path, dest: Path):
+    """Hard-link src to dest (cheap, same filesystem), falling back to a copy."""
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+# Singleton instance
+result_cache = DiskCache(
+    root=settings.RESULT_CACHE_DIR,
+    max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+    enabled=settings.RESULT_CACHE_ENABLED
+)
@@ -0,0 +1,153 @@
+"""
+ragebAIt - Scratch Space
+Per-job scratch directories under TEMP_DIR/jobs with automatic cleanup.
+
+Every file a job creates (input, clip, audio, render, thumbnail) lives in
+its own directory, so concurrent jobs never share a temp path. Directories
+are removed when their job finishes (success or failure), and a periodic
+sweep removes anything left behind by crashed workers. The sweep also keeps
+total scratch usage under SCRATCH_MAX_MB by deleting the least recently
+touched idle directories first.
+"""
+
+import asyncio
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from backend.config import settings
+from backend.services.executors import run_blocking
+
+
+# Over the cap, only directories untouched this long are evicted early, so
+# jobs running in other workers (which keep writing files) are left alone
+IDLE_GRACE_SECONDS = 600
+
+
+class ScratchFull(Exception):
+    """Scratch space is over its cap even after sweeping."""
+
+
+class ScratchSpace:
+    """Allocates, tracks and cleans per-job scratch directories."""
+
+    def __init__(self, root: Path, max_bytes: int, max_age_seconds: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        # Jobs running in this process; never swept
+        self._active: set[str] = set()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def job_dir(self, job_id: str) -> Path:
+        """Create (if needed) and return the scratch directory of a job."""
+        path = self.root / job_id
+        path.mkdir(parents=True, exist_ok=True)
+        self._active.add(job_id)
+        return path
+
+    def path(self, job_id: str, name: str) -> Path:
+        """Path of a file inside a job's scratch directory."""
+        return self.job_dir(job_id) / name
+
+    def new_job_id(self, prefix: str) -> str:
+        """A unique scratch ID for one-off work that is not a generation job."""
+        return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+    def release(self, job_id: str, keep: bool = False):
+        """
+        Mark a job finished and delete its directory.
+
+        Args:
+            job_id: Job whose directory to release
+            keep: Leave the files for the periodic sweep (e.g. when an
+                output is only reachable through a file:// URL)
+        """
+        self._active.discard(job_id)
+        if not keep:
+            shutil.rmtree(self.root / job_id, ignore_errors=True)
+
+    def usage_bytes(self) -> int:
+        """Total size of every scratch directory."""
+        return sum(size for _, size, _ in self._scan())
+
+    def sweep(self) -> int:
+        """
+        Remove stale directories, then the oldest idle ones while over the cap.
+
+        Returns:
+            Number of directories removed
+        """
+        now = time.time()
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for touched, size, path in entries:
+            if path.name in self._active:
+                continue
+            idle = now - touched
+            stale = idle > self.max_age_seconds
+            if not stale and (total <= self.max_bytes or idle < IDLE_GRACE_SECONDS):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            print(f"[Scratch] Swept {removed} directories ({total / 1e6:.0f}MB in use)")
+        return removed
+
+    def ensure_capacity(self):
+        """
+        Make room for a new job.
+
+        Raises:
+            ScratchFull: if usage is still over the cap after a sweep
+        """
+        if self.usage_bytes() <= self.max_bytes:
+            return
+        self.sweep()
+        if self.usage_bytes() > self.max_bytes:
+            raise ScratchFull("Scratch space is full, try again later")
+
+    async def run_sweeper(self, interval_seconds: float):
+        """Sweep forever (run as a background task)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_blocking(self.sweep)
+            except Exception as e:
+                print(f"[Scratch] Sweep failed: {e}")
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """(last modified, size, path) for every job directory."""
+        entries = []
+        for path in self.root.iterdir():
+            if not path.is_dir():
+                continue
+            latest = 0.0
+            size = 0
+            for f in path.rglob("*"):
+                try:
+                    stat = f.stat()
+                except OSError:
+                    continue
+                latest = max(latest, stat.st_mtime)
+                if f.is_file():
+                    size += stat.st_size
+            try:
+                latest = max(latest, path.stat().st_mtime)
+            except OSError:
+                continue
+            entries.append((latest, size, path))
+        return entries
+
+
+# Singleton instance
+scratch = ScratchSpace(
+    root=settings.SCRATCH_DIR,
+    max_bytes=settings.SCRATCH_MAX_MB * 1024 * 1024,
+    max_age_seconds=settings.SCRATCH_MAX_AGE_SECONDS
+)
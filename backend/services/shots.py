@@ -0,0 +1,154 @@
+"""
+ragebAIt - Shot Index
+Shot boundaries and keyframes of a video, used to snap model-proposed scene
+times to clean edges.
+
+A start that lands on a shot cut doesn't open on a half-second of the
+previous shot, and a start that lands on a keyframe lets extract_clip
+stream-copy instead of re-encoding. Ends snap to just before the next cut.
+Scenes are then ranked on humor score plus how clean their boundaries are.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+
+# Frame rate of the decode used to find cuts (cut times are accurate to 1/SHOT_FPS)
+SHOT_FPS = 10
+
+# How far a boundary may move to reach a cut or keyframe. Starts prefer moving
+# earlier (keeps the build-up), ends prefer moving later (keeps the payoff).
+START_EARLIER = 2.0
+START_LATER = 1.0
+END_EARLIER = 1.0
+END_LATER = 2.0
+
+# A keyframe this soon after a cut starts the shot just as well
+KEYFRAME_AFTER_CUT = 0.3
+
+# Boundary quality (0-1) per kind of edge
+CUT_WITH_KEYFRAME = 1.0
+CUT = 0.7
+KEYFRAME = 0.6
+VIDEO_EDGE = 1.0
+
+# Quality lost per second a boundary moves (prefer the nearest good edge)
+DISTANCE_PENALTY = 0.1
+
+# Ranking: humor score (1-10) plus this many points for perfect boundaries
+BOUNDARY_WEIGHT = 1.5
+
+# Scenes sharing more than this fraction of the shorter one count as duplicates
+MAX_OVERLAP = 0.5
+
+
+@dataclass
+class ShotIndex:
+    """Cut and keyframe times (seconds, sorted) of a video."""
+    cuts: list[float]
+    keyframes: list[float]
+    duration: float
+
+    def snap_start(self, t: float) -> tuple[float, float]:
+        """
+        Move a scene start to the best nearby edge.
+
+        Returns:
+            (start, quality)
+        """
+        t = min(max(t, 0.0), self.duration)
+        lo, hi = max(0.0, t - START_EARLIER), t + START_LATER
+        candidates = [(t, 0.0)]
+        if lo <= 0.0:
+            candidates.append((0.0, VIDEO_EDGE))
+        for cut in _between(self.cuts, lo, hi):
+            keyframes = _between(self.keyframes, cut - 0.05, cut + KEYFRAME_AFTER_CUT)
+            if keyframes:
+                candidates.append((keyframes[0], CUT_WITH_KEYFRAME))
+            else:
+                candidates.append((cut, CUT))
+        candidates += [(k, KEYFRAME) for k in _between(self.keyframes, lo, hi)]
+        return _best(candidates, t)
+
+    def snap_end(self, t: float, start: float, min_duration: float, max_duration: float) -> tuple[float, float]:
+        """
+        Move a scene end to just before a nearby cut, keeping the length in range.
+
+        Returns:
+            (end, quality)
+        """
+        lo, hi = t - END_EARLIER, t + END_LATER
+        shortest, longest = start + min_duration, start + max_duration
+
+        def fits(end: float) -> bool:
+            return shortest <= end <= longest
+
+        fallback = min(max(t, shortest), longest, self.duration)
+        candidates = [(fallback, 0.0)]
+        if lo <= self.duration <= hi and fits(self.duration):
+            candidates.append((self.duration, VIDEO_EDGE))
+        for cut in _between(self.cuts, lo, hi):
+            # Stop on the last frame of the outgoing shot. Ends need no
+            # keyframe, so a cut is a perfect end.
+            end = cut - 1.0 / SHOT_FPS
+            if fits(end):
+                candidates.append((end, CUT_WITH_KEYFRAME))
+        return _best(candidates, t)
+
+    def snap(self, start: float, end: float, min_duration: float, max_duration: float) -> tuple[float, float, float]:
+        """
+        Snap both edges of a scene.
+
+        Returns:
+            (start, end, boundary quality 0-1)
+        """
+        start, start_quality = self.snap_start(start)
+        end, end_quality = self.snap_end(end, start, min_duration, max_duration)
+        return start, end, (start_quality + end_quality) / 2
+
+
+def snap_and_rank(moments: list, index: ShotIndex, min_duration: float, max_duration: float) -> list:
+    """
+    Snap every moment to shot edges and order them best first.
+
+    Moments are FunnyMoment-like objects (start_time, end_time, humor_score,
+    boundary_quality); they are updated in place.
+    """
+    for moment in moments:
+        moment.start_time, moment.end_time, moment.boundary_quality = index.snap(
+            moment.start_time, moment.end_time, min_duration, max_duration
+        )
+    return sorted(moments, key=rank_score, reverse=True)
+
+
+def drop_overlapping(moments: list, max_overlap: float = MAX_OVERLAP) -> list:
+    """
+    Keep moments in order, skipping any that mostly repeat a kept one.
+
+    A moment is dropped when more than max_overlap of the shorter of it and
+    a kept moment is shared between them.
+    """
+    kept = []
+    for moment in moments:
+        if all(_overlap(moment, other) <= max_overlap for other in kept):
+            kept.append(moment)
+    return kept
+
+
+def rank_score(moment) -> float:
+    """Humor score plus a bonus for clean boundaries."""
+    return moment.humor_score + BOUNDARY_WEIGHT * moment.boundary_quality
+
+
+def _overlap(a, b) -> float:
+    shared = min(a.end_time, b.end_time) - max(a.start_time, b.start_time)
+    shortest = min(a.end_time - a.start_time, b.end_time - b.start_time)
+    return max(shared, 0.0) / shortest if shortest > 0 else 1.0
+
+
+def _between(times: list[float], lo: float, hi: float) -> list[float]:
+    return times[bisect_left(times, lo):bisect_right(times, hi)]
+
+
+def _best(candidates: list[tuple[float, float]], target: float) -> tuple[float, float]:
+    return max(candidates, key=lambda c: c[1] - DISTANCE_PENALTY * abs(c[0] - target))
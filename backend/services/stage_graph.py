@@ -0,0 +1,99 @@
+"""
+ragebAIt - Stage Graph
+A small DAG scheduler: each stage declares the stages it depends on and
+starts as soon as they have finished, so independent stages run concurrently.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+
+# A stage receives the results of every stage finished so far, keyed by name
+StageFunc = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Stage:
+    """One node in the graph."""
+    name: str
+    func: StageFunc
+    deps: tuple[str, ...] = field(default_factory=tuple)
+
+
+class StageGraph:
+    """
+    Runs stages in dependency order with maximal concurrency.
+
+    Per-stage wall-clock timings (seconds) are collected in `timings`.
+    If any stage fails, every other unfinished stage is cancelled and the
+    error is re-raised. The on_start/on_finish callbacks may be plain
+    functions or coroutine functions.
+    """
+
+    def __init__(
+        self,
+        on_start: Optional[Callable[[str], Optional[Awaitable[None]]]] = None,
+        on_finish: Optional[Callable[[str, float], Optional[Awaitable[None]]]] = None
+    ):
+        self._stages: dict[str, Stage] = {}
+        self._on_start = on_start
+        self._on_finish = on_finish
+        self.timings: dict[str, float] = {}
+
+    def add(self, name: str, func: StageFunc, deps: tuple[str, ...] = ()) -> "StageGraph":
+        """Add a stage. Dependencies must already have been added."""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self._stages[name] = Stage(name=name, func=func, deps=tuple(deps))
+        return self
+
+    @property
+    def stage_names(self) -> list[str]:
+        return list(self._stages)
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Run every stage and return their results keyed by stage name.
+        """
+        results: dict[str, Any] = {}
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage):
+            if stage.deps:
+                await asyncio.gather(*(tasks[d] for d in stage.deps))
+            await notify(self._on_start, stage.name)
+            started = time.perf_counter()
+            result = await stage.func(results)
+            elapsed = round(time.perf_counter() - started, 3)
+            self.timings[stage.name] = elapsed
+            results[stage.name] = result
+            await notify(self._on_finish, stage.name, elapsed)
+            return result
+
+        async def notify(callback: Optional[Callable], *args):
+            if callback is None:
+                return
+            outcome = callback(*args)
+            if inspect.isawaitable(outcome):
+                await outcome
+
+        # Stages can only depend on earlier ones (enforced in add), so
+        # insertion order is a valid topological order.
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage), name=f"stage-{stage.name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return results
@@ -1,23 +1,397 @@
 """
 ragebAIt - Storage Client
-Handles file uploads to Vercel Blob storage.
+Handles file uploads to pluggable storage backends.
+
+Two backends are provided:
+- VercelBlobBackend: Vercel Blob. One pooled httpx client is shared by
+  every upload (opened on startup, closed on shutdown), files are streamed
+  from disk, and anything over BLOB_MULTIPART_THRESHOLD_MB goes through
+  Blob's multipart API with parts uploaded concurrently. Connection errors
+  and 429/5xx responses are retried (BLOB_RETRIES) with backoff; a
+  multipart upload retries single parts, not the whole file.
+- LocalStorageBackend: content-addressed files on local disk, served by
+  routers/files.py with Range/ETag support and capped at
+  LOCAL_STORAGE_MAX_MB. Opt-in (STORAGE_BACKEND=local); lets us self-host
+  and run the full pipeline offline.
+
+is_public() tells whether a backend's URLs can be fetched by external
+services (fal.ai): a local store behind a localhost or private
+PUBLIC_BASE_URL only serves our own frontend.
 """
 
-import httpx
+import asyncio
+import ipaddress
+import os
+import re
+import shutil
+import threading
 import uuid
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
+from urllib.parse import quote, urlparse
+
+import aiofiles
+import httpx
 
 from backend.config import settings
+from backend.services.executors import run_blocking
+from backend.services.hashing import bytes_sha256, file_sha256
+
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Blob API responses worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Content types by file extension
+CONTENT_TYPES = {
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.webm': 'video/webm',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+# Names of objects in the local store: <sha256><ext>
+LOCAL_OBJECT_NAME = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]{1,5})?$")
+
+
+def content_type_for(filename: str) -> str:
+    """MIME type for a filename, from its extension."""
+    return CONTENT_TYPES.get(Path(filename).suffix.lower(), 'application/octet-stream')
+
+
+class StorageBackend(ABC):
+    """Interface for object storage."""
+
+    async def start(self):
+        """Acquire long-lived resources (connections)."""
+
+    async def close(self):
+        """Release long-lived resources."""
+
+    @abstractmethod
+    async def put_bytes(self, data: bytes, filename: str, content_type: str) -> str:
+        """Store an in-memory object and return its public URL."""
+
+    @abstractmethod
+    async def put_path(self, path: Path, content_type: str) -> str:
+        """Store a file from disk and return its public URL."""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Whether the backend is configured."""
+
+    @abstractmethod
+    def is_public(self) -> bool:
+        """Whether URLs from this backend can be fetched by external services."""
+
+
+class VercelBlobBackend(StorageBackend):
+    """Vercel Blob storage over a pooled HTTP client."""
+
+    def __init__(self, token: str, base_url: str):
+        self.token = token
+        # Overridable so a local stand-in blob server can be used in tests
+        self.base_url = base_url.rstrip("/")
+        self.multipart_threshold = settings.BLOB_MULTIPART_THRESHOLD_MB * 1024 * 1024
+        self.part_size = settings.BLOB_MULTIPART_PART_SIZE_MB * 1024 * 1024
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Open the pooled HTTP client."""
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client (opened lazily for scripts that skip startup)."""
+        if self._client is None:
+            self._client = self._new_client()
+        return self._client
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.BLOB_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.BLOB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.BLOB_MAX_CONNECTIONS,
+                keepalive_expiry=60.0
+            )
+        )
+
+    async def put_bytes(self, data: bytes, filename: str, content_type: str) -> str:
+        return await self._put(self._unique_name(filename), data, len(data), content_type)
+
+    async def put_path(self, path: Path, content_type: str) -> str:
+        pathname = self._unique_name(path.name)
+        size = path.stat().st_size
+
+        if size >= self.multipart_threshold:
+            return await self._upload_multipart(path, pathname, size, content_type)
+        return await self._put(pathname, lambda: _read_chunks(path), size, content_type)
+
+    def is_available(self) -> bool:
+        return bool(self.token)
+
+    def is_public(self) -> bool:
+        return self.is_available()
+
+    async def _put(self, pathname: str, content, size: int, content_type: str) -> str:
+        """Single-request upload; content as for _send."""
+        response = await self._send(
+            "PUT",
+            f"{self.base_url}/{pathname}",
+            "Upload",
+            content=content,
+            headers={
+                **self._auth_headers(content_type),
+                "Content-Type": content_type,
+                "Content-Length": str(size),
+            }
+        )
+        result = response.json()
+        return result.get("url", "")
+
+    async def _send(self, method: str, url: str, action: str, content=None, **kwargs) -> httpx.Response:
+        """
+        Send a Blob API request, retrying connection errors and 429/5xx
+        responses up to BLOB_RETRIES times with exponential backoff.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            action: What the request does (for errors and logs)
+            content: Request body: bytes, or a callable returning a fresh
+                async byte iterator (a streamed body can only be sent once)
+            **kwargs: Passed through to httpx (headers, json)
+
+        Returns:
+            The 200 response
+
+        Raises:
+            RuntimeError: on any other response, or once retries run out
+        """
+        for attempt in range(settings.BLOB_RETRIES + 1):
+            body = content() if callable(content) else content
+            try:
+                response = await self.client.request(method, url, content=body, **kwargs)
+            except httpx.TransportError as e:
+                error = repr(e)
+            else:
+                if response.status_code == 200:
+                    return response
+                error = f"{response.status_code} - {response.text}"
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise RuntimeError(f"{action} failed: {error}")
+
+            if attempt == settings.BLOB_RETRIES:
+                raise RuntimeError(f"{action} failed after {attempt + 1} attempts: {error}")
+            delay = settings.BLOB_RETRY_BACKOFF_SECONDS * 2 ** attempt
+            print(f"[Storage] {action} attempt {attempt + 1} failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _upload_multipart(self, path: Path, pathname: str, size: int, content_type: str) -> str:
+        """
+        Upload a large file with Blob's multipart API (create, parts, complete).
+
+        Parts are read from disk one at a time per worker and uploaded
+        BLOB_MULTIPART_CONCURRENCY at a time, so memory stays bounded by
+        part_size * concurrency regardless of the file size.
+        """
+        url = f"{self.base_url}/mpu?pathname={quote(pathname)}"
+        headers = self._auth_headers(content_type)
+
+        response = await self._send("POST", url, "Multipart create", headers={**headers, "x-mpu-action": "create"})
+        upload = response.json()
+        mpu_headers = {
+            **headers,
+            "x-mpu-key": quote(upload["key"], safe=""),
+            "x-mpu-upload-id": upload["uploadId"],
+        }
+
+        num_parts = (size + self.part_size - 1) // self.part_size
+        semaphore = asyncio.Semaphore(settings.BLOB_MULTIPART_CONCURRENCY)
+
+        async def upload_part(part_number: int) -> dict:
+            async with semaphore:
+                async with aiofiles.open(path, "rb") as f:
+                    await f.seek((part_number - 1) * self.part_size)
+                    data = await f.read(self.part_size)
+                response = await self._send(
+                    "PUT",
+                    url,
+                    f"Multipart part {part_number}",
+                    content=data,
+                    headers={
+                        **mpu_headers,
+                        "x-mpu-action": "upload",
+                        "x-mpu-part-number": str(part_number),
+                    }
+                )
+                return {"partNumber": part_number, "etag": response.json()["etag"]}
+
+        parts = await asyncio.gather(*(upload_part(n) for n in range(1, num_parts + 1)))
+        print(f"[Storage] Uploaded {pathname} in {num_parts} parts")
+
+        response = await self._send(
+            "POST",
+            url,
+            "Multipart complete",
+            json=list(parts),
+            headers={**mpu_headers, "x-mpu-action": "complete"}
+        )
+        return response.json().get("url", "")
+
+    def _auth_headers(self, content_type: str) -> dict:
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "x-content-type": content_type,
+        }
+
+    def _unique_name(self, filename: str) -> str:
+        # Generate unique filename to avoid collisions
+        return f"{uuid.uuid4().hex[:8]}_{filename}"
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Content-addressed store on local disk.
+
+    Objects are named <sha256><ext>, so identical outputs are stored once
+    and the name doubles as a strong ETag. The store is kept under max_bytes
+    by deleting the least recently stored objects (storing an object again
+    refreshes it).
+    """
+
+    def __init__(self, root: Path, public_base_url: str, max_bytes: int):
+        self.root = Path(root)
+        self.public_base_url = public_base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Running estimate of the store size; None until the first full scan
+        self._total_bytes: Optional[int] = None
+
+    async def put_bytes(self, data: bytes, filename: str, content_type: str) -> str:
+        name = bytes_sha256(data) + Path(filename).suffix.lower()
+        await run_blocking(self._write_bytes, name, data)
+        return self.url_for(name)
+
+    async def put_path(self, path: Path, content_type: str) -> str:
+        name = await run_blocking(file_sha256, path) + path.suffix.lower()
+        await run_blocking(self._copy_in, name, path)
+        return self.url_for(name)
+
+    def is_available(self) -> bool:
+        return True
+
+    def is_public(self) -> bool:
+        return is_public_url(self.public_base_url)
+
+    def url_for(self, name: str) -> str:
+        return f"{self.public_base_url}/files/{name}"
+
+    def path_for(self, name: str) -> Optional[Path]:
+        """Path of a stored object, or None if the name is invalid or missing."""
+        if not LOCAL_OBJECT_NAME.match(name):
+            return None
+        path = self.root / name[:2] / name
+        return path if path.is_file() else None
+
+    def _target(self, name: str) -> Path:
+        target = self.root / name[:2] / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return target
+
+    def _write_bytes(self, name: str, data: bytes):
+        target = self._target(name)
+        if self._refresh(target):
+            return  # Same content already stored
+        tmp = target.with_name(f".{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_bytes(data)
+            tmp.replace(target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._added(target)
+
+    def _copy_in(self, name: str, path: Path):
+        target = self._target(name)
+        if self._refresh(target):
+            return  # Same content already stored
+        tmp = target.with_name(f".{uuid.uuid4().hex}.tmp")
+        try:
+            shutil.copyfile(path, tmp)
+            tmp.replace(target)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._added(target)
+
+    def _refresh(self, target: Path) -> bool:
+        """Mark an existing object as recently stored; False if it doesn't exist."""
+        try:
+            os.utime(target)
+        except OSError:
+            return False
+        return True
+
+    def _added(self, target: Path):
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += target.stat().st_size
+            if self._total_bytes is None or self._total_bytes > self.max_bytes:
+                self._evict(keep=target)
+
+    def _evict(self, keep: Path):
+        """Delete the least recently stored objects until the store fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*"):
+            if path.name.startswith(".") or not path.is_file():
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue  # The object just stored, whose URL is being handed out
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
 
 
 class StorageClient:
-    """Client for Vercel Blob storage."""
-    
-    def __init__(self):
-        self.token = settings.VERCEL_BLOB_TOKEN
-        self.base_url = "https://blob.vercel-storage.com"
-    
+    """Uploads files to the configured storage backend."""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    async def start(self):
+        await self.backend.start()
+
+    async def close(self):
+        await self.backend.close()
+
     async def upload_file(
         self,
         file_bytes: bytes,
@@ -25,42 +399,20 @@ class StorageClient:
         content_type: str = "application/octet-stream"
     ) -> str:
         """
-        Upload a file to Vercel Blob.
-        
+        Upload a file.
+
         Args:
             file_bytes: File content as bytes
             filename: Desired filename
             content_type: MIME type of the file
-            
+
         Returns:
             Public URL of the uploaded file
         """
-        if not self.token:
-            if settings.MOCK_MODE:
-                # Return mock URL in mock mode
-                return f"https://mock-storage.local/{filename}"
-            raise RuntimeError("VERCEL_BLOB_TOKEN not configured")
-        
-        # Generate unique filename to avoid collisions
-        unique_filename = f"{uuid.uuid4().hex[:8]}_{filename}"
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/{unique_filename}",
-                content=file_bytes,
-                headers={
-                    "Authorization": f"Bearer {self.token}",
-                    "Content-Type": content_type,
-                    "x-content-type": content_type,
-                }
-            )
-            
-            if response.status_code != 200:
-                raise RuntimeError(f"Upload failed: {response.status_code} - {response.text}")
-            
-            result = response.json()
-            return result.get("url", "")
-    
+        if not self.backend.is_available():
+            raise RuntimeError("Storage backend not configured")
+        return await self.backend.put_bytes(file_bytes, filename, content_type)
+
     async def upload_video(self, file_bytes: bytes, filename: str) -> str:
         """Upload a video file."""
         content_type = "video/mp4"
@@ -68,17 +420,17 @@ class StorageClient:
             content_type = "video/quicktime"
         elif filename.endswith(".webm"):
             content_type = "video/webm"
-        
+
         return await self.upload_file(file_bytes, filename, content_type)
-    
+
     async def upload_audio(self, file_bytes: bytes, filename: str) -> str:
         """Upload an audio file."""
         content_type = "audio/mpeg"
         if filename.endswith(".wav"):
             content_type = "audio/wav"
-        
+
         return await self.upload_file(file_bytes, filename, content_type)
-    
+
     async def upload_image(self, file_bytes: bytes, filename: str) -> str:
         """Upload an image file."""
         content_type = "image/jpeg"
@@ -88,47 +440,89 @@ class StorageClient:
             content_type = "image/gif"
         elif filename.endswith(".webp"):
             content_type = "image/webp"
-        
+
         return await self.upload_file(file_bytes, filename, content_type)
-    
+
     async def upload_from_path(self, file_path: str) -> str:
         """
-        Upload a file from disk.
-        
+        Upload a file from disk, streaming it rather than reading it into memory.
+
         Args:
             file_path: Path to file on disk
-            
+
         Returns:
             Public URL of the uploaded file
         """
+        if not self.backend.is_available():
+            raise RuntimeError("Storage backend not configured")
         path = Path(file_path)
-        
-        with open(path, 'rb') as f:
-            file_bytes = f.read()
-        
-        # Determine content type from extension
-        ext = path.suffix.lower()
-        content_types = {
-            '.mp4': 'video/mp4',
-            '.mov': 'video/quicktime',
-            '.webm': 'video/webm',
-            '.mp3': 'audio/mpeg',
-            '.wav': 'audio/wav',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-        }
-        
-        content_type = content_types.get(ext, 'application/octet-stream')
-        
-        return await self.upload_file(file_bytes, path.name, content_type)
-    
+        return await self.backend.put_path(path, content_type_for(path.name))
+
+    async def upload_many(self, file_paths: list[str]) -> list[str]:
+        """
+        Upload several files concurrently.
+
+        Args:
+            file_paths: Paths to files on disk
+
+        Returns:
+            Public URLs, in the same order as file_paths
+        """
+        return list(await asyncio.gather(*(self.upload_from_path(p) for p in file_paths)))
+
     def is_available(self) -> bool:
         """Check if storage is configured."""
-        return bool(self.token) or settings.MOCK_MODE
+        return self.backend.is_available()
+
+    def is_public(self) -> bool:
+        """Check if stored files can be fetched by external services (fal.ai)."""
+        return self.backend.is_available() and self.backend.is_public()
+
+
+def is_public_url(url: str) -> bool:
+    """
+    Whether a URL's host is reachable from the internet: not localhost, a
+    .local/.internal name, or a loopback, private or link-local address.
+    """
+    host = (urlparse(url).hostname or "").lower()
+    if not host:
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host != "localhost" and not host.endswith((".localhost", ".local", ".internal"))
+    return address.is_global
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    """Stream a file from disk in CHUNK_SIZE pieces."""
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            chunk = await f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def create_storage_backend() -> StorageBackend:
+    """
+    Create the backend selected by STORAGE_BACKEND.
+
+    "auto" uses Vercel Blob, which is unavailable without VERCEL_BLOB_TOKEN
+    (outputs then stay in scratch as file:// URLs). The local store is only
+    used when asked for explicitly.
+    """
+    backend = settings.STORAGE_BACKEND
+    if backend in ("auto", "vercel"):
+        return VercelBlobBackend(token=settings.VERCEL_BLOB_TOKEN, base_url=settings.BLOB_BASE_URL)
+    if backend == "local":
+        return LocalStorageBackend(
+            root=settings.LOCAL_STORAGE_DIR,
+            public_base_url=settings.PUBLIC_BASE_URL,
+            max_bytes=settings.LOCAL_STORAGE_MAX_MB * 1024 * 1024
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
 
 
 # Singleton instance
-storage_client = StorageClient()
+storage_client = StorageClient(create_storage_backend())
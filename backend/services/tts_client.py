@@ -1,13 +1,28 @@
 """
 ragebAIt - Text-to-Speech Client
 Handles voice synthesis using fal.ai's minimax/speech-02-hd for ragebait style.
+
+Every synthesized line is cached on disk, keyed on its normalized text, the
+voice settings and the model, so regenerating or retrying a commentary only
+pays for the lines that changed.
+
+Synthesis is fully async: fal.ai is called with run_async and the audio is
+streamed to disk over one pooled httpx client (opened on startup, closed on
+shutdown). Each line gets TTS_TIMEOUT_SECONDS per attempt and up to
+TTS_RETRIES retries with backoff; cancelling a job cancels its requests.
 """
 
+import asyncio
 import os
-import requests
+import re
+import unicodedata
+import uuid
 from pathlib import Path
 from typing import Optional
 
+import aiofiles
+import httpx
+
 # Clean FAL_KEY environment variable BEFORE importing fal_client
 # (fal_client reads it directly from env)
 if os.getenv("FAL_KEY"):
@@ -16,6 +31,14 @@ if os.getenv("FAL_KEY"):
 import fal_client
 from backend.config import settings
 from backend.models.schemas import CommentarySegment, LensType
+from backend.services.executors import run_blocking
+from backend.services.result_cache import DiskCache, make_key
+
+
+# Cache namespace for single synthesized lines
+SPEECH = "speech"
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 class TTSClient:
@@ -25,92 +48,189 @@ class TTSClient:
         self.fal_key = os.getenv("FAL_KEY", "").strip()  # Strip whitespace/newlines
         self._available = bool(self.fal_key)
         
+        self.cache = DiskCache(
+            root=settings.TTS_CACHE_DIR,
+            max_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024,
+            enabled=settings.TTS_CACHE_ENABLED
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        
         if self._available:
             print("[TTS] fal.ai TTS client initialized")
         else:
             print("[TTS] Warning: FAL_KEY not set. TTS features disabled.")
     
-    async def synthesize_commentary(
+    async def start(self):
+        """Open the pooled HTTP client used for audio downloads."""
+        if self._client is None:
+            self._client = self._new_client()
+    
+    async def close(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client (opened lazily for scripts that skip startup)."""
+        if self._client is None:
+            self._client = self._new_client()
+        return self._client
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.TTS_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.TTS_MAX_CONCURRENCY * 2,
+                max_keepalive_connections=settings.TTS_MAX_CONCURRENCY * 2,
+                keepalive_expiry=60.0
+            )
+        )
+    
+    async def synthesize_segments(
         self,
         segments: list[CommentarySegment],
         lens: LensType,
-        output_path: Optional[str] = None
-    ) -> str:
+        output_paths: Optional[list[str]] = None
+    ) -> list[Optional[str]]:
         """
-        Synthesize full commentary to audio file using fal.ai.
+        Synthesize each commentary segment to its own audio file using fal.ai.
+        
+        Segments are synthesized concurrently (at most TTS_MAX_CONCURRENCY
+        requests at once), and a line repeated within the commentary is only
+        synthesized once. Lines already in the TTS cache are not synthesized
+        at all, and segments with no text are skipped. Place the results on
+        the clip's timeline with VideoProcessor.place_commentary.
         
         Uses ragebait style: angry emotion, fast speed (1.2x) for TikTok feel.
         
         Args:
             segments: List of commentary segments
             lens: Lens type (used for voice selection)
-            output_path: Output file path (optional)
+            output_paths: One output MP3 path per segment (optional)
             
         Returns:
-            Path to output MP3 file
+            Path to each segment's MP3 file (None for a segment with no
+            text), in segment order
         """
         if not self._available:
             raise RuntimeError("TTS client not initialized - FAL_KEY not set")
         
-        if output_path is None:
-            output_path = str(settings.TEMP_DIR / "commentary.mp3")
-        
-        # Combine all segments into one text
-        full_text = self._build_full_script(segments)
+        if output_paths is None:
+            batch = uuid.uuid4().hex[:12]
+            output_paths = [str(settings.TEMP_DIR / f"commentary_{batch}_{i}.mp3") for i in range(len(segments))]
         
         # Get voice settings based on lens
         voice_settings = self._get_voice_settings(lens)
         
         print(f"[TTS] Synthesizing {len(segments)} segments with fal.ai (ragebait style)")
         print(f"[TTS] Voice: {voice_settings['voice_id']}, Speed: {voice_settings['speed']}, Emotion: {voice_settings['emotion']}")
-        print(f"[TTS] Text: {full_text[:100]}...")
+        
+        limit = asyncio.Semaphore(settings.TTS_MAX_CONCURRENCY)
+        
+        async def synthesize(text: str, output_path: str) -> str:
+            async with limit:
+                return await self._synthesize_line(text, voice_settings, output_path)
+        
+        hits_before = self.cache.hits[SPEECH]
+        jobs: dict[str, asyncio.Task] = {}
+        for segment, output_path in zip(segments, output_paths):
+            text = normalize_text(segment.text)
+            if text and text not in jobs:
+                jobs[text] = asyncio.ensure_future(synthesize(text, output_path))
         
         try:
-            # Use fal_client.run for synchronous execution (simpler and more reliable)
-            result = fal_client.run(
-                "fal-ai/minimax/speech-02-hd",
-                arguments={
-                    "text": full_text,
-                    "voice_setting": voice_settings
-                }
-            )
-            
-            if result and "audio" in result:
-                audio_url = result["audio"]["url"]
-                print(f"[TTS] Generated audio URL: {audio_url}")
-                
-                # Download the audio file
-                response = requests.get(audio_url)
-                response.raise_for_status()
-                
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
-                
-                print(f"[TTS] Audio saved to {output_path}")
-                return output_path
-            else:
-                raise RuntimeError(f"fal.ai TTS failed: {result}")
-                
+            await asyncio.gather(*jobs.values())
         except Exception as e:
             print(f"[TTS] Error generating audio: {e}")
+            for job in jobs.values():
+                job.cancel()
             raise
-    
-    def _build_full_script(self, segments: list[CommentarySegment]) -> str:
-        """Build full script from segments with natural pauses."""
-        parts = []
         
-        for i, segment in enumerate(segments):
-            # Clean text
-            text = segment.text.strip()
-            
-            # Add the segment text
-            parts.append(text)
-            
-            # Add pause between segments (represented by ellipsis for natural speech)
-            if i < len(segments) - 1:
-                parts.append("...")
+        stats = self.cache_stats()
+        print(f"[TTS] {self.cache.hits[SPEECH] - hits_before}/{len(jobs)} lines from cache "
+              f"(lifetime: {stats['hits']} hits, {stats['misses']} misses)")
+        return [
+            jobs[text].result() if (text := normalize_text(segment.text)) else None
+            for segment in segments
+        ]
+
+    async def _synthesize_line(self, text: str, voice_settings: dict, output_path: str) -> str:
+        """Synthesize one line to output_path (or reuse a cached one), retrying transient failures."""
+        key = self._cache_key(text, voice_settings)
+        if await run_blocking(self.cache.get_file, SPEECH, key, output_path, ".mp3"):
+            print(f"[TTS] Reusing cached audio for: {text[:100]}")
+            return output_path
+        
+        print(f"[TTS] Text: {text[:100]}")
+        for attempt in range(settings.TTS_RETRIES + 1):
+            try:
+                result = await asyncio.wait_for(
+                    fal_client.run_async(
+                        settings.TTS_MODEL,
+                        arguments={
+                            "text": text,
+                            "voice_setting": voice_settings
+                        }
+                    ),
+                    settings.TTS_TIMEOUT_SECONDS
+                )
+                if not result or "audio" not in result:
+                    raise RuntimeError(f"fal.ai TTS failed: {result}")
+                
+                audio_url = result["audio"]["url"]
+                print(f"[TTS] Generated audio URL: {audio_url}")
+                await self._download(audio_url, output_path)
+                break
+            except Exception as e:
+                if attempt == settings.TTS_RETRIES:
+                    raise
+                delay = settings.TTS_RETRY_BACKOFF_SECONDS * 2 ** attempt
+                print(f"[TTS] Attempt {attempt + 1} failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
         
-        return " ".join(parts)
+        print(f"[TTS] Audio saved to {output_path}")
+        await run_blocking(self.cache.put_file, SPEECH, key, output_path, ".mp3")
+        return output_path
+    
+    async def _download(self, url: str, output_path: str):
+        """Stream a file to output_path; a failed or cancelled download leaves nothing behind."""
+        tmp_path = f"{output_path}.part"
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                async with aiofiles.open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    
+    def line_keys(self, segments: list[CommentarySegment], lens: LensType) -> list[str]:
+        """
+        One key per segment for everything that changes its synthesized audio
+        (normalized text, voice settings and TTS model), in segment order.
+        """
+        voice_settings = self._get_voice_settings(lens)
+        return [self._cache_key(normalize_text(s.text), voice_settings) for s in segments]
+    
+    def _cache_key(self, text: str, voice_settings: dict) -> str:
+        """Everything that changes the synthesized audio of a line."""
+        return make_key(
+            text,
+            voice_settings["voice_id"],
+            voice_settings["speed"],
+            voice_settings["emotion"],
+            voice_settings["pitch"],
+            voice_settings["vol"],
+            settings.TTS_MODEL
+        )
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the TTS cache."""
+        return self.cache.stats().get(SPEECH, {"hits": 0, "misses": 0})
     
     def _get_voice_settings(self, lens: LensType) -> dict:
         """
@@ -177,5 +297,10 @@ class TTSClient:
         return self._available
 
 
+def normalize_text(text: str) -> str:
+    """Canonical form of a line for synthesis and cache keys (Unicode NFKC, single spaces)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
 # Singleton instance
 tts_client = TTSClient()
@@ -4,13 +4,52 @@ Handles frame extraction, video/audio merging, clip extraction, and video manipu
 """
 
 import cv2
-import base64
-import tempfile
+import numpy as np
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
 
 from backend.config import settings
+from backend.services import activity, shots
+from backend.services.ffmpeg_tools import (
+    FFmpegTimeout, MediaInfo, probe_duration, probe_media, read_ffmpeg_output, run_ffmpeg
+)
+from backend.services.frame_store import FrameSet
+from backend.services.shots import ShotIndex
+
+
+# Codecs whose packets can be stream-copied into an MP4 clip
+STREAM_COPY_CODECS = {"h264"}
+
+# x264 profiles the head of a smart cut can be encoded with
+X264_PROFILES = {"baseline", "main", "high"}
+
+# A cut within this many seconds of a keyframe counts as on the keyframe
+KEYFRAME_TOLERANCE = 0.05
+
+# Below this much copyable tail, a smart cut is not worth the extra passes
+MIN_COPY_SECONDS = 1.0
+
+# Sidechain ducking of the original audio while commentary plays
+DUCK_THRESHOLD = 0.03
+DUCK_RATIO = 6
+DUCK_ATTACK_MS = 20
+DUCK_RELEASE_MS = 400
+
+# Commentary lines longer than their slot are sped up by at most this much,
+# then cut with a short fade
+COMMENTARY_MAX_TEMPO = 1.3
+COMMENTARY_FADE_SECONDS = 0.05
+
+
+@dataclass
+class AudioMix:
+    """Commentary audio to mix into a clip while cutting it."""
+    path: str
+    keep_original_audio: bool = True
+    original_audio_volume: float = 0.2
+    duck: bool = True
 
 
 class VideoProcessor:
@@ -29,6 +68,12 @@ class VideoProcessor:
         """
         Extract a clip from a video between start_time and end_time.
         
+        Avoids a full re-encode where possible:
+        - start on a keyframe: stream-copy the whole range
+        - start mid-GOP (smart cut): re-encode only up to the next keyframe,
+          stream-copy the rest and join the two losslessly
+        - otherwise (no keyframe inside the range, non-H.264 source): re-encode
+        
         Args:
             video_path: Path to source video
             start_time: Start time in seconds
@@ -42,100 +87,364 @@ class VideoProcessor:
             output_path = str(self.temp_dir / f"clip_{start_time:.0f}_{end_time:.0f}.mp4")
         
         print(f"[Video] Extracting clip: {start_time:.1f}s - {end_time:.1f}s")
+        mode = self._cut(video_path, start_time, end_time, output_path)
+        print(f"[Video] Clip saved to {output_path} (mode: {mode})")
+        return output_path
+    
+    def render(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        audio_path: str,
+        output_path: Optional[str] = None,
+        keep_original_audio: bool = True,
+        original_audio_volume: float = 0.2,
+        duck: bool = True
+    ) -> str:
+        """
+        Cut a clip from the source and mix commentary audio into it in one pass.
         
-        # Load video
-        video = VideoFileClip(video_path)
+        Replaces extract_clip + merge_audio_video (two full H.264 encodes).
+        The video is cut exactly like extract_clip - stream copy, smart cut or
+        a single encode - and only the audio is mixed and re-encoded:
+        original audio at original_audio_volume, optionally ducked further
+        under the commentary, with the commentary on top.
+        
+        Args:
+            video_path: Path to source video
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            audio_path: Commentary audio (MP3 or WAV), starting at start_time
+            output_path: Output path (optional, generates temp file if not provided)
+            keep_original_audio: Whether to keep original video audio
+            original_audio_volume: Volume of original audio (0-1)
+            duck: Duck the original audio while commentary plays
+            
+        Returns:
+            Path to output video file
+        """
+        if output_path is None:
+            output_path = str(self.temp_dir / f"render_{Path(video_path).stem}_{start_time:.0f}_{end_time:.0f}.mp4")
+        
+        print(f"[Video] Rendering clip with commentary: {start_time:.1f}s - {end_time:.1f}s")
+        mix = AudioMix(
+            path=audio_path,
+            keep_original_audio=keep_original_audio,
+            original_audio_volume=original_audio_volume,
+            duck=duck
+        )
+        mode = self._cut(video_path, start_time, end_time, output_path, mix)
+        print(f"[Video] Render saved to {output_path} (mode: {mode})")
+        return output_path
+    
+    def _cut(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        output_path: str,
+        mix: Optional[AudioMix] = None
+    ) -> str:
+        """Cut [start_time, end_time) with the cheapest mode; returns the mode used."""
+        info = probe_media(video_path)
         
         # Ensure times are within bounds
         start_time = max(0, start_time)
-        end_time = min(video.duration, end_time)
+        if info.duration > 0:
+            end_time = min(info.duration, end_time)
+        
+        mode = self._plan_cut(info, start_time, end_time)
+        try:
+            if mode == "copy":
+                keyframe = max(k for k in info.keyframes if k <= start_time + KEYFRAME_TOLERANCE)
+                self._copy_range(video_path, keyframe, end_time, output_path, info, mix)
+            elif mode == "smart":
+                self._smart_cut(video_path, start_time, end_time, output_path, info, mix)
+            else:
+                self._encode_range(video_path, start_time, end_time, output_path, info, mix)
+        except FFmpegTimeout:
+            raise
+        except RuntimeError as e:
+            if mode == "encode":
+                raise
+            print(f"[Video] Warning: {mode} cut failed, re-encoding instead: {e}")
+            mode = "encode"
+            self._encode_range(video_path, start_time, end_time, output_path, info, mix)
+        return mode
+    
+    def _plan_cut(self, info: MediaInfo, start_time: float, end_time: float) -> str:
+        """Pick the cheapest cut mode for a range: 'copy', 'smart' or 'encode'."""
+        if info.video_codec not in STREAM_COPY_CODECS or not info.keyframes:
+            return "encode"
         
-        # Extract subclip
-        clip = video.subclip(start_time, end_time)
+        if any(abs(k - start_time) <= KEYFRAME_TOLERANCE for k in info.keyframes):
+            return "copy"
         
-        # Write clip
-        clip.write_videofile(
-            output_path,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile=str(self.temp_dir / 'temp_clip_audio.m4a'),
-            remove_temp=True,
-            verbose=False,
-            logger=None
-        )
+        if not settings.SMART_CUT_ENABLED:
+            return "encode"
         
-        # Cleanup
-        clip.close()
-        video.close()
+        next_keyframe = next((k for k in info.keyframes if k > start_time), None)
+        if next_keyframe is None or next_keyframe >= end_time - MIN_COPY_SECONDS:
+            return "encode"
+        return "smart"
+    
+    def _copy_range(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        output_path: str,
+        info: MediaInfo,
+        mix: Optional[AudioMix] = None
+    ):
+        """Stream-copy [start_time, end_time); start_time must be a keyframe."""
+        if mix is None:
+            audio_inputs = []
+            audio_args = ["-map", "0:a:0?"]
+            audio_args += ["-c:a", "copy"] if info.audio_codec == "aac" else ["-c:a", "aac"]
+        else:
+            audio_inputs = ["-i", mix.path]
+            audio_args = self._mix_args(mix, info, source_input=0, commentary_input=1)
+        run_ffmpeg([
+            "-ss", f"{start_time:.3f}", "-i", video_path,
+            *audio_inputs,
+            "-t", f"{end_time - start_time:.3f}",
+            "-map", "0:v:0", *audio_args,
+            "-c:v", "copy",
+            "-avoid_negative_ts", "make_zero",
+            "-movflags", "+faststart",
+            output_path
+        ])
+    
+    def _encode_range(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        output_path: str,
+        info: MediaInfo,
+        mix: Optional[AudioMix] = None
+    ):
+        """Re-encode [start_time, end_time) with libx264/AAC."""
+        if mix is None:
+            audio_inputs = []
+            audio_args = ["-map", "0:a:0?", "-c:a", "aac"]
+        else:
+            audio_inputs = ["-i", mix.path]
+            audio_args = self._mix_args(mix, info, source_input=0, commentary_input=1)
+        run_ffmpeg([
+            "-ss", f"{start_time:.3f}", "-i", video_path,
+            *audio_inputs,
+            "-t", f"{end_time - start_time:.3f}",
+            "-map", "0:v:0", *audio_args,
+            *self._x264_args(),
+            "-movflags", "+faststart",
+            output_path
+        ])
+    
+    def _smart_cut(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float,
+        output_path: str,
+        info: MediaInfo,
+        mix: Optional[AudioMix] = None
+    ):
+        """
+        Re-encode the partial GOP at the head of the clip and copy the rest.
         
-        print(f"[Video] Clip saved to {output_path}")
-        return output_path
+        The head is encoded with the source's pixel format and profile so the
+        two video pieces can be concatenated without another encode. Audio is
+        cheap, so it is encoded once over the whole range to avoid seams
+        (mixed with the commentary when mix is given).
+        """
+        next_keyframe = next(k for k in info.keyframes if k > start_time)
+        base = Path(output_path)
+        head_path = base.with_name(f"{base.stem}.head.mp4")
+        tail_path = base.with_name(f"{base.stem}.tail.mp4")
+        list_path = base.with_name(f"{base.stem}.concat.txt")
+        
+        head_args = self._x264_args()
+        if info.pix_fmt:
+            head_args += ["-pix_fmt", info.pix_fmt]
+        if info.video_profile and info.video_profile.lower() in X264_PROFILES:
+            head_args += ["-profile:v", info.video_profile.lower()]
+        
+        try:
+            run_ffmpeg([
+                "-ss", f"{start_time:.3f}", "-i", video_path,
+                "-t", f"{next_keyframe - start_time:.3f}",
+                "-map", "0:v:0", "-an", *head_args,
+                str(head_path)
+            ])
+            run_ffmpeg([
+                "-ss", f"{next_keyframe:.3f}", "-i", video_path,
+                "-t", f"{end_time - next_keyframe:.3f}",
+                "-map", "0:v:0", "-an", "-c:v", "copy",
+                "-avoid_negative_ts", "make_zero",
+                str(tail_path)
+            ])
+            list_path.write_text(f"file '{head_path}'\nfile '{tail_path}'\n")
+            if mix is None:
+                audio_inputs = []
+                audio_args = ["-map", "1:a:0?", "-c:a", "aac"]
+            else:
+                audio_inputs = ["-i", mix.path]
+                audio_args = self._mix_args(mix, info, source_input=1, commentary_input=2)
+            run_ffmpeg([
+                "-f", "concat", "-safe", "0", "-i", str(list_path),
+                "-ss", f"{start_time:.3f}", "-t", f"{end_time - start_time:.3f}", "-i", video_path,
+                *audio_inputs,
+                "-map", "0:v:0", *audio_args,
+                "-c:v", "copy",
+                "-shortest", "-movflags", "+faststart",
+                output_path
+            ])
+        finally:
+            for path in (head_path, tail_path, list_path):
+                path.unlink(missing_ok=True)
+    
+    def _mix_args(
+        self,
+        mix: AudioMix,
+        info: MediaInfo,
+        source_input: int,
+        commentary_input: int
+    ) -> list[str]:
+        """
+        ffmpeg arguments mapping and encoding the mixed audio track.
+        
+        The original audio is scaled to original_audio_volume and, with
+        duck=True, compressed further by a sidechain keyed on the commentary.
+        amix halves each input, so the sum is scaled back up by 2.
+        """
+        if not (mix.keep_original_audio and info.has_audio):
+            return ["-map", f"{commentary_input}:a:0", "-c:a", "aac"]
+        
+        chains = [f"[{source_input}:a:0]volume={mix.original_audio_volume}[orig]"]
+        if mix.duck:
+            chains.append(f"[{commentary_input}:a:0]asplit=2[comm][key]")
+            chains.append(
+                f"[orig][key]sidechaincompress=threshold={DUCK_THRESHOLD}:ratio={DUCK_RATIO}"
+                f":attack={DUCK_ATTACK_MS}:release={DUCK_RELEASE_MS}[bed]"
+            )
+        else:
+            chains.append(f"[{commentary_input}:a:0]anull[comm]")
+            chains.append("[orig]anull[bed]")
+        chains.append("[bed][comm]amix=inputs=2:duration=first:dropout_transition=0,volume=2[aout]")
+        return ["-filter_complex", ";".join(chains), "-map", "[aout]", "-c:a", "aac"]
+    
+    def _x264_args(self) -> list[str]:
+        """Common libx264 encoder arguments."""
+        return [
+            "-c:v", "libx264",
+            "-preset", settings.VIDEO_ENCODER_PRESET,
+            "-crf", str(settings.VIDEO_ENCODER_CRF),
+        ]
     
     def extract_frames(
         self, 
         video_path: str, 
         fps: float = 1.0,
-        max_frames: int = 30
-    ) -> list[dict]:
+        max_frames: int = 30,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        max_width: Optional[int] = None
+    ) -> FrameSet:
         """
         Extract frames from video at specified FPS.
         
+        Only sampled frames are decoded and converted: skipped frames are
+        grab()bed (demux + decode, no colour conversion), and when the sampling
+        interval is longer than a GOP the reader seeks straight to each target
+        instead. Passing start_time/end_time samples a window of the original
+        input, so a freshly cut clip never has to be reopened.
+        
         Args:
             video_path: Path to video file
             fps: Frames per second to extract (default 1)
             max_frames: Maximum number of frames to extract
+            start_time: Window start in seconds (timestamps are relative to it)
+            end_time: Window end in seconds (default: end of video)
+            max_width: Downscale frames wider than this before JPEG encoding
             
         Returns:
-            List of dicts with 'timestamp' and 'image_base64' keys
+            FrameSet of JPEG frames (timestamps relative to start_time)
         """
-        frames = []
+        frames = FrameSet()
         cap = cv2.VideoCapture(video_path)
         
         if not cap.isOpened():
             raise ValueError(f"Could not open video: {video_path}")
         
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / video_fps if video_fps > 0 else 0
         
-        # Calculate frame interval
-        frame_interval = int(video_fps / fps) if fps > 0 else int(video_fps)
-        
-        frame_count = 0
-        extracted_count = 0
-        
-        while cap.isOpened() and extracted_count < max_frames:
+        # Calculate frame interval and the frames to sample
+        frame_interval = max(1, int(round(video_fps / fps))) if fps > 0 else max(1, int(video_fps))
+        start_frame = max(0, int(round(start_time * video_fps)))
+        end_frame = total_frames
+        if end_time is not None:
+            end_frame = min(total_frames, int(round(end_time * video_fps)))
+        targets = list(range(start_frame, end_frame, frame_interval))[:max_frames]
+        
+        use_seek = frame_interval > self._mean_gop_frames(video_path, video_fps)
+        position = 0
+        if targets and not use_seek and targets[0] > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, targets[0])
+            position = targets[0]
+        
+        for target in targets:
+            if use_seek:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                position = target
+            else:
+                while position < target and cap.grab():
+                    position += 1
+                if position < target:
+                    break
+            
             ret, frame = cap.read()
             if not ret:
                 break
-                
-            if frame_count % frame_interval == 0:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Encode to JPEG
-                _, buffer = cv2.imencode('.jpg', frame_rgb, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                image_base64 = base64.b64encode(buffer).decode('utf-8')
-                
-                timestamp = frame_count / video_fps
-                
-                frames.append({
-                    'timestamp': round(timestamp, 2),
-                    'image_base64': image_base64,
-                    'frame_index': frame_count
-                })
-                extracted_count += 1
+            position += 1
             
-            frame_count += 1
+            frames.append(
+                timestamp=round((target - start_frame) / video_fps, 2),
+                frame_index=target - start_frame,
+                jpeg=self._encode_jpeg(frame, quality=85, max_width=max_width)
+            )
         
         cap.release()
         return frames
     
+    def _mean_gop_frames(self, video_path: str, video_fps: float) -> float:
+        """Average keyframe distance in frames (inf if unknown, so we never seek)."""
+        try:
+            keyframes = probe_media(video_path).keyframes
+        except (OSError, RuntimeError):
+            return float("inf")
+        if len(keyframes) < 2:
+            return float("inf")
+        return (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1) * video_fps
+    
+    def _encode_jpeg(self, frame, quality: int = 85, max_width: Optional[int] = None) -> bytes:
+        """JPEG-encode an OpenCV (BGR) frame, downscaling it first if requested."""
+        if max_width and frame.shape[1] > max_width:
+            height = int(frame.shape[0] * max_width / frame.shape[1])
+            frame = cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+        
+        # imencode expects BGR, which is what VideoCapture returns
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer.tobytes()
+    
     def extract_frame_at_timestamp(
         self, 
         video_path: str, 
         timestamp: float
-    ) -> Optional[str]:
+    ) -> Optional[bytes]:
         """
         Extract a single frame at a specific timestamp.
         
@@ -144,7 +453,7 @@ class VideoProcessor:
             timestamp: Time in seconds
             
         Returns:
-            Base64 encoded JPEG image
+            JPEG image bytes
         """
         cap = cv2.VideoCapture(video_path)
         
@@ -161,10 +470,226 @@ class VideoProcessor:
         if not ret:
             return None
         
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        _, buffer = cv2.imencode('.jpg', frame_rgb, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        return self._encode_jpeg(frame, quality=90)
+    
+    def find_candidate_windows(
+        self,
+        video_path: str,
+        window_seconds: int,
+        max_windows: int,
+        max_total_seconds: int
+    ) -> list[tuple[float, float]]:
+        """
+        Propose the most active windows of a long video from local signals.
+        
+        Motion, shot cuts and loudness spikes (see services/activity.py) are
+        scored per second and the highest-scoring windows win, so only those
+        have to be shown to the model.
+        
+        Args:
+            video_path: Path to video file
+            window_seconds: Length of each window
+            max_windows: Maximum number of windows
+            max_total_seconds: Cap on the combined length of all windows
+            
+        Returns:
+            (start, end) windows in seconds, in time order
+        """
+        profile = self.analyze_activity(video_path)
+        return activity.propose_windows(profile.score(), window_seconds, max_windows, max_total_seconds)
+    
+    def build_shot_index(self, video_path: str) -> ShotIndex:
+        """
+        Find the shot cuts and keyframes of a video.
+        
+        Cuts come from grayscale-histogram jumps between tiny frames decoded
+        at SHOT_FPS; keyframes come from the (cached) probe.
+        """
+        info = probe_media(video_path)
+        frames = self._decode_gray(video_path, shots.SHOT_FPS)
+        cuts = np.flatnonzero(activity.detect_cuts(frames)) / shots.SHOT_FPS
+        return ShotIndex(
+            cuts=[round(float(t), 3) for t in cuts],
+            keyframes=list(info.keyframes),
+            duration=info.duration
+        )
+    
+    def analyze_activity(self, video_path: str) -> activity.ActivityProfile:
+        """
+        Compute per-second activity signals for a video.
+        
+        ffmpeg decodes straight into memory: tiny grayscale frames at
+        ANALYSIS_FPS and 8 kHz mono audio, so even a long input is a few MB.
+        """
+        info = probe_media(video_path)
+        frames = self._decode_gray(video_path, activity.ANALYSIS_FPS)
+        
+        samples = None
+        if info.has_audio:
+            raw = read_ffmpeg_output([
+                "-i", video_path, "-map", "0:a:0", "-vn",
+                "-ac", "1", "-ar", str(activity.AUDIO_RATE),
+                "-f", "s16le", "-"
+            ])
+            samples = np.frombuffer(raw, dtype="<i2")
+        
+        return activity.compute_profile(frames, samples, info.duration)
+    
+    def _decode_gray(self, video_path: str, fps: float) -> np.ndarray:
+        """Decode tiny grayscale frames at fps into a (n, height, width) array."""
+        width, height = activity.ANALYSIS_WIDTH, activity.ANALYSIS_HEIGHT
+        raw = read_ffmpeg_output([
+            "-i", video_path, "-map", "0:v:0", "-an",
+            "-vf", f"fps={fps},scale={width}:{height},format=gray",
+            "-f", "rawvideo", "-"
+        ])
+        frame_size = width * height
+        frames = np.frombuffer(raw, dtype=np.uint8)
+        return frames[:len(frames) // frame_size * frame_size].reshape(-1, height, width)
+    
+    def build_reel(self, video_path: str, windows: list[tuple[float, float]], output_path: str) -> str:
+        """
+        Join windows of a video into one short reel for the model to watch.
+        
+        Every window is its own input-seeked input, so only the excerpts are
+        decoded. The reel is encoded at proxy size (see make_proxy) since no
+        viewer ever sees it.
+        
+        Returns:
+            Path to the reel
+        """
+        info = probe_media(video_path)
+        inputs = []
+        streams = ""
+        for i, (start, end) in enumerate(windows):
+            inputs += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", video_path]
+            streams += f"[{i}:v:0]" + (f"[{i}:a:0]" if info.has_audio else "")
+        
+        if info.has_audio:
+            graph = f"{streams}concat=n={len(windows)}:v=1:a=1[joined][a]"
+            audio_args = ["-map", "[a]", *self._proxy_audio_args()]
+        else:
+            graph = f"{streams}concat=n={len(windows)}:v=1:a=0[joined]"
+            audio_args = []
+        graph += f";[joined]{self._proxy_filter()}[v]"
+        
+        run_ffmpeg([
+            *inputs,
+            "-filter_complex", graph,
+            "-map", "[v]", *audio_args,
+            *self._proxy_video_args(),
+            "-movflags", "+faststart",
+            output_path
+        ])
+        return output_path
+    
+    def make_proxy(self, video_path: str, output_path: str) -> str:
+        """
+        Encode a small analysis copy of a video for model uploads.
+        
+        Downscaled to PROXY_HEIGHT, PROXY_FPS frames per second and a capped
+        bitrate, with mono low-bitrate audio. Nothing is trimmed and the fps
+        filter only drops frames, so every timestamp in the proxy is the same
+        timestamp in the original.
+        
+        Returns:
+            Path to the proxy
+        """
+        run_ffmpeg([
+            "-i", video_path,
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-vf", self._proxy_filter(),
+            *self._proxy_video_args(),
+            *self._proxy_audio_args(),
+            "-movflags", "+faststart",
+            output_path
+        ])
+        return output_path
+    
+    def is_proxy_sized(self, video_path: str) -> bool:
+        """Whether a video is already no bigger than a proxy would be."""
+        info = probe_media(video_path)
+        return 0 < info.height <= settings.PROXY_HEIGHT and 0 < info.fps <= settings.PROXY_FPS + 0.5
+    
+    def _proxy_filter(self) -> str:
+        # Never upscale; -2 keeps the width even for libx264
+        return f"fps={settings.PROXY_FPS},scale=-2:'min({settings.PROXY_HEIGHT},ih)'"
+    
+    def _proxy_video_args(self) -> list[str]:
+        bitrate = settings.PROXY_VIDEO_KBPS
+        return [
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "30",
+            "-maxrate", f"{bitrate}k", "-bufsize", f"{bitrate * 2}k",
+            "-pix_fmt", "yuv420p",
+        ]
+    
+    def _proxy_audio_args(self) -> list[str]:
+        return ["-c:a", "aac", "-ac", "1", "-b:a", "48k"]
+    
+    def place_commentary(
+        self,
+        segment_paths: list[str],
+        starts: list[float],
+        duration: float,
+        output_path: str
+    ) -> str:
+        """
+        Build the commentary track for a clip from per-segment audio.
+        
+        Each segment starts at its start time and may run until the next
+        segment starts (or the clip ends). A line longer than that slot is
+        sped up by up to COMMENTARY_MAX_TEMPO and, if it still doesn't fit,
+        faded out at the end of the slot. Segments are delayed into place and
+        mixed onto a silent track as long as the clip.
+        
+        Args:
+            segment_paths: Audio file of each segment
+            starts: Start of each segment (seconds into the clip)
+            duration: Clip duration
+            output_path: Output MP3 path
+            
+        Returns:
+            Path to the commentary track
+        """
+        order = sorted(range(len(starts)), key=lambda i: starts[i])
+        inputs = []
+        chains = []
+        for n, i in enumerate(order):
+            start = min(max(starts[i], 0.0), duration)
+            next_start = starts[order[n + 1]] if n + 1 < len(order) else duration
+            slot = max(min(next_start, duration) - start, 0.1)
+            length = probe_duration(segment_paths[i]) or slot
+            tempo = min(max(length / slot, 1.0), COMMENTARY_MAX_TEMPO)
+            
+            chain = "aformat=sample_rates=44100:channel_layouts=stereo"
+            if tempo > 1.0:
+                chain += f",atempo={tempo:.3f}"
+            if length / tempo > slot:
+                fade_start = max(slot - COMMENTARY_FADE_SECONDS, 0.0)
+                chain += f",atrim=end={slot:.3f},afade=t=out:st={fade_start:.3f}:d={COMMENTARY_FADE_SECONDS}"
+            delay = int(round(start * 1000))
+            chain += f",adelay={delay}|{delay}"
+            
+            inputs += ["-i", segment_paths[i]]
+            chains.append(f"[{n}:a:0]{chain}[s{n}]")
+        
+        # Silent bed so the track always spans the whole clip
+        inputs += ["-f", "lavfi", "-t", f"{duration:.3f}", "-i", "anullsrc=r=44100:cl=stereo"]
+        mixed = "".join(f"[s{n}]" for n in range(len(order)))
+        chains.append(
+            f"[{len(order)}:a:0]{mixed}amix=inputs={len(order) + 1}:duration=first"
+            f":dropout_transition=0:normalize=0[aout]"
+        )
         
-        return base64.b64encode(buffer).decode('utf-8')
+        run_ffmpeg([
+            *inputs,
+            "-filter_complex", ";".join(chains),
+            "-map", "[aout]",
+            "-c:a", "libmp3lame", "-b:a", "192k",
+            output_path
+        ])
+        print(f"[Video] Placed {len(order)} commentary segments on a {duration:.1f}s track")
+        return output_path
     
     def get_video_info(self, video_path: str) -> dict:
         """
@@ -205,6 +730,9 @@ class VideoProcessor:
         """
         Merge audio with video file.
         
+        Re-encodes the whole video through MoviePy; when the clip is still to
+        be cut from a source, render() does both in one pass instead.
+        
         Args:
             video_path: Path to video file
             audio_path: Path to audio file (MP3 or WAV)
@@ -243,7 +771,8 @@ class VideoProcessor:
             output_path,
             codec='libx264',
             audio_codec='aac',
-            temp_audiofile=str(self.temp_dir / 'temp_audio.m4a'),
+            # Next to the output, so concurrent merges never share a temp file
+            temp_audiofile=str(Path(output_path).with_suffix('.temp_audio.m4a')),
             remove_temp=True,
             verbose=False,
             logger=None
@@ -271,6 +800,9 @@ class VideoProcessor:
             
         Returns:
             Path to thumbnail image
+            
+        Raises:
+            RuntimeError: if no frame could be read at the timestamp
         """
         if output_path is None:
             output_path = str(self.temp_dir / f"thumb_{Path(video_path).stem}.jpg")
@@ -287,15 +819,14 @@ class VideoProcessor:
             duration = total_frames / fps
             timestamp = duration * 0.25
         
-        frame_base64 = self.extract_frame_at_timestamp(video_path, timestamp)
+        cap.release()
+        jpeg = self.extract_frame_at_timestamp(video_path, timestamp)
         
-        if frame_base64:
-            # Decode and save
-            img_data = base64.b64decode(frame_base64)
-            with open(output_path, 'wb') as f:
-                f.write(img_data)
+        if not jpeg:
+            raise RuntimeError(f"Could not read a thumbnail frame at {timestamp:.2f}s of {video_path}")
+        with open(output_path, 'wb') as f:
+            f.write(jpeg)
         
-        cap.release()
         return output_path
 
 
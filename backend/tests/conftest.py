@@ -0,0 +1,14 @@
+"""
+ragebAIt - Test Setup
+Pins the settings that select backends, so a developer's backend/.env
+(loaded by config.py, which never overrides the environment) can't point
+the tests at real services.
+"""
+
+import os
+
+os.environ["JOB_STORE_BACKEND"] = "memory"
+os.environ["STORAGE_BACKEND"] = "auto"
+os.environ["VERCEL_BLOB_TOKEN"] = ""
+os.environ["FAL_KEY"] = ""
+os.environ["GEMINI_API_KEY"] = ""
@@ -0,0 +1,72 @@
+"""
+Tests for the activity signals and the reel time map.
+"""
+
+import numpy as np
+import pytest
+
+from backend.services.activity import TimeMap, detect_cuts, propose_windows
+
+
+def test_time_map_lays_excerpts_end_to_end():
+    time_map = TimeMap([(10.0, 20.0), (50.0, 55.0)])
+    assert time_map.duration == 15.0
+    assert time_map.excerpts() == [(0.0, 10.0), (10.0, 15.0)]
+
+
+def test_range_to_source_maps_within_an_excerpt():
+    time_map = TimeMap([(10.0, 20.0), (50.0, 55.0)])
+    assert time_map.range_to_source(2.0, 4.0) == (12.0, 14.0)
+    assert time_map.range_to_source(11.0, 13.0) == (51.0, 53.0)
+
+
+def test_range_to_source_clamps_to_the_excerpt_holding_the_start():
+    time_map = TimeMap([(10.0, 20.0), (50.0, 55.0)])
+    # Spans the jump from 20s to 50s in the source: cut at the end of the first excerpt
+    assert time_map.range_to_source(8.0, 12.0) == (18.0, 20.0)
+    # Past the end of the reel: kept inside the last excerpt
+    assert time_map.range_to_source(14.0, 30.0) == (54.0, 55.0)
+    # Reversed ranges collapse to their start
+    assert time_map.range_to_source(5.0, 3.0) == (15.0, 15.0)
+
+
+def test_range_to_reel():
+    time_map = TimeMap([(10.0, 20.0), (50.0, 55.0)])
+    assert time_map.range_to_reel(12.0, 14.0) == (2.0, 4.0)
+    assert time_map.range_to_reel(50.0, 55.0) == (10.0, 15.0)
+    # Rounding just outside an excerpt is tolerated and clamped
+    assert time_map.range_to_reel(9.995, 20.005) == (0.0, 10.0)
+
+
+@pytest.mark.parametrize("start, end", [(0.0, 5.0), (18.0, 52.0), (30.0, 31.0), (54.0, 60.0)])
+def test_range_to_reel_outside_every_excerpt(start, end):
+    assert TimeMap([(10.0, 20.0), (50.0, 55.0)]).range_to_reel(start, end) is None
+
+
+def test_round_trip_through_the_reel():
+    time_map = TimeMap([(3.0, 9.0), (40.0, 52.0), (70.0, 71.5)])
+    for reel_start, reel_end in [(1.0, 2.5), (7.0, 12.0), (18.5, 19.0)]:
+        source = time_map.range_to_source(reel_start, reel_end)
+        assert time_map.range_to_reel(*source) == pytest.approx((reel_start, reel_end))
+
+
+def test_detect_cuts_flags_histogram_jumps_only():
+    dark = np.full((36, 64), 20, dtype=np.uint8)
+    bright = np.full((36, 64), 230, dtype=np.uint8)
+    # Slight brightness drift within a shot is not a cut
+    drift = np.full((36, 64), 24, dtype=np.uint8)
+    frames = np.stack([dark, drift, dark, bright, bright, dark])
+    assert detect_cuts(frames).tolist() == [False, False, False, True, False, True]
+    assert detect_cuts(frames[:1]).tolist() == [False]
+
+
+def test_propose_windows_picks_the_most_active_spans():
+    scores = np.zeros(120)
+    scores[30:40] = 5.0
+    scores[90:100] = 3.0
+    windows = propose_windows(scores, window_seconds=10, max_windows=2, max_total_seconds=20)
+    assert windows == [(30.0, 40.0), (90.0, 100.0)]
+
+
+def test_propose_windows_keeps_short_videos_whole():
+    assert propose_windows(np.ones(30), window_seconds=10, max_windows=3, max_total_seconds=60) == [(0.0, 30.0)]
@@ -0,0 +1,55 @@
+"""
+Tests for choosing where parody images are uploaded.
+"""
+
+import pytest
+
+from backend.config import settings
+from backend.services import asset_registry as asset_registry_module
+from backend.services.asset_registry import AssetRegistry, from_data_uri, to_data_uri
+from backend.services.storage_client import LocalStorageBackend, StorageClient
+
+
+@pytest.fixture
+def use_storage(tmp_path, monkeypatch):
+    def use(public_base_url: str):
+        client = StorageClient(LocalStorageBackend(tmp_path, public_base_url, max_bytes=1 << 20))
+        monkeypatch.setattr(asset_registry_module, "storage_client", client)
+    return use
+
+
+@pytest.mark.parametrize("asset_store, public_base_url, fal_key, expected", [
+    ("storage", "https://ragebait.example.com", "", "storage"),
+    # fal.ai can't fetch from localhost: its own file store if we have a key
+    ("storage", "http://localhost:8000", "key", "fal"),
+    ("storage", "http://localhost:8000", "", None),
+    ("fal", "https://ragebait.example.com", "key", "fal"),
+    ("fal", "https://ragebait.example.com", "", None),
+    ("inline", "https://ragebait.example.com", "key", None),
+])
+def test_store_choice(use_storage, monkeypatch, asset_store, public_base_url, fal_key, expected):
+    use_storage(public_base_url)
+    monkeypatch.setattr(settings, "ASSET_STORE", asset_store)
+    monkeypatch.setattr(settings, "FAL_KEY", fal_key)
+    assert AssetRegistry()._store() == expected
+
+
+def test_store_choice_is_logged_when_it_changes(use_storage, monkeypatch, capsys):
+    use_storage("http://localhost:8000")
+    monkeypatch.setattr(settings, "ASSET_STORE", "storage")
+    monkeypatch.setattr(settings, "FAL_KEY", "key")
+    registry = AssetRegistry()
+    registry._store()
+    registry._store()
+    assert capsys.readouterr().out.count("[Assets] Using fal") == 1
+
+    monkeypatch.setattr(settings, "FAL_KEY", "")
+    registry._store()
+    assert "[Assets] Using inline data URIs for parody images (FAL_KEY is not set)" in capsys.readouterr().out
+
+
+def test_data_uri_round_trip():
+    uri = to_data_uri(b"\xff\xd8jpeg", "image/jpeg")
+    assert from_data_uri(uri) == (b"\xff\xd8jpeg", "image/jpeg")
+    assert from_data_uri("https://example.com/a.jpg") is None
+    assert from_data_uri("data:image/png,notbase64") is None
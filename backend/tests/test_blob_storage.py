@@ -0,0 +1,155 @@
+"""
+Tests for the Vercel Blob backend, run against the local blob stand-in
+(backend/blob_standin.py) in-process.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend import blob_standin
+from backend.config import settings
+from backend.services.storage_client import VercelBlobBackend
+
+
+BASE_URL = "http://blob.test"
+
+
+class FlakyTransport(httpx.AsyncBaseTransport):
+    """
+    Fails the first `failures` requests (with `status`, or a dropped
+    connection); with `mpu_action`, only requests for that multipart action.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, failures: int, status=None, mpu_action=None):
+        self.inner = inner
+        self.failures = failures
+        self.status = status
+        self.mpu_action = mpu_action
+        self.requests: list[httpx.Request] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        targeted = self.mpu_action is None or request.headers.get("x-mpu-action") == self.mpu_action
+        if targeted and self.failures > 0:
+            self.failures -= 1
+            await request.aread()
+            if self.status is None:
+                raise httpx.ConnectError("connection dropped", request=request)
+            return httpx.Response(self.status, text="stand-in failure", request=request)
+        return await self.inner.handle_async_request(request)
+
+
+@pytest.fixture(autouse=True)
+def standin_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_standin, "BLOB_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(blob_standin, "PARTS_DIR", tmp_path / "blobs" / ".mpu")
+    monkeypatch.setattr(settings, "BLOB_RETRY_BACKOFF_SECONDS", 0.0)
+
+
+def make_backend(failures: int = 0, status=None, mpu_action=None) -> tuple[VercelBlobBackend, FlakyTransport]:
+    transport = FlakyTransport(httpx.ASGITransport(app=blob_standin.app), failures, status, mpu_action)
+    backend = VercelBlobBackend(token="test", base_url=BASE_URL)
+    backend._client = httpx.AsyncClient(transport=transport)
+    return backend, transport
+
+
+async def fetch(backend: VercelBlobBackend, url: str) -> bytes:
+    response = await backend.client.get(url)
+    response.raise_for_status()
+    return response.content
+
+
+def test_put_bytes():
+    backend, transport = make_backend()
+
+    async def run():
+        url = await backend.put_bytes(b"meme", "meme.png", "image/png")
+        return url, await fetch(backend, url)
+
+    url, content = asyncio.run(run())
+    assert url.startswith(f"{BASE_URL}/") and url.endswith("_meme.png")
+    assert content == b"meme"
+    assert transport.requests[0].headers["authorization"] == "Bearer test"
+    assert transport.requests[0].headers["x-content-type"] == "image/png"
+
+
+def test_put_path_streams_single_request(tmp_path):
+    backend, transport = make_backend()
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"v" * 3000)
+
+    async def run():
+        url = await backend.put_path(path, "video/mp4")
+        return await fetch(backend, url)
+
+    assert asyncio.run(run()) == b"v" * 3000
+    assert [r.method for r in transport.requests] == ["PUT", "GET"]
+
+
+def test_put_path_multipart(tmp_path):
+    backend, transport = make_backend()
+    backend.multipart_threshold = 1000
+    backend.part_size = 400
+    path = tmp_path / "clip.mp4"
+    data = bytes(range(256)) * 10
+    path.write_bytes(data)
+
+    async def run():
+        url = await backend.put_path(path, "video/mp4")
+        return await fetch(backend, url)
+
+    assert asyncio.run(run()) == data
+    actions = [r.headers.get("x-mpu-action") for r in transport.requests[:-1]]
+    assert actions[0] == "create" and actions[-1] == "complete"
+    assert actions.count("upload") == 7
+
+
+@pytest.mark.parametrize("status", [None, 503])
+def test_retries_transient_failures(tmp_path, status):
+    backend, transport = make_backend(failures=2, status=status)
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"v" * 3000)
+
+    async def run():
+        url = await backend.put_path(path, "video/mp4")
+        return await fetch(backend, url)
+
+    # The streamed body is re-read from disk for each attempt
+    assert asyncio.run(run()) == b"v" * 3000
+    assert [r.method for r in transport.requests] == ["PUT", "PUT", "PUT", "GET"]
+
+
+def test_multipart_retries_single_parts(tmp_path):
+    backend, transport = make_backend(failures=1, status=502, mpu_action="upload")
+    backend.multipart_threshold = 1000
+    backend.part_size = 400
+    path = tmp_path / "clip.mp4"
+    data = bytes(range(256)) * 10
+    path.write_bytes(data)
+
+    async def run():
+        url = await backend.put_path(path, "video/mp4")
+        return await fetch(backend, url)
+
+    assert asyncio.run(run()) == data
+    actions = [r.headers.get("x-mpu-action") for r in transport.requests[:-1]]
+    # One part is sent twice; the upload itself is not restarted
+    assert actions.count("create") == 1
+    assert actions.count("upload") == 8
+
+
+def test_gives_up_after_retries(monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_RETRIES", 1)
+    backend, transport = make_backend(failures=5, status=503)
+    with pytest.raises(RuntimeError, match="after 2 attempts"):
+        asyncio.run(backend.put_bytes(b"meme", "meme.png", "image/png"))
+    assert len(transport.requests) == 2
+
+
+def test_client_errors_are_not_retried():
+    backend, transport = make_backend(failures=1, status=403)
+    with pytest.raises(RuntimeError, match="403"):
+        asyncio.run(backend.put_bytes(b"meme", "meme.png", "image/png"))
+    assert len(transport.requests) == 1
@@ -0,0 +1,62 @@
+"""
+Tests for commentary on a time window of an uploaded video.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from backend.models.schemas import LensType
+from backend.services.gemini_client import FunnyMoment, GeminiClient
+
+
+class FakeModels:
+    """Stands in for client.aio.models, answering with canned segments."""
+
+    def __init__(self, segments: list[dict]):
+        self.segments = segments
+        self.calls: list[dict] = []
+
+    async def generate_content(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(text=json.dumps(self.segments))
+
+
+def make_client(segments: list[dict]) -> tuple[GeminiClient, FakeModels]:
+    client = GeminiClient()
+    models = FakeModels(segments)
+    client.window_client = SimpleNamespace(aio=SimpleNamespace(models=models))
+
+    async def get_or_upload(path):
+        return SimpleNamespace(uri=f"https://files.example.com/{path}", mime_type="video/mp4")
+
+    client.file_cache.get_or_upload = get_or_upload
+    return client, models
+
+
+def commentate(client: GeminiClient, moment: FunnyMoment):
+    return asyncio.run(client.generate_ragebait_commentary("source.mp4", moment, LensType.NATURE_DOCUMENTARY))
+
+
+def test_sends_the_upload_cut_to_the_moment_window():
+    moment = FunnyMoment(start_time=42.5, end_time=60.0, description="a fumble", humor_score=9, reason="")
+    client, models = make_client([{"start_time": 0.0, "end_time": 3.0, "text": "BRO WAIT-"}])
+    commentate(client, moment)
+
+    video, prompt = models.calls[0]["contents"][0].parts
+    assert video.file_data.file_uri == "https://files.example.com/source.mp4"
+    assert video.video_metadata.start_offset == "42.50s"
+    assert video.video_metadata.end_offset == "60.00s"
+    assert "between 0.0 and 17.5" in prompt.text
+
+
+def test_times_are_clip_relative_and_clamped():
+    # A window near the start of the video: nothing is taken for an absolute time
+    moment = FunnyMoment(start_time=1.0, end_time=11.0, description="", humor_score=5, reason="")
+    client, _ = make_client([
+        {"start_time": 2.0, "end_time": 5.0, "text": "NO WAY"},
+        {"start_time": 8.0, "end_time": 12.5, "text": "LOOK AT THIS"},
+        {"start_time": -1.0, "end_time": 1.0, "text": "early"},
+    ])
+    segments = commentate(client, moment)
+    assert [(s.start_time, s.end_time) for s in segments] == [(2.0, 5.0), (8.0, 10.0), (0.0, 1.0)]
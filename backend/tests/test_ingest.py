@@ -0,0 +1,125 @@
+"""
+Tests for upload ingestion: container sniffing, header durations and
+streaming to disk, and the request size limit.
+"""
+
+import asyncio
+import hashlib
+import io
+import struct
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.ingest import (
+    UploadRejected,
+    probe_header_duration,
+    save_upload,
+    sniff_container,
+)
+
+
+def box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mvhd_v0(timescale: int, duration: int) -> bytes:
+    # version/flags, creation and modification times, then timescale and duration
+    return box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, timescale, duration))
+
+
+def mvhd_v1(timescale: int, duration: int) -> bytes:
+    return box(b"mvhd", b"\x01\x00\x00\x00" + struct.pack(">QQIQ", 0, 0, timescale, duration))
+
+
+FTYP = box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2mp41")
+
+
+@pytest.mark.parametrize("header, container", [
+    (FTYP, "isobmff"),
+    (box(b"moov", b""), "isobmff"),
+    (b"RIFF\x00\x00\x00\x00AVI LIST", "avi"),
+    (b"\x1a\x45\xdf\xa3\x01\x00\x00\x00", "matroska"),
+    (b"RIFF\x00\x00\x00\x00WAVEfmt ", None),
+    (b"<html><body>", None),
+    (b"", None),
+])
+def test_sniff_container(header, container):
+    assert sniff_container(header) == container
+
+
+def test_header_duration_fast_start():
+    header = FTYP + box(b"moov", mvhd_v0(timescale=1000, duration=95_500)) + box(b"mdat", b"\x00" * 16)
+    assert probe_header_duration(header) == pytest.approx(95.5)
+
+
+def test_header_duration_version_1():
+    header = FTYP + box(b"moov", box(b"trak", b"") + mvhd_v1(timescale=600, duration=600 * 42))
+    assert probe_header_duration(header) == pytest.approx(42.0)
+
+
+def test_header_duration_missing_when_moov_is_at_the_end():
+    header = FTYP + struct.pack(">I4s", 1_000_000, b"mdat") + b"\x00" * 64
+    assert probe_header_duration(header) is None
+
+
+def test_header_duration_truncated_moov():
+    moov = box(b"moov", mvhd_v0(timescale=1000, duration=5000))
+    assert probe_header_duration(FTYP + moov[:-6]) is None
+
+
+def upload(data: bytes, filename: str = "clip.mp4") -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+def test_save_upload_hashes_and_sizes(tmp_path):
+    data = FTYP + box(b"mdat", b"\x01" * 5000)
+    dest = tmp_path / "input.mp4"
+    result = asyncio.run(save_upload(upload(data), dest, max_bytes=1 << 20))
+    assert result.size == len(data)
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert result.container == "isobmff"
+    assert dest.read_bytes() == data
+
+
+def test_save_upload_rejects_wrong_container(tmp_path):
+    dest = tmp_path / "input.mp4"
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(save_upload(upload(b"\x1a\x45\xdf\xa3" + b"\x00" * 64), dest))
+    assert rejected.value.status_code == 400
+    assert not dest.exists()
+
+
+def test_save_upload_rejects_too_large(tmp_path):
+    dest = tmp_path / "input.mp4"
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(save_upload(upload(FTYP + box(b"mdat", b"\x00" * 4096)), dest, max_bytes=1024))
+    assert rejected.value.status_code == 413
+    assert not dest.exists()
+
+
+def test_save_upload_rejects_too_long_from_header(tmp_path):
+    data = FTYP + box(b"moov", mvhd_v0(timescale=1, duration=900))
+    dest = tmp_path / "input.mp4"
+    with pytest.raises(UploadRejected) as rejected:
+        asyncio.run(save_upload(upload(data), dest, max_duration=600))
+    assert rejected.value.status_code == 400
+    assert not dest.exists()
+
+
+def test_save_upload_rejects_empty(tmp_path):
+    with pytest.raises(UploadRejected):
+        asyncio.run(save_upload(upload(b""), tmp_path / "input.mp4"))
+
+
+def test_oversized_upload_is_rejected_with_cors_headers():
+    response = TestClient(app).post(
+        "/api/generate",
+        content=b"x",
+        headers={"Origin": "https://app.example.com", "Content-Length": str(10 ** 12)},
+    )
+    assert response.status_code == 413
+    # The browser frontend must see the 413, not a CORS error
+    assert response.headers["access-control-allow-origin"] == "*"
@@ -0,0 +1,52 @@
+"""
+Tests for the job runner's slot handling.
+"""
+
+import asyncio
+
+from backend.services.job_runner import JobRunner
+
+
+def test_job_cancelled_while_queued_never_starts():
+    started = []
+    cancelled = []
+
+    async def work(n: int) -> int:
+        started.append(n)
+        await asyncio.sleep(0.05)
+        return n
+
+    async def run():
+        runner = JobRunner(max_concurrency=1)
+        first = asyncio.create_task(runner.run(lambda: work(1)))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(runner.run(lambda: work(2), lambda: cancelled.append(2)))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        # The slot is still usable afterwards
+        return await first, await runner.run(lambda: work(3))
+
+    assert asyncio.run(run()) == (1, 3)
+    assert started == [1, 3]
+    assert cancelled == [2]
+
+
+def test_background_jobs_share_the_slots():
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run():
+        runner = JobRunner(max_concurrency=2)
+        tasks = [runner.submit(f"job-{n}", work) for n in range(5)]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert peak == 2
@@ -0,0 +1,99 @@
+"""
+Tests for the job store backends.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from backend.services.job_store import MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_entries: int = 100, ttl_seconds: int = 3600):
+        if request.param == "memory":
+            return MemoryJobStore(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        return SQLiteJobStore(tmp_path / "jobs.sqlite3", max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return make
+
+
+def test_set_and_get(make_store):
+    store = make_store()
+    store.set("a", {"status": "queued", "progress": 0.0})
+    assert store.get("a") == {"status": "queued", "progress": 0.0}
+    assert store.get("missing") is None
+
+
+def test_update_merges_fields(make_store):
+    store = make_store()
+    store.set("a", {"status": "queued", "progress": 0.0})
+    record = store.update("a", {"status": "running"})
+    assert record == {"status": "running", "progress": 0.0}
+    assert store.get("a") == record
+
+
+def test_update_creates_missing_record(make_store):
+    store = make_store()
+    assert store.update("new", {"status": "queued"}) == {"status": "queued"}
+    assert store.get("new") == {"status": "queued"}
+
+
+def test_delete(make_store):
+    store = make_store()
+    store.set("a", {"status": "queued"})
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_expired_records_are_gone(make_store):
+    store = make_store(ttl_seconds=0)
+    store.set("a", {"status": "queued"})
+    assert store.get("a") is None
+
+
+def test_evicts_least_recently_written(make_store):
+    store = make_store(max_entries=2)
+    store.set("a", {"n": 1})
+    store.set("b", {"n": 2})
+    store.update("a", {"n": 3})
+    store.set("c", {"n": 4})
+    assert store.get("b") is None
+    assert store.get("a") == {"n": 3}
+    assert store.get("c") == {"n": 4}
+
+
+def test_async_methods(make_store):
+    store = make_store()
+
+    async def run():
+        await store.aset("a", {"status": "queued"})
+        await store.aupdate("a", {"status": "running"})
+        record = await store.aget("a")
+        await store.adelete("a")
+        return record, await store.aget("a")
+
+    assert asyncio.run(run()) == ({"status": "running"}, None)
+
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    first = SQLiteJobStore(tmp_path / "jobs.sqlite3", max_entries=10, ttl_seconds=3600)
+    second = SQLiteJobStore(tmp_path / "jobs.sqlite3", max_entries=10, ttl_seconds=3600)
+    first.set("a", {"status": "queued"})
+    second.update("a", {"status": "running"})
+    assert first.get("a") == {"status": "running"}
+
+
+def test_sqlite_get_does_not_write(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = SQLiteJobStore(path, max_entries=10, ttl_seconds=3600)
+    store.set("a", {"status": "queued"})
+
+    def accessed_at() -> float:
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT accessed_at FROM jobs WHERE key = 'a'").fetchone()[0]
+
+    before = accessed_at()
+    store.get("a")
+    assert accessed_at() == before
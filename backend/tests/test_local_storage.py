@@ -0,0 +1,160 @@
+"""
+Tests for the local storage backend and the /files router that serves it.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routers import files
+from backend.routers.files import _parse_range
+from backend.services.storage_client import LocalStorageBackend, StorageClient, is_public_url, storage_client
+
+
+DATA = bytes(range(256)) * 4  # 1024 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 1023)),
+    ("bytes=-100", (924, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=1024-", None),
+    ("bytes=50-10", None),
+    ("bytes=-0", None),
+    ("bytes=-", None),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, len(DATA)) == expected
+
+
+def test_parse_range_empty_file():
+    assert _parse_range("bytes=0-", 0) is None
+
+
+@pytest.fixture
+def local(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(tmp_path / "storage", "http://testserver", max_bytes=1 << 20)
+    monkeypatch.setattr(storage_client, "backend", backend)
+    return backend
+
+
+@pytest.fixture
+def client(local):
+    app = FastAPI()
+    app.include_router(files.router)
+    return TestClient(app)
+
+
+@pytest.fixture
+def stored(local) -> str:
+    url = asyncio.run(local.put_bytes(DATA, "clip.mp4", "video/mp4"))
+    return url.removeprefix("http://testserver")
+
+
+def test_full_get(client, stored):
+    response = client.get(stored)
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "video/mp4"
+
+
+def test_range_get(client, stored):
+    response = client.get(stored, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == DATA[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+    assert response.headers["content-length"] == "10"
+
+
+def test_unsatisfiable_range(client, stored):
+    response = client.get(stored, headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_malformed_range_is_ignored(client, stored):
+    response = client.get(stored, headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+def test_if_range(client, stored):
+    etag = client.head(stored).headers["etag"]
+    matching = client.get(stored, headers={"Range": "bytes=0-3", "If-Range": etag})
+    assert matching.status_code == 206
+    stale = client.get(stored, headers={"Range": "bytes=0-3", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert stale.content == DATA
+
+
+def test_conditional_get(client, stored):
+    first = client.get(stored)
+    assert client.get(stored, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert client.get(stored, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+
+
+def test_head(client, stored):
+    response = client.head(stored)
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(DATA))
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("name", ["../secret.mp4", "clip.mp4", "a" * 64 + ".mp4"])
+def test_unknown_or_invalid_names(client, name):
+    assert client.get(f"/files/{name}").status_code == 404
+
+
+def test_content_addressed(local):
+    first = asyncio.run(local.put_bytes(b"same", "a.png", "image/png"))
+    second = asyncio.run(local.put_bytes(b"same", "b.png", "image/png"))
+    assert first == second
+
+
+def test_evicts_least_recently_stored(tmp_path):
+    backend = LocalStorageBackend(tmp_path, "http://testserver", max_bytes=250)
+
+    async def put(i: int) -> str:
+        return (await backend.put_bytes(bytes([i]) * 100, "f.bin", "application/octet-stream")).rsplit("/", 1)[1]
+
+    names = [asyncio.run(put(i)) for i in range(2)]
+    for age, name in enumerate(names):
+        os.utime(backend.path_for(name), (time.time() - 100 + age, time.time() - 100 + age))
+    # Storing the oldest object again refreshes it
+    asyncio.run(put(0))
+    names.append(asyncio.run(put(2)))
+
+    assert backend.path_for(names[0]) is not None
+    assert backend.path_for(names[1]) is None
+    assert backend.path_for(names[2]) is not None
+
+
+@pytest.mark.parametrize("url, public", [
+    ("http://localhost:8000", False),
+    ("http://api.localhost", False),
+    ("http://127.0.0.1:8000", False),
+    ("http://[::1]:8000", False),
+    ("http://10.1.2.3", False),
+    ("http://192.168.0.10:8000", False),
+    ("http://169.254.0.5", False),
+    ("http://storage.local", False),
+    ("https://ragebait.example.com", True),
+    ("http://8.8.8.8", True),
+    ("", False),
+])
+def test_is_public_url(url, public):
+    assert is_public_url(url) is public
+
+
+def test_local_store_is_public_only_behind_a_public_url(tmp_path):
+    assert not StorageClient(LocalStorageBackend(tmp_path, "http://localhost:8000", 1 << 20)).is_public()
+    assert StorageClient(LocalStorageBackend(tmp_path, "https://ragebait.example.com", 1 << 20)).is_public()
@@ -0,0 +1,162 @@
+"""
+Tests for parody jobs, run against the local fal.ai queue stand-in
+(backend/fal_queue_standin.py) in-process.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import fal_queue_standin
+from backend.config import settings
+from backend.models.schemas import JobStatus
+from backend.routers import parody
+from backend.services import parody_jobs as parody_jobs_module
+from backend.services.parody_jobs import parody_jobs
+from backend.services.parody_service import ParodyService
+
+
+BASE_URL = "http://fal.test"
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Passes requests through, remembering them."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+        self.requests: list[httpx.Request] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return await self.inner.handle_async_request(request)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = CountingTransport(httpx.ASGITransport(app=fal_queue_standin.app))
+    service = ParodyService()
+    service.fal_key = "test"
+    service._available = True
+    service.base_url = BASE_URL
+    service._client = httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr(parody_jobs_module, "parody_service", service)
+    monkeypatch.setattr(fal_queue_standin, "GENERATION_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "PARODY_POLL_INTERVAL_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "PARODY_WEBHOOK_BASE_URL", "")
+    monkeypatch.setattr(settings, "PARODY_MIRROR_TO_STORAGE", False)
+    return transport
+
+
+def submit(prompt: str = "a referee dancing") -> dict:
+    return asyncio.run(parody_jobs.submit("video1", "https://example.com/frame.jpg", prompt, "slow zoom-in"))
+
+
+def age(record: dict, seconds: float):
+    """Pretend the stand-in has been generating for this many more seconds."""
+    fal_queue_standin._requests[record["request_id"]]["submitted_at"] -= seconds
+
+
+def test_submit_poll_complete(transport):
+    record = submit()
+    assert record["status"] == JobStatus.QUEUED.value
+    queued = fal_queue_standin._requests[record["request_id"]]
+    assert queued["arguments"]["prompt"] == "a referee dancing, slow zoom-in"
+    assert queued["webhook"] is None
+    assert transport.requests[0].headers["authorization"] == "Key test"
+
+    assert asyncio.run(parody_jobs.refresh(record["parody_id"]))["status"] == JobStatus.QUEUED.value
+
+    age(record, 15)
+    assert asyncio.run(parody_jobs.refresh(record["parody_id"]))["status"] == JobStatus.RUNNING.value
+
+    age(record, 15)
+    done = asyncio.run(parody_jobs.refresh(record["parody_id"]))
+    assert done["status"] == JobStatus.COMPLETED.value
+    assert done["video_url"] == f"{BASE_URL}/videos/{record['request_id']}.mp4"
+    assert done["finished_at"] >= done["created_at"]
+
+    # Finished jobs are not checked again
+    requests = len(transport.requests)
+    assert asyncio.run(parody_jobs.refresh(record["parody_id"])) == done
+    assert len(transport.requests) == requests
+
+
+def test_polls_are_throttled(transport, monkeypatch):
+    monkeypatch.setattr(settings, "PARODY_POLL_INTERVAL_SECONDS", 60.0)
+    record = submit()
+    age(record, 30)
+    requests = len(transport.requests)
+
+    # Checked moments ago (on submit): no status request however often clients poll
+    for _ in range(3):
+        assert asyncio.run(parody_jobs.refresh(record["parody_id"]))["status"] == JobStatus.QUEUED.value
+    assert len(transport.requests) == requests
+
+    monkeypatch.setattr(settings, "PARODY_POLL_INTERVAL_SECONDS", 0.0)
+    assert asyncio.run(parody_jobs.refresh(record["parody_id"]))["status"] == JobStatus.COMPLETED.value
+    assert len(transport.requests) > requests
+
+
+def test_failed_generation_fails_the_job(transport):
+    record = submit("please fail")
+    age(record, 30)
+    failed = asyncio.run(parody_jobs.refresh(record["parody_id"]))
+    assert failed["status"] == JobStatus.FAILED.value
+    assert "422" in failed["error"]
+
+
+def test_unknown_job():
+    assert asyncio.run(parody_jobs.refresh("missing")) is None
+    assert asyncio.run(parody_jobs.handle_webhook("missing", "token", {"status": "OK"})) is None
+
+
+def test_webhook_completes_the_job(transport):
+    record = submit()
+    payload = {"status": "OK", "payload": {"video": {"url": "https://cdn.example.com/out.mp4"}}}
+    done = asyncio.run(parody_jobs.handle_webhook(record["parody_id"], record["webhook_token"], payload))
+    assert done["status"] == JobStatus.COMPLETED.value
+    assert done["video_url"] == "https://cdn.example.com/out.mp4"
+
+    # A repeated delivery changes nothing
+    again = {"status": "ERROR", "error": "late"}
+    assert asyncio.run(parody_jobs.handle_webhook(record["parody_id"], record["webhook_token"], again)) == done
+
+
+def test_webhook_with_wrong_token_is_ignored(transport):
+    record = submit()
+    payload = {"status": "OK", "payload": {"video": {"url": "https://cdn.example.com/out.mp4"}}}
+    assert asyncio.run(parody_jobs.handle_webhook(record["parody_id"], "wrong", payload)) is None
+    assert asyncio.run(parody_jobs.get(record["parody_id"]))["status"] == JobStatus.QUEUED.value
+
+    app = FastAPI()
+    app.include_router(parody.router)
+    client = TestClient(app)
+    url = f"/api/parody/{record['parody_id']}/webhook"
+    assert client.post(url, params={"token": "wrong"}, json=payload).status_code == 404
+    response = client.post(url, params={"token": record["webhook_token"]}, json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"status": JobStatus.COMPLETED.value}
+
+
+def test_webhook_error_fails_the_job(transport):
+    record = submit()
+    payload = {"status": "ERROR", "error": "Generation failed upstream", "payload": None}
+    failed = asyncio.run(parody_jobs.handle_webhook(record["parody_id"], record["webhook_token"], payload))
+    assert failed["status"] == JobStatus.FAILED.value
+    assert failed["error"] == "Generation failed upstream"
+
+
+def test_webhook_without_the_result_leaves_it_to_the_next_poll(transport, monkeypatch):
+    monkeypatch.setattr(settings, "PARODY_POLL_INTERVAL_SECONDS", 60.0)
+    record = submit()
+    pending = asyncio.run(parody_jobs.handle_webhook(record["parody_id"], record["webhook_token"], {"status": "OK"}))
+    assert pending["status"] == JobStatus.QUEUED.value
+    assert pending["checked_at"] == 0.0
+
+    age(record, 30)
+    done = asyncio.run(parody_jobs.refresh(record["parody_id"]))
+    assert done["status"] == JobStatus.COMPLETED.value
+    assert done["video_url"] == f"{BASE_URL}/videos/{record['request_id']}.mp4"
@@ -0,0 +1,92 @@
+"""
+Tests for render pool backpressure and per-task ffmpeg deadlines, in thread
+mode (RENDER_WORKERS=0).
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from backend.config import settings
+from backend.services import ffmpeg_tools
+from backend.services.render_pool import RenderPool, RenderPoolBusy
+
+
+@pytest.fixture
+def pool(monkeypatch) -> RenderPool:
+    monkeypatch.setattr(settings, "RENDER_THREAD_SLOTS", 1)
+    return RenderPool(workers=0, queue_size=1, queue_wait_seconds=0.2, timeout_seconds=30)
+
+
+def _deadline_seen(started: threading.Barrier) -> float:
+    # Both tasks have set their deadline before either reads it
+    started.wait(timeout=5)
+    return ffmpeg_tools._local.deadline
+
+
+def _wait_for(event: threading.Event) -> str:
+    event.wait(timeout=5)
+    return "done"
+
+
+def test_deadlines_are_per_task(monkeypatch):
+    monkeypatch.setattr(settings, "RENDER_THREAD_SLOTS", 2)
+    pool = RenderPool(workers=0, queue_size=0, queue_wait_seconds=1, timeout_seconds=30)
+    started = threading.Barrier(2)
+
+    async def main():
+        return await asyncio.gather(
+            pool.run(_deadline_seen, started, timeout=100),
+            pool.run(_deadline_seen, started, timeout=1000),
+        )
+
+    before = time.time()
+    short, long = asyncio.run(main())
+    assert before + 100 <= short < before + 200
+    assert before + 1000 <= long < before + 1100
+
+
+def test_deadline_only_applies_to_its_own_thread():
+    cmd = [sys.executable, "-c", "pass"]
+    errors = []
+
+    def expired():
+        ffmpeg_tools.set_deadline(time.time() - 1)
+        try:
+            ffmpeg_tools._run(cmd, text=True)
+        except ffmpeg_tools.FFmpegTimeout as e:
+            errors.append(e)
+        finally:
+            ffmpeg_tools.set_deadline(None)
+
+    thread = threading.Thread(target=expired)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1
+    assert ffmpeg_tools._run(cmd, text=True).returncode == 0
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_task_stops(pool):
+    release = threading.Event()
+
+    async def main():
+        task = asyncio.create_task(pool.run(_wait_for, release))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The worker is still busy: no slot for the next task
+        assert pool.stats["active"] == 1
+        with pytest.raises(RenderPoolBusy):
+            await pool.run(_wait_for, release)
+
+        release.set()
+        await asyncio.sleep(0.1)
+        assert pool.stats["active"] == 0
+        return await pool.run(_wait_for, release)
+
+    assert asyncio.run(main()) == "done"
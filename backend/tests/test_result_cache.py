@@ -0,0 +1,74 @@
+"""
+Tests for the content-addressed result cache.
+"""
+
+import os
+import time
+
+from backend.services.result_cache import DiskCache, make_key
+
+
+def test_make_key_is_stable_and_order_insensitive_for_dicts():
+    assert make_key("video", {"a": 1, "b": 2}, 1.5) == make_key("video", {"b": 2, "a": 1}, 1.5)
+    assert make_key("video", 1.5) != make_key("video", 1.6)
+    assert len(make_key("x")) == 64
+
+
+def test_json_round_trip_and_stats(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1 << 20)
+    key = make_key("scenes")
+    assert cache.get_json("scenes", key) is None
+    cache.put_json("scenes", key, [{"start_time": 1.0}])
+    assert cache.get_json("scenes", key) == [{"start_time": 1.0}]
+    assert cache.stats() == {"scenes": {"hits": 1, "misses": 1}}
+
+
+def test_file_round_trip(tmp_path):
+    cache = DiskCache(tmp_path / "cache", max_bytes=1 << 20)
+    src = tmp_path / "clip.mp4"
+    src.write_bytes(b"video")
+    key = make_key("clip")
+    cache.put_file("clips", key, src, ".mp4")
+
+    dest = tmp_path / "out.mp4"
+    assert cache.get_file("clips", key, dest, ".mp4") == str(dest)
+    assert dest.read_bytes() == b"video"
+    assert cache.get_file("clips", make_key("other"), tmp_path / "miss.mp4", ".mp4") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=250)
+    keys = [make_key(i) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put_json("layer", key, "x" * 98)
+        # Distinct mtimes regardless of filesystem timestamp resolution
+        path = cache._path("layer", key, ".json")
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+    # A hit makes the oldest entry the most recently used one
+    assert cache.get_json("layer", keys[0]) is not None
+    cache.put_json("layer", keys[2], "x" * 98)
+
+    assert cache.get_json("layer", keys[1]) is None
+    assert cache.get_json("layer", keys[0]) is not None
+    assert cache.get_json("layer", keys[2]) is not None
+
+
+def test_eviction_leaves_in_flight_temp_files_alone(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100)
+    # Another writer's temp file, old enough to be evicted first
+    tmp = tmp_path / "layer" / "ab" / ".tmp-writer"
+    tmp.parent.mkdir(parents=True)
+    tmp.write_bytes(b"x" * 500)
+    os.utime(tmp, (time.time() - 100, time.time() - 100))
+
+    cache.put_json("layer", make_key(1), "x" * 50)
+    assert tmp.exists()
+    assert cache.get_json("layer", make_key(1)) is not None
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = DiskCache(tmp_path / "cache", max_bytes=1 << 20, enabled=False)
+    cache.put_json("layer", make_key(1), {"a": 1})
+    assert cache.get_json("layer", make_key(1)) is None
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,83 @@
+"""
+Tests for snapping scenes to shot edges, ranking them and dropping repeats.
+"""
+
+import pytest
+
+from backend.services.gemini_client import FunnyMoment
+from backend.services.shots import ShotIndex, drop_overlapping, rank_score, snap_and_rank
+
+
+def _index() -> ShotIndex:
+    return ShotIndex(cuts=[12.0, 30.0], keyframes=[0.0, 10.0, 12.1, 20.0, 30.5], duration=60.0)
+
+
+def _moment(start: float, end: float, humor_score: int = 5) -> FunnyMoment:
+    return FunnyMoment(start_time=start, end_time=end, description="", humor_score=humor_score, reason="")
+
+
+@pytest.mark.parametrize("t, expected", [
+    # Cut with a keyframe just after it: the keyframe starts the shot
+    (12.5, (12.1, 1.0)),
+    # Cut without a keyframe beats a slightly closer plain keyframe
+    (30.2, (30.0, 0.7)),
+    # Close to the start of the video
+    (1.0, (0.0, 1.0)),
+    # Nothing nearby: left where it is
+    (45.0, (45.0, 0.0)),
+])
+def test_snap_start(t, expected):
+    start, quality = _index().snap_start(t)
+    assert start == pytest.approx(expected[0])
+    assert quality == expected[1]
+
+
+def test_snap_end_stops_on_the_last_frame_before_a_cut():
+    end, quality = _index().snap_end(29.0, start=12.1, min_duration=5.0, max_duration=30.0)
+    assert end == pytest.approx(29.9)
+    assert quality == 1.0
+
+
+def test_snap_end_keeps_the_length_in_range():
+    # The cut at 30s would make the scene longer than max_duration
+    end, quality = _index().snap_end(29.0, start=12.1, min_duration=5.0, max_duration=17.0)
+    assert (end, quality) == (29.0, 0.0)
+    # Too short: stretched to min_duration
+    end, quality = _index().snap_end(46.0, start=45.0, min_duration=5.0, max_duration=30.0)
+    assert (end, quality) == (50.0, 0.0)
+
+
+def test_snap_end_to_the_end_of_the_video():
+    assert _index().snap_end(59.0, start=45.0, min_duration=5.0, max_duration=30.0) == (60.0, 1.0)
+
+
+def test_snap_and_rank_prefers_clean_boundaries():
+    clean = _moment(12.5, 29.0, humor_score=7)
+    ragged = _moment(45.0, 50.0, humor_score=8)
+    ranked = snap_and_rank([ragged, clean], _index(), min_duration=5.0, max_duration=30.0)
+
+    assert ranked == [clean, ragged]
+    assert (clean.start_time, clean.end_time) == pytest.approx((12.1, 29.9))
+    assert clean.boundary_quality == 1.0
+    assert ragged.boundary_quality == 0.0
+    assert rank_score(clean) == pytest.approx(8.5)
+    assert rank_score(ragged) == pytest.approx(8.0)
+
+
+def test_drop_overlapping_keeps_order_and_skips_repeats():
+    best = _moment(0.0, 10.0)
+    half = _moment(5.0, 15.0)       # shares exactly half: kept
+    inside = _moment(2.0, 10.0)     # entirely inside the best one
+    later = _moment(20.0, 30.0)
+    assert drop_overlapping([best, half, inside, later]) == [best, half, later]
+
+
+def test_drop_overlapping_threshold():
+    a, b = _moment(0.0, 10.0), _moment(3.0, 13.0)  # 70% shared
+    assert drop_overlapping([a, b]) == [a]
+    assert drop_overlapping([a, b], max_overlap=0.8) == [a, b]
+
+
+def test_drop_overlapping_treats_empty_moments_as_repeats():
+    a = _moment(0.0, 10.0)
+    assert drop_overlapping([a, _moment(4.0, 4.0)]) == [a]
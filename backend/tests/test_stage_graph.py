@@ -0,0 +1,118 @@
+"""
+Tests for the stage graph scheduler.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.services.stage_graph import StageGraph
+
+
+def test_stages_run_after_their_dependencies():
+    order = []
+
+    def stage(name: str, delay: float = 0.0):
+        async def run(results: dict):
+            await asyncio.sleep(delay)
+            order.append(name)
+            return name.upper()
+        return run
+
+    graph = StageGraph()
+    graph.add("a", stage("a", 0.02))
+    graph.add("b", stage("b"), deps=("a",))
+    graph.add("c", stage("c"))
+    graph.add("d", stage("d"), deps=("b", "c"))
+
+    results = asyncio.run(graph.run())
+    assert results == {"a": "A", "b": "B", "c": "C", "d": "D"}
+    # c has no dependencies, so it finishes while a is still running
+    assert order == ["c", "a", "b", "d"]
+    assert set(graph.timings) == {"a", "b", "c", "d"}
+
+
+def test_stages_see_dependency_results():
+    graph = StageGraph()
+
+    async def double(results: dict):
+        return results["source"] * 2
+
+    async def source(results: dict):
+        return 21
+
+    graph.add("source", source)
+    graph.add("double", double, deps=("source",))
+    assert asyncio.run(graph.run())["double"] == 42
+
+
+def test_independent_stages_run_concurrently():
+    running = 0
+    peak = 0
+
+    async def stage(results: dict):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    graph = StageGraph()
+    for name in ("a", "b", "c"):
+        graph.add(name, stage)
+    asyncio.run(graph.run())
+    assert peak == 3
+
+
+def test_failure_cancels_other_stages_and_is_raised():
+    cancelled = []
+
+    async def slow(results: dict):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def broken(results: dict):
+        raise RuntimeError("boom")
+
+    async def never(results: dict):
+        raise AssertionError("depends on a failed stage")
+
+    graph = StageGraph()
+    graph.add("slow", slow)
+    graph.add("broken", broken)
+    graph.add("after", never, deps=("broken",))
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(graph.run())
+    assert cancelled == ["slow"]
+
+
+def test_callbacks_may_be_sync_or_async():
+    events = []
+
+    async def on_finish(name: str, elapsed: float):
+        await asyncio.sleep(0)
+        events.append(("finish", name))
+
+    async def stage(results: dict):
+        return None
+
+    graph = StageGraph(on_start=lambda name: events.append(("start", name)), on_finish=on_finish)
+    graph.add("a", stage)
+    graph.add("b", stage, deps=("a",))
+    asyncio.run(graph.run())
+    assert events == [("start", "a"), ("finish", "a"), ("start", "b"), ("finish", "b")]
+
+
+def test_add_rejects_duplicates_and_unknown_dependencies():
+    async def stage(results: dict):
+        return None
+
+    graph = StageGraph().add("a", stage)
+    with pytest.raises(ValueError):
+        graph.add("a", stage)
+    with pytest.raises(ValueError):
+        graph.add("b", stage, deps=("missing",))
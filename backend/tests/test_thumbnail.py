@@ -0,0 +1,33 @@
+"""
+Tests for thumbnail extraction.
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.services.video_processor import video_processor
+
+
+@pytest.fixture
+def short_video(tmp_path):
+    """A 2-second 10 fps test video."""
+    path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_thumbnail_is_written(short_video, tmp_path):
+    output = tmp_path / "thumb.jpg"
+    assert video_processor.create_thumbnail(str(short_video), timestamp=1.0, output_path=str(output)) == str(output)
+    assert output.read_bytes()[:2] == b"\xff\xd8"
+
+
+def test_thumbnail_past_the_end_raises(short_video, tmp_path):
+    output = tmp_path / "thumb.jpg"
+    with pytest.raises(RuntimeError):
+        video_processor.create_thumbnail(str(short_video), timestamp=60.0, output_path=str(output))
+    assert not output.exists()
@@ -0,0 +1,36 @@
+"""
+Tests for the per-line TTS keys the pipeline caches placed commentary on.
+"""
+
+from backend.config import settings
+from backend.models.schemas import CommentarySegment, LensType
+from backend.services.tts_client import tts_client
+
+
+def segment(text: str, start: float = 0.0) -> CommentarySegment:
+    return CommentarySegment(start_time=start, end_time=start + 2.0, text=text)
+
+
+def test_line_keys_follow_normalized_text():
+    keys = tts_client.line_keys(
+        [segment("BRO  WAIT-"), segment(" BRO WAIT- ", 3.0), segment("NO WAY")],
+        LensType.NATURE_DOCUMENTARY,
+    )
+    assert len(keys) == 3
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+
+
+def test_line_keys_change_with_the_tts_model(monkeypatch):
+    segments = [segment("LOOK AT THIS")]
+    before = tts_client.line_keys(segments, LensType.NATURE_DOCUMENTARY)
+    monkeypatch.setattr(settings, "TTS_MODEL", "fal-ai/some-other-tts")
+    assert tts_client.line_keys(segments, LensType.NATURE_DOCUMENTARY) != before
+
+
+def test_line_keys_change_with_the_voice(monkeypatch):
+    segments = [segment("LOOK AT THIS")]
+    before = tts_client.line_keys(segments, LensType.NATURE_DOCUMENTARY)
+    voice = tts_client._get_voice_settings(LensType.NATURE_DOCUMENTARY)
+    monkeypatch.setattr(tts_client, "_get_voice_settings", lambda lens: {**voice, "speed": 1.0})
+    assert tts_client.line_keys(segments, LensType.NATURE_DOCUMENTARY) != before
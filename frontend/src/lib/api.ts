@@ -29,6 +29,15 @@ export interface ParodyResult {
   motion_directive: string;
 }
 
+export interface ParodyJob {
+  parody_id: string;
+  status: "queued" | "running" | "completed" | "failed";
+  status_url: string;
+  motion_directive: string;
+  video_url?: string;
+  error?: string;
+}
+
 export interface RoastResult {
   job_id: string;
   status: "processing" | "completed" | "failed";
@@ -242,6 +251,7 @@ export const api = {
 
   /**
    * Generate a parody video from an image using fal.ai
+   * Queues a parody job, then polls it until the video is ready (1-5 minutes)
    */
   generateParody: async (
     videoId: string,
@@ -265,6 +275,37 @@ export const api = {
       throw new Error(`Parody generation failed: ${errorText}`);
     }
 
+    let job: ParodyJob = await response.json();
+    const deadline = Date.now() + 10 * 60 * 1000;
+    while (job.status !== "completed") {
+      if (job.status === "failed") {
+        throw new Error(`Parody generation failed: ${job.error || "unknown error"}`);
+      }
+      if (Date.now() > deadline) {
+        throw new Error("Parody generation timed out");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+      job = await api.getParody(job.parody_id);
+    }
+
+    return {
+      parody_id: job.parody_id,
+      video_url: job.video_url || "",
+      motion_directive: job.motion_directive,
+    };
+  },
+
+  /**
+   * Get the status (and, once completed, the video) of a parody job
+   */
+  getParody: async (parodyId: string): Promise<ParodyJob> => {
+    const response = await fetch(`${API_BASE}/api/parody/${parodyId}`);
+
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`Parody status failed: ${errorText}`);
+    }
+
     return await response.json();
   },
 
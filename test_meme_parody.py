@@ -1,6 +1,5 @@
 import asyncio
 import os
-import base64
 import sys
 
 # Add the project root to sys.path
@@ -19,11 +18,10 @@ async def test_meme():
     # Use the downloaded test image
     with open("test_image.jpg", "rb") as f:
         image_bytes = f.read()
-        image_base_64 = base64.b64encode(image_bytes).decode('utf-8')
     
     try:
         result = await meme_engine.generate_meme(
-            frame_base64=image_base_64,
+            frame_jpeg=image_bytes,
             context="A funny sports moment"
         )
         print("Meme generated successfully!")